@@ -40,18 +40,20 @@ void initialize_matrix(double **matrix, int n) {
     }
 }
 
-int main() {
-    double **A = allocate_matrix(N);
-    double **B = allocate_matrix(N);
-    double **C = allocate_matrix(N);
+// q2_matrix_1d [n]: n x n matrices (default 1000)
+int main(int argc, char *argv[]) {
+    int n = argc > 1 ? atoi(argv[1]) : N;
+    double **A = allocate_matrix(n);
+    double **B = allocate_matrix(n);
+    double **C = allocate_matrix(n);
     
-    printf("Matrix Multiplication - 1D Threading (Size: %dx%d)\n", N, N);
+    printf("Matrix Multiplication - 1D Threading (Size: %dx%d)\n", n, n);
     printf("======================================================================\n");
     
     // Initialize matrices
     double init_start = omp_get_wtime();
-    initialize_matrix(A, N);
-    initialize_matrix(B, N);
+    initialize_matrix(A, n);
+    initialize_matrix(B, n);
     double init_time = omp_get_wtime() - init_start;
     printf("Initialization time: %.4f seconds\n\n", init_time);
     
@@ -68,7 +70,7 @@ int main() {
         omp_set_num_threads(num_threads);
         
         double start = omp_get_wtime();
-        matrix_multiply_1d(A, B, C, N);
+        matrix_multiply_1d(A, B, C, n);
         double end = omp_get_wtime();
         
         double time_taken = end - start;
@@ -80,8 +82,8 @@ int main() {
         double speedup = sequential_time / time_taken;
         double efficiency = (speedup / num_threads) * 100.0;
         
-        // GFLOPS calculation: 2*N^3 operations (multiply and add)
-        double ops = 2.0 * N * N * N;
+        // GFLOPS calculation: 2*n^3 operations (multiply and add)
+        double ops = 2.0 * n * n * n;
         double gflops = (ops / time_taken) / 1e9;
         
         printf("%-10d %-15.4f %-15.2f %-15.2f%% %-15.2f\n", 
@@ -90,9 +92,9 @@ int main() {
     
     printf("\nVersion: 1D Threading (parallelized outer i-loop only)\n");
     
-    free_matrix(A, N);
-    free_matrix(B, N);
-    free_matrix(C, N);
+    free_matrix(A, n);
+    free_matrix(B, n);
+    free_matrix(C, n);
     
     return 0;
 }
\ No newline at end of file
@@ -40,18 +40,20 @@ void initialize_matrix(double **matrix, int n) {
     }
 }
 
-int main() {
-    double **A = allocate_matrix(N);
-    double **B = allocate_matrix(N);
-    double **C = allocate_matrix(N);
+// q2_matrix_2d [n]: n x n matrices (default 1000)
+int main(int argc, char *argv[]) {
+    int n = argc > 1 ? atoi(argv[1]) : N;
+    double **A = allocate_matrix(n);
+    double **B = allocate_matrix(n);
+    double **C = allocate_matrix(n);
     
-    printf("Matrix Multiplication - 2D Threading (Size: %dx%d)\n", N, N);
+    printf("Matrix Multiplication - 2D Threading (Size: %dx%d)\n", n, n);
     printf("======================================================================\n");
     
     // Initialize matrices
     double init_start = omp_get_wtime();
-    initialize_matrix(A, N);
-    initialize_matrix(B, N);
+    initialize_matrix(A, n);
+    initialize_matrix(B, n);
     double init_time = omp_get_wtime() - init_start;
     printf("Initialization time: %.4f seconds\n\n", init_time);
     
@@ -68,7 +70,7 @@ int main() {
         omp_set_num_threads(num_threads);
         
         double start = omp_get_wtime();
-        matrix_multiply_2d(A, B, C, N);
+        matrix_multiply_2d(A, B, C, n);
         double end = omp_get_wtime();
         
         double time_taken = end - start;
@@ -81,7 +83,7 @@ int main() {
         double efficiency = (speedup / num_threads) * 100.0;
         
         // GFLOPS calculation
-        double ops = 2.0 * N * N * N;
+        double ops = 2.0 * n * n * n;
         double gflops = (ops / time_taken) / 1e9;
         
         printf("%-10d %-15.4f %-15.2f %-15.2f%% %-15.2f\n", 
@@ -91,9 +93,9 @@ int main() {
     printf("\nVersion: 2D Threading (parallelized both i and j loops using collapse)\n");
     printf("Advantage: Better work distribution among threads\n");
     
-    free_matrix(A, N);
-    free_matrix(B, N);
-    free_matrix(C, N);
+    free_matrix(A, n);
+    free_matrix(B, n);
+    free_matrix(C, n);
     
     return 0;
 }
\ No newline at end of file
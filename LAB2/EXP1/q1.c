@@ -1,26 +1,61 @@
 #include <omp.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
-int main() {
+// --first-touch: allocate and initialise the arrays in parallel with the same
+// static partition as the compute loop, once per thread count, so every page
+// is placed on the NUMA node of the thread that later uses it.
+void init_arrays(double **A, double **B, double **C, long N, int threads, int first_touch) {
+    *A = (double*)malloc(N * sizeof(double));
+    *B = (double*)malloc(N * sizeof(double));
+    *C = (double*)malloc(N * sizeof(double));
+    double *a = *A, *b = *B, *c = *C;
+
+    if (first_touch) {
+        #pragma omp parallel for schedule(static) num_threads(threads)
+        for (long i = 0; i < N; i++) {
+            a[i] = b[i] = 1.0;
+            c[i] = 0.0;
+        }
+    } else {
+        for (long i = 0; i < N; i++) {
+            a[i] = b[i] = 1.0;
+            c[i] = 0.0;
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
 
     long N = 100000000;
 
-    double *A = (double*)malloc(N * sizeof(double));
-    double *B = (double*)malloc(N * sizeof(double));
-    double *C = (double*)malloc(N * sizeof(double));
+    double *A = NULL, *B = NULL, *C = NULL;
 
-    for (long i = 0; i < N; i++) {
-        A[i] = B[i] = 1.0;
+    // Thread counts to test: given on the command line, or 1..17 by default
+    int thread_list[64];
+    int num_runs = 0;
+    int first_touch = 0;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--first-touch") == 0) first_touch = 1;
+        else if (num_runs < 64) thread_list[num_runs++] = atoi(argv[a]);
+    }
+    if (num_runs == 0) {
+        for (int t = 1; t <= 17; t++) thread_list[num_runs++] = t;
     }
 
-    for (int threads = 1; threads <= 17; threads++) {
+    if (!first_touch) init_arrays(&A, &B, &C, N, 1, 0);
+    printf("Initialisation: %s\n\n", first_touch ? "first-touch" : "serial");
+
+    for (int r = 0; r < num_runs; r++) {
+        int threads = thread_list[r];
         omp_set_num_threads(threads);
+        if (first_touch) init_arrays(&A, &B, &C, N, threads, 1);
         printf("Running with %d threads\n", threads);
 
         double start = omp_get_wtime();
 
-        #pragma omp parallel for
+        #pragma omp parallel for schedule(static)
         for (long i = 0; i < N; i++) {
             C[i] = A[i] + B[i];
         }
@@ -28,11 +63,19 @@ int main() {
         double end = omp_get_wtime();
 
         printf("Time = %f seconds\n\n", end - start);
+
+        if (first_touch) {
+            free(A);
+            free(B);
+            free(C);
+        }
     }
 
-    free(A);
-    free(B);
-    free(C);
+    if (!first_touch) {
+        free(A);
+        free(B);
+        free(C);
+    }
 
     return 0;
 }
\ No newline at end of file
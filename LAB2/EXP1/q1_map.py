@@ -1,12 +1,35 @@
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, store
 
 # Data from your results
 threads = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 time = [0.471, 0.118, 0.099, 0.095, 0.104, 0.097, 0.094, 0.086, 0.097, 0.092, 0.092, 0.087, 0.087, 0.091, 0.087, 0.093, 0.087]
 
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp1")
+others = {}
+if records:
+    # Placement / first-touch sweeps store several variants: label the fastest,
+    # draw the rest as dashed lines
+    variants = runner.by_variant(records)
+    best = min(variants, key=lambda v: min(r.time for r in variants[v]))
+    others = {v: ([r.threads for r in rs], [r.time for r in rs])
+              for v, rs in variants.items() if v != best}
+    records = variants[best]
+    threads = [r.threads for r in records]
+    time = [r.time for r in records]
+
 # Create the plot
 plt.figure(figsize=(10, 6))
 plt.plot(threads, time, marker='o', linewidth=2, markersize=8, color='blue')
+for v, (v_threads, v_time) in others.items():
+    plt.plot(v_threads, v_time, '.--', linewidth=1, alpha=0.6, label=v)
+if others:
+    plt.legend(fontsize=9)
 plt.xlabel('Number of Threads', fontsize=12)
 plt.ylabel('Execution Time (seconds)', fontsize=12)
 plt.title('OpenMP Vector Addition Performance vs Number of Threads', fontsize=14)
@@ -1,20 +1,41 @@
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, stats, store
 
 # Data from Experiment 2
 threads = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 time = [0.451, 0.143, 0.096, 0.089, 0.098, 0.092, 0.089, 0.101, 0.110, 0.106, 0.094, 0.089, 0.091, 0.089, 0.095, 0.089, 0.086]
 
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp2")
+if records:
+    records = runner.select(records)
+    threads = [r.threads for r in records]
+    time = [r.time for r in records]
+
 # Calculate metrics
 T1 = time[0]
 speedup = [T1/t for t in time]
 efficiency = [(s/p)*100 for s, p in zip(speedup, threads)]
 throughput = [100.0/t for t in time]  # In M ops/s
 
+# Stored sweeps with repeated trials: median-based speedup and 95% CI error bars
+time_err = speedup_err = efficiency_err = None
+if records:
+    speedup = [r.metrics["speedup"] for r in records]
+    efficiency = [r.metrics["efficiency"] for r in records]
+    time_err = stats.error_bars(records)
+    speedup_err = stats.error_bars(records, "speedup")
+    efficiency_err = [[e / p * 100 for e, p in zip(row, threads)] for row in speedup_err]
+
 # Create figure with 2x2 subplots
 fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
 
 # 1. Speedup vs Threads
-ax1.plot(threads, speedup, marker='o', linewidth=2, markersize=8, color='blue', label='Speedup')
+ax1.errorbar(threads, speedup, yerr=speedup_err, capsize=4, marker='o', linewidth=2, markersize=8, color='blue', label='Speedup')
 ax1.plot(threads, threads, '--', color='red', alpha=0.5, label='Ideal Speedup')
 ax1.set_xlabel('Number of Threads', fontsize=11)
 ax1.set_ylabel('Speedup S(p)', fontsize=11)
@@ -24,7 +45,7 @@ ax1.legend()
 ax1.set_xticks(threads)
 
 # 2. Parallel Efficiency vs Threads
-ax2.plot(threads, efficiency, marker='s', linewidth=2, markersize=8, color='green')
+ax2.errorbar(threads, efficiency, yerr=efficiency_err, capsize=4, marker='s', linewidth=2, markersize=8, color='green')
 ax2.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
 ax2.set_xlabel('Number of Threads', fontsize=11)
 ax2.set_ylabel('Efficiency E(p) (%)', fontsize=11)
@@ -42,7 +63,7 @@ ax3.grid(True, alpha=0.3)
 ax3.set_xticks(threads)
 
 # 4. Execution Time vs Threads
-ax4.plot(threads, time, marker='d', linewidth=2, markersize=8, color='orange')
+ax4.errorbar(threads, time, yerr=time_err, capsize=4, marker='d', linewidth=2, markersize=8, color='orange')
 ax4.set_xlabel('Number of Threads', fontsize=11)
 ax4.set_ylabel('Execution Time (seconds)', fontsize=11)
 ax4.set_title('Execution Time vs Number of Threads', fontsize=12, fontweight='bold')
@@ -58,7 +79,7 @@ print("Performance analysis plots saved as 'performance_analysis.png'")
 # Create individual plots as well
 # Speedup plot
 plt.figure(figsize=(10, 6))
-plt.plot(threads, speedup, marker='o', linewidth=2, markersize=8, color='blue', label='Actual Speedup')
+plt.errorbar(threads, speedup, yerr=speedup_err, capsize=4, marker='o', linewidth=2, markersize=8, color='blue', label='Actual Speedup')
 plt.plot(threads, threads, '--', color='red', alpha=0.5, label='Ideal Speedup')
 plt.xlabel('Number of Threads', fontsize=12)
 plt.ylabel('Speedup S(p)', fontsize=12)
@@ -74,7 +95,7 @@ plt.show()
 
 # Efficiency plot
 plt.figure(figsize=(10, 6))
-plt.plot(threads, efficiency, marker='s', linewidth=2, markersize=8, color='green')
+plt.errorbar(threads, efficiency, yerr=efficiency_err, capsize=4, marker='s', linewidth=2, markersize=8, color='green')
 plt.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
 plt.xlabel('Number of Threads', fontsize=12)
 plt.ylabel('Efficiency E(p) (%)', fontsize=12)
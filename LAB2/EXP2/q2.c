@@ -2,7 +2,7 @@
 #include <stdio.h>
 #include <stdlib.h>
 
-int main()
+int main(int argc, char *argv[])
 {
 
     long N = 100000000;
@@ -16,8 +16,23 @@ int main()
         A[i] = B[i] = 1.0;
     }
 
-    for (int threads = 1; threads <= 17; threads++)
+    // Thread counts to test: given on the command line, or 1..17 by default
+    int thread_list[64];
+    int num_runs = 0;
+    if (argc > 1)
     {
+        for (int a = 1; a < argc && num_runs < 64; a++)
+            thread_list[num_runs++] = atoi(argv[a]);
+    }
+    else
+    {
+        for (int t = 1; t <= 17; t++)
+            thread_list[num_runs++] = t;
+    }
+
+    for (int r = 0; r < num_runs; r++)
+    {
+        int threads = thread_list[r];
         omp_set_num_threads(threads);
         printf("Running with %d threads\n", threads);
 
@@ -1,4 +1,10 @@
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, scaling, store
+from bench.runner import Record
 
 # STRONG SCALING DATA
 strong_cores = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
@@ -10,8 +16,30 @@ weak_cores = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 weak_time = [0.3180, 0.2610, 0.2540, 0.2630, 0.2850, 0.3180, 0.3180, 0.3480, 0.3620, 0.3880, 0.3820, 0.5130, 0.5060, 0.5460, 0.5590, 0.5800, 0.5970]
 weak_efficiency = [100.00, 121.84, 125.20, 120.91, 111.58, 100.00, 100.00, 91.38, 87.85, 81.96, 83.25, 61.99, 62.85, 58.24, 56.89, 54.83, 53.27]
 
-# Create figure with 2x2 subplots
-fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp3")
+if records:
+    strong = runner.select(records, "strong")
+    weak = runner.select(records, "weak")
+    strong_cores = [r.threads for r in strong]
+    strong_time = [r.time for r in strong]
+    strong_speedup = [strong_time[0] / t for t in strong_time]
+    # in-process sweeps (--inproc) only measure strong scaling: no weak panels then
+    weak_cores = [r.threads for r in weak]
+    weak_time = [r.time for r in weak]
+    weak_efficiency = [weak_time[0] / t * 100 for t in weak_time]
+
+# Model fits: Amdahl on the strong sweep, Gustafson on the weak one (work grows with p)
+fits = scaling.fit([Record("exp3", "strong", p, 1, t) for p, t in zip(strong_cores, strong_time)] +
+                   [Record("exp3", "weak", p, p, t) for p, t in zip(weak_cores, weak_time)])
+scaling.report(fits)
+fits = {f.variant: f for f in fits}
+
+# Create figure with 2x2 subplots (1x2 without a weak sweep)
+if weak_cores:
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(14, 10))
+else:
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
 
 # 1. Strong Scaling: Execution Time vs Cores
 ax1.plot(strong_cores, strong_time, marker='o', linewidth=2, markersize=8, color='blue')
@@ -24,6 +52,10 @@ ax1.set_xticks(strong_cores)
 # 2. Strong Scaling: Speedup vs Cores
 ax2.plot(strong_cores, strong_speedup, marker='s', linewidth=2, markersize=8, color='green', label='Actual Speedup')
 ax2.plot(strong_cores, strong_cores, '--', color='red', alpha=0.5, label='Ideal Speedup')
+if "strong" in fits:
+    amdahl_f = fits["strong"].amdahl
+    ax2.plot(strong_cores, scaling.amdahl(strong_cores, amdahl_f), ':', color='black',
+             label=f'Amdahl fit (f = {amdahl_f:.3f})')
 ax2.set_xlabel('Number of Cores', fontsize=11)
 ax2.set_ylabel('Speedup', fontsize=11)
 ax2.set_title('Strong Scaling: Speedup vs Cores', fontsize=12, fontweight='bold')
@@ -31,23 +63,28 @@ ax2.grid(True, alpha=0.3)
 ax2.legend()
 ax2.set_xticks(strong_cores)
 
-# 3. Weak Scaling: Execution Time vs Cores
-ax3.plot(weak_cores, weak_time, marker='^', linewidth=2, markersize=8, color='purple')
-ax3.set_xlabel('Number of Cores', fontsize=11)
-ax3.set_ylabel('Execution Time (seconds)', fontsize=11)
-ax3.set_title('Weak Scaling: Execution Time vs Cores', fontsize=12, fontweight='bold')
-ax3.grid(True, alpha=0.3)
-ax3.set_xticks(weak_cores)
-
-# 4. Weak Scaling: Efficiency vs Cores
-ax4.plot(weak_cores, weak_efficiency, marker='d', linewidth=2, markersize=8, color='orange')
-ax4.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
-ax4.set_xlabel('Number of Cores', fontsize=11)
-ax4.set_ylabel('Efficiency (%)', fontsize=11)
-ax4.set_title('Weak Scaling: Efficiency vs Cores', fontsize=12, fontweight='bold')
-ax4.grid(True, alpha=0.3)
-ax4.legend()
-ax4.set_xticks(weak_cores)
+if weak_cores:
+    # 3. Weak Scaling: Execution Time vs Cores
+    ax3.plot(weak_cores, weak_time, marker='^', linewidth=2, markersize=8, color='purple')
+    ax3.set_xlabel('Number of Cores', fontsize=11)
+    ax3.set_ylabel('Execution Time (seconds)', fontsize=11)
+    ax3.set_title('Weak Scaling: Execution Time vs Cores', fontsize=12, fontweight='bold')
+    ax3.grid(True, alpha=0.3)
+    ax3.set_xticks(weak_cores)
+
+    # 4. Weak Scaling: Efficiency vs Cores
+    ax4.plot(weak_cores, weak_efficiency, marker='d', linewidth=2, markersize=8, color='orange')
+    ax4.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
+    if "weak" in fits:
+        gustafson_s = fits["weak"].gustafson
+        ax4.plot(weak_cores, scaling.gustafson(weak_cores, gustafson_s) / weak_cores * 100, ':',
+                 color='black', label=f'Gustafson fit (s = {gustafson_s:.3f})')
+    ax4.set_xlabel('Number of Cores', fontsize=11)
+    ax4.set_ylabel('Efficiency (%)', fontsize=11)
+    ax4.set_title('Weak Scaling: Efficiency vs Cores', fontsize=12, fontweight='bold')
+    ax4.grid(True, alpha=0.3)
+    ax4.legend()
+    ax4.set_xticks(weak_cores)
 
 plt.tight_layout()
 plt.savefig('scaling_analysis.png', dpi=300, bbox_inches='tight')
@@ -86,38 +123,40 @@ plt.tight_layout()
 plt.savefig('strong_speedup_vs_cores.png', dpi=300)
 plt.show()
 
-# Weak Scaling - Time
-plt.figure(figsize=(10, 6))
-plt.plot(weak_cores, weak_time, marker='^', linewidth=2, markersize=8, color='purple')
-plt.xlabel('Number of Cores', fontsize=12)
-plt.ylabel('Execution Time (seconds)', fontsize=12)
-plt.title('Weak Scaling: Execution Time vs Cores', fontsize=14, fontweight='bold')
-plt.grid(True, alpha=0.3)
-plt.xticks(weak_cores)
-for i, (c, t) in enumerate(zip(weak_cores, weak_time)):
-    plt.text(c, t + 0.01, f'{t:.2f}s', ha='center', fontsize=9)
-plt.tight_layout()
-plt.savefig('weak_time_vs_cores.png', dpi=300)
-plt.show()
+if weak_cores:
+    # Weak Scaling - Time
+    plt.figure(figsize=(10, 6))
+    plt.plot(weak_cores, weak_time, marker='^', linewidth=2, markersize=8, color='purple')
+    plt.xlabel('Number of Cores', fontsize=12)
+    plt.ylabel('Execution Time (seconds)', fontsize=12)
+    plt.title('Weak Scaling: Execution Time vs Cores', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3)
+    plt.xticks(weak_cores)
+    for i, (c, t) in enumerate(zip(weak_cores, weak_time)):
+        plt.text(c, t + 0.01, f'{t:.2f}s', ha='center', fontsize=9)
+    plt.tight_layout()
+    plt.savefig('weak_time_vs_cores.png', dpi=300)
+    plt.show()
 
-# Weak Scaling - Efficiency
-plt.figure(figsize=(10, 6))
-plt.plot(weak_cores, weak_efficiency, marker='d', linewidth=2, markersize=8, color='orange')
-plt.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
-plt.xlabel('Number of Cores', fontsize=12)
-plt.ylabel('Efficiency (%)', fontsize=12)
-plt.title('Weak Scaling: Efficiency vs Cores', fontsize=14, fontweight='bold')
-plt.grid(True, alpha=0.3)
-plt.legend(fontsize=11)
-plt.xticks(weak_cores)
-for i, (c, e) in enumerate(zip(weak_cores, weak_efficiency)):
-    plt.text(c, e + 1.5, f'{e:.1f}%', ha='center', fontsize=9)
-plt.tight_layout()
-plt.savefig('weak_efficiency_vs_cores.png', dpi=300)
-plt.show()
+    # Weak Scaling - Efficiency
+    plt.figure(figsize=(10, 6))
+    plt.plot(weak_cores, weak_efficiency, marker='d', linewidth=2, markersize=8, color='orange')
+    plt.axhline(y=100, color='red', linestyle='--', alpha=0.5, label='100% Efficiency')
+    plt.xlabel('Number of Cores', fontsize=12)
+    plt.ylabel('Efficiency (%)', fontsize=12)
+    plt.title('Weak Scaling: Efficiency vs Cores', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3)
+    plt.legend(fontsize=11)
+    plt.xticks(weak_cores)
+    for i, (c, e) in enumerate(zip(weak_cores, weak_efficiency)):
+        plt.text(c, e + 1.5, f'{e:.1f}%', ha='center', fontsize=9)
+    plt.tight_layout()
+    plt.savefig('weak_efficiency_vs_cores.png', dpi=300)
+    plt.show()
 
 print("\nIndividual plots saved:")
 print("- strong_time_vs_cores.png")
 print("- strong_speedup_vs_cores.png")
-print("- weak_time_vs_cores.png")
-print("- weak_efficiency_vs_cores.png")
+if weak_cores:
+    print("- weak_time_vs_cores.png")
+    print("- weak_efficiency_vs_cores.png")
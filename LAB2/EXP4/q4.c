@@ -2,43 +2,147 @@
 #include <stdio.h>
 #include <stdlib.h>
 #include <math.h>
+#include <stdint.h>
 #include <string.h>
 
-void work(int i) {
+// Cost of iteration i in sin/cos steps for each workload profile:
+//   triangular  (i + 1) * unit          (the original progressive load)
+//   uniform     N / 2 * unit            (same total work, no imbalance)
+//   random      hash(i) % N * unit      (irregular, fixed seed)
+enum profile { TRIANGULAR, UNIFORM, RANDOM };
+static const char *profile_names[] = {"triangular", "uniform", "random"};
+
+// Keeps the work loop from being optimised away.
+double checksum;
+
+// --trace FILE: one event per chunk, i.e. per run of consecutive iterations
+// executed back-to-back by one thread.  Events go into a preallocated buffer
+// per thread (N events, the worst case) and are written after the loop, so
+// tracing costs one branch and one omp_get_wtime() per iteration.
+//
+// File layout, little endian, repeated once per measured loop:
+//   struct trace_run   (48 bytes)
+//   struct chunk_event (20 bytes) x events, grouped by thread
+// Times are seconds since the loop started.
+struct trace_run {
+    char schedule[16];
+    char profile[16];
+    uint32_t threads;
+    uint32_t iterations;
+    uint32_t events;
+    float wall;
+};
+
+struct chunk_event {
+    uint32_t thread;
+    uint32_t first;
+    uint32_t count;
+    float start;
+    float end;
+};
+
+FILE *trace_file = NULL;
+
+long long cost(enum profile profile, int i, int N, long long unit) {
+    switch (profile) {
+    case UNIFORM:
+        return (long long)(N / 2) * unit;
+    case RANDOM: {
+        unsigned int h = (unsigned int)i * 2654435761u;
+        h ^= h >> 16;
+        return (long long)(h % (unsigned int)N) * unit;
+    }
+    default:
+        return (long long)(i + 1) * unit;
+    }
+}
+
+double work(long long limit) {
     double dummy = 0;
-    long long limit = (i + 1) * 100000; 
     for (long long j = 0; j < limit; ++j) {
         dummy += sin(j) * cos(j);
     }
+    return dummy;
 }
 
-void measure_imbalance(const char* schedule_name, int n_threads, int N) {
+// "static", "dynamic,4", "guided,16", "auto": kind with an optional chunk size
+// (0 = the runtime's default chunk).
+int parse_schedule(const char *name, omp_sched_t *kind, int *chunk) {
+    char buf[32];
+    strncpy(buf, name, sizeof(buf) - 1);
+    buf[sizeof(buf) - 1] = '\0';
+    char *comma = strchr(buf, ',');
+    *chunk = 0;
+    if (comma) {
+        *comma = '\0';
+        *chunk = atoi(comma + 1);
+    }
+    if (strcmp(buf, "static") == 0) *kind = omp_sched_static;
+    else if (strcmp(buf, "dynamic") == 0) *kind = omp_sched_dynamic;
+    else if (strcmp(buf, "guided") == 0) *kind = omp_sched_guided;
+    else if (strcmp(buf, "auto") == 0) *kind = omp_sched_auto;
+    else return 0;
+    return 1;
+}
+
+void measure_imbalance(const char* schedule_name, int n_threads, int N,
+                       enum profile profile, long long unit) {
+    omp_sched_t kind;
+    int chunk;
+    if (!parse_schedule(schedule_name, &kind, &chunk)) {
+        fprintf(stderr, "unknown schedule '%s'\n", schedule_name);
+        exit(1);
+    }
+    omp_set_schedule(kind, chunk);
+
     double *thread_times = (double*)calloc(n_threads, sizeof(double));
+    struct chunk_event **events = NULL;
+    int *event_counts = NULL;
+    if (trace_file) {
+        events = (struct chunk_event**)malloc(n_threads * sizeof(struct chunk_event*));
+        event_counts = (int*)calloc(n_threads, sizeof(int));
+        for (int t = 0; t < n_threads; t++)
+            events[t] = (struct chunk_event*)malloc(N * sizeof(struct chunk_event));
+    }
+    double sum = 0.0;
     double start_wall = omp_get_wtime();
-    
-    #pragma omp parallel num_threads(n_threads)
+
+    #pragma omp parallel num_threads(n_threads) reduction(+:sum)
     {
         int tid = omp_get_thread_num();
         double start_thread = omp_get_wtime();
-        
-        if (strcmp(schedule_name, "static") == 0) {
-            #pragma omp for schedule(static)
-            for (int i = 0; i < N; i++) work(i);
-        } else if (strcmp(schedule_name, "dynamic,4") == 0) {
-            #pragma omp for schedule(dynamic, 4)
-            for (int i = 0; i < N; i++) work(i);
-        } else if (strcmp(schedule_name, "guided") == 0) {
-            #pragma omp for schedule(guided)
-            for (int i = 0; i < N; i++) work(i);
+        struct chunk_event *ev = NULL;
+        int n_events = 0;
+        int next = -1;
+
+        // nowait: each thread stops its clock when its own iterations are
+        // done, not at the loop's closing barrier
+        #pragma omp for schedule(runtime) nowait
+        for (int i = 0; i < N; i++) {
+            if (events && i != next) {
+                ev = &events[tid][n_events++];
+                ev->thread = tid;
+                ev->first = i;
+                ev->count = 0;
+                ev->start = (float)(omp_get_wtime() - start_wall);
+            }
+            sum += work(cost(profile, i, N, unit));
+            if (events) {
+                ev->count++;
+                ev->end = (float)(omp_get_wtime() - start_wall);
+                next = i + 1;
+            }
         }
-        
+
         double end_thread = omp_get_wtime();
         thread_times[tid] = end_thread - start_thread;
+        if (events) event_counts[tid] = n_events;
     }
-    
+
     double end_wall = omp_get_wtime();
     double wall_time = end_wall - start_wall;
-    
+    checksum += sum;
+
     double t_max = 0.0;
     double t_sum = 0.0;
     for (int i = 0; i < n_threads; i++) {
@@ -47,24 +151,86 @@ void measure_imbalance(const char* schedule_name, int n_threads, int N) {
     }
     double t_avg = t_sum / n_threads;
     double imbalance = (t_max - t_avg) / t_avg;
-    
-    printf("%-15s %-12.4fs%-12.4fs%.2f%%\n", 
-           schedule_name, t_max, t_avg, imbalance * 100);
-    
+
+    char percent[32];
+    snprintf(percent, sizeof(percent), "%.2f%%", imbalance * 100);
+    printf("%-15s %-12.4fs%-12.4fs%-15s%.4fs\n",
+           schedule_name, t_max, t_avg, percent, wall_time);
+
+    if (trace_file) {
+        struct trace_run run = {{0}, {0}, n_threads, N, 0, (float)wall_time};
+        strncpy(run.schedule, schedule_name, sizeof(run.schedule) - 1);
+        strncpy(run.profile, profile_names[profile], sizeof(run.profile) - 1);
+        for (int t = 0; t < n_threads; t++) run.events += event_counts[t];
+        fwrite(&run, sizeof(run), 1, trace_file);
+        for (int t = 0; t < n_threads; t++) {
+            fwrite(events[t], sizeof(struct chunk_event), event_counts[t], trace_file);
+            free(events[t]);
+        }
+        free(events);
+        free(event_counts);
+    }
+
     free(thread_times);
 }
 
-int main() {
+// q4 [--profile triangular|uniform|random] [--iterations N] [--unit U]
+//    [--threads T1,T2,...] [--trace FILE] [schedule ...]
+// Without arguments: the triangular load, static / dynamic,4 / guided, all threads.
+int main(int argc, char *argv[]) {
     int N = 2000;
-    int n_threads = omp_get_max_threads();
-    
-    printf("Running on %d threads...\n", n_threads);
-    printf("%-15s %-13s%-13s%s\n", "Schedule", "T_max", "T_avg", "Imbalance (%)");
-    printf("-------------------------------------------------------\n");
-    
-    measure_imbalance("static", n_threads, N);
-    measure_imbalance("dynamic,4", n_threads, N);
-    measure_imbalance("guided", n_threads, N);
-    
+    long long unit = 20;
+    enum profile profile = TRIANGULAR;
+    int thread_list[64];
+    int num_threads = 0;
+    const char *schedules[256];
+    int num_schedules = 0;
+
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--profile") == 0 && a + 1 < argc) {
+            const char *name = argv[++a];
+            if (strcmp(name, "uniform") == 0) profile = UNIFORM;
+            else if (strcmp(name, "random") == 0) profile = RANDOM;
+            else if (strcmp(name, "triangular") == 0) profile = TRIANGULAR;
+            else {
+                fprintf(stderr, "unknown profile '%s'\n", name);
+                return 1;
+            }
+        } else if (strcmp(argv[a], "--iterations") == 0 && a + 1 < argc) {
+            N = atoi(argv[++a]);
+        } else if (strcmp(argv[a], "--unit") == 0 && a + 1 < argc) {
+            unit = atoll(argv[++a]);
+        } else if (strcmp(argv[a], "--threads") == 0 && a + 1 < argc) {
+            for (char *t = strtok(argv[++a], ","); t && num_threads < 64; t = strtok(NULL, ","))
+                thread_list[num_threads++] = atoi(t);
+        } else if (strcmp(argv[a], "--trace") == 0 && a + 1 < argc) {
+            trace_file = fopen(argv[++a], "wb");
+            if (!trace_file) {
+                perror(argv[a]);
+                return 1;
+            }
+        } else if (num_schedules < 256) {
+            schedules[num_schedules++] = argv[a];
+        }
+    }
+    if (num_threads == 0) thread_list[num_threads++] = omp_get_max_threads();
+    if (num_schedules == 0) {
+        schedules[num_schedules++] = "static";
+        schedules[num_schedules++] = "dynamic,4";
+        schedules[num_schedules++] = "guided";
+    }
+
+    printf("Profile: %s, %d iterations, unit %lld\n", profile_names[profile], N, unit);
+    for (int t = 0; t < num_threads; t++) {
+        printf("Running on %d threads...\n", thread_list[t]);
+        printf("%-15s %-13s%-13s%-15s%s\n", "Schedule", "T_max", "T_avg", "Imbalance (%)", "Wall");
+        printf("----------------------------------------------------------------\n");
+
+        for (int s = 0; s < num_schedules; s++)
+            measure_imbalance(schedules[s], thread_list[t], N, profile, unit);
+        printf("\n");
+    }
+
+    if (trace_file) fclose(trace_file);
     return 0;
-}
\ No newline at end of file
+}
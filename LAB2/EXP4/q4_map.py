@@ -1,5 +1,11 @@
+import argparse
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import autotune, store, trace
 
 # Actual experimental results
 schedules = ['static', 'dynamic,4', 'guided']
@@ -7,6 +13,78 @@ t_max = [0.0590, 0.0810, 0.0600]
 t_avg = [0.0383, 0.0533, 0.0489]
 imbalance = [54.00, 51.93, 22.61]
 
+# `--trace FILE` (written by `q4 --trace FILE`): per-chunk timeline of every traced loop
+parser = argparse.ArgumentParser(add_help=False)
+parser.add_argument("--trace", type=Path)
+trace_args, rest = parser.parse_known_args()
+if trace_args.trace:
+    runs = trace.read(trace_args.trace)
+    fig, axes = plt.subplots(len(runs), 1, figsize=(14, 1.5 + 0.4 * sum(r.threads for r in runs)),
+                             sharex=True, squeeze=False)
+    for ax, run in zip(axes[:, 0], runs):
+        trace.gantt(ax, run)
+        info = run.summary()
+        busy = run.busy()
+        ax.set_ylabel('Thread', fontsize=10)
+        ax.set_title(f'{run.schedule} ({run.profile}, {run.threads} threads): '
+                     f'{info["chunks"]} chunks, imbalance {(busy.max() - busy.mean()) / busy.mean() * 100:.1f}%, '
+                     f'idle tail {info["idle_tail"] * 1000:.1f} ms', fontsize=11, fontweight='bold')
+        print(f"{run.schedule:<15} {run.threads:>3} threads  {info['chunks']:>5} chunks "
+              f"(mean {info['mean_chunk']:.1f} it)  wall {run.wall:.4f}s  "
+              f"idle tail {info['idle_tail']:.4f}s  outside chunks {info['overhead']:.4f}s")
+    axes[-1, 0].set_xlabel('Time since loop start (s)', fontsize=11)
+    fig.colorbar(plt.cm.ScalarMappable(cmap='viridis', norm=plt.Normalize(0, runs[0].iterations - 1)),
+                 ax=axes[:, 0], label='First iteration of chunk')
+    plt.savefig('schedule_timeline.png', dpi=300, bbox_inches='tight')
+    print("Timeline plot saved as 'schedule_timeline.png'")
+    sys.exit(0)
+
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp4", rest)
+
+# A tuning batch (`python -m bench tune`): heatmaps of the whole search space
+if records and any(" " in r.variant for r in records):
+    profiles = list(dict.fromkeys(autotune.split(r.variant)[1] for r in records))
+    space = list(dict.fromkeys(autotune.split(r.variant)[0] for r in records))
+    threads = sorted({r.threads for r in records})
+    fig, axes = plt.subplots(len(profiles), 2, figsize=(14, 1.2 + 0.35 * len(space) * len(profiles)),
+                             squeeze=False)
+    for row, profile in zip(axes, profiles):
+        cells = {(autotune.split(r.variant)[0], r.threads): r for r in records
+                 if autotune.split(r.variant)[1] == profile}
+        wall = np.array([[cells[s, t].metrics.get("wall", cells[s, t].time) if (s, t) in cells else np.nan
+                          for t in threads] for s in space])
+        imb = np.array([[cells[s, t].metrics["imbalance"] if (s, t) in cells else np.nan
+                         for t in threads] for s in space])
+        best = np.unravel_index(np.nanargmin(wall), wall.shape)
+        for ax, data, title, cmap, fmt in ((row[0], wall, 'Wall Time (s)', 'viridis_r', '{:.3f}'),
+                                           (row[1], imb, 'Imbalance (%)', 'RdYlGn_r', '{:.0f}')):
+            im = ax.imshow(data, aspect='auto', cmap=cmap)
+            ax.set_xticks(range(len(threads)))
+            ax.set_xticklabels(threads)
+            ax.set_yticks(range(len(space)))
+            ax.set_yticklabels(space, fontsize=8)
+            ax.set_xlabel('Threads', fontsize=10)
+            ax.set_title(f'{profile}: {title}', fontsize=12, fontweight='bold')
+            for (i, j), v in np.ndenumerate(data):
+                if np.isfinite(v):
+                    ax.text(j, i, fmt.format(v), ha='center', va='center', fontsize=7)
+            ax.add_patch(plt.Rectangle((best[1] - 0.5, best[0] - 0.5), 1, 1, fill=False,
+                                       edgecolor='red', linewidth=2))
+            fig.colorbar(im, ax=ax)
+        print(f"{profile}: best {space[best[0]]} on {threads[best[1]]} threads "
+              f"({wall[best]:.4f}s, {imb[best]:.2f}% imbalance)")
+    plt.tight_layout()
+    plt.savefig('schedule_search.png', dpi=300, bbox_inches='tight')
+    print("Schedule search plot saved as 'schedule_search.png'")
+    sys.exit(0)
+
+if records:
+    schedules = [r.variant for r in records]
+    t_max = [r.time for r in records]
+    t_avg = [r.metrics["t_avg"] for r in records]
+    imbalance = [r.metrics["imbalance"] for r in records]
+
 # Create figure with 2 subplots
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
 
@@ -1,10 +1,29 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, store
 
 # Experimental results with 1-17 threads
 threads = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 critical_times = [0.160, 0.312, 0.277, 0.333, 0.457, 0.535, 0.587, 0.651, 0.671, 0.674, 0.684, 0.692, 0.714, 0.706, 0.709, 0.708, 0.718]
 reduction_times = [0.021, 0.014, 0.014, 0.007, 0.007, 0.009, 0.007, 0.003, 0.006, 0.009, 0.002, 0.007, 0.002, 0.005, 0.007, 0.003, 0.005]
+
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+# A `--suite` sweep (exp5-suite) carries the pair at its most contended stored level
+# (k=1 unless the sweep skipped it)
+records = store.from_argv(("exp5", "exp5-suite"))
+suite = bool(records) and any(" k=" in r.variant for r in records)
+if records:
+    critical, reduction = "critical", "reduction"
+    if suite:
+        k = min(int(r.metrics["every"]) for r in records if r.variant.split()[0] == critical)
+        critical, reduction = f"critical k={k}", f"reduction k={k}"
+    threads = [r.threads for r in runner.select(records, critical)]
+    critical_times = [r.time for r in runner.select(records, critical)]
+    reduction_times = [r.time for r in runner.select(records, reduction)]
 overhead_factors = [t_c / t_r for t_c, t_r in zip(critical_times, reduction_times)]
 
 # Create figure with 2x2 subplots
@@ -93,3 +112,48 @@ print("\nAll plots saved:")
 print("- sync_comparison.png")
 print("- execution_time_comparison.png")
 print("- overhead_factor.png")
+
+# Whole primitive family (`python -m bench run exp5-suite`): one panel per contention level
+if suite:
+    methods = list(dict.fromkeys(r.variant.split()[0] for r in records))
+    levels = sorted({int(r.metrics["every"]) for r in records})
+    colors = dict(zip(methods, ['red', 'orange', 'brown', 'blue', 'purple', 'green']))
+    fig, axes = plt.subplots(1, len(levels) + 1, figsize=(6 * (len(levels) + 1), 6), squeeze=False)
+    for ax, k in zip(axes[0], levels):
+        for method in methods:
+            rs = runner.select(records, f"{method} k={k}")
+            ax.semilogy([r.threads for r in rs], [r.time for r in rs], marker='o', linewidth=2,
+                        markersize=5, color=colors.get(method), label=method)
+        ax.set_xlabel('Number of Threads', fontsize=11)
+        ax.set_ylabel('Execution Time (seconds, log scale)', fontsize=11)
+        ax.set_title(f'Shared Update Every {k} Iteration{"s" if k > 1 else ""}', fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3, which='both')
+        ax.legend(fontsize=9)
+
+    # Cheapest primitive per contention level at the largest thread count
+    ax = axes[0][-1]
+    top = max(r.threads for r in records)
+    x = np.arange(len(levels))
+    width = 0.8 / len(methods)
+    print(f"\nCheapest primitive at {top} threads:")
+    for i, method in enumerate(methods):
+        times = [next((r.time for r in records if r.variant == f"{method} k={k}" and r.threads == top), np.nan)
+                 for k in levels]
+        ax.bar(x + (i - (len(methods) - 1) / 2) * width, times, width, color=colors.get(method),
+               edgecolor='black', label=method)
+    for k in levels:
+        best = min((r for r in records if r.metrics["every"] == k and r.threads == top), key=lambda r: r.time)
+        print(f"  every {k:>5} iterations: {best.variant.split()[0]:<10} {best.time:.6f}s")
+    ax.set_yscale('log')
+    ax.set_xticks(x)
+    ax.set_xticklabels([f'k={k}' for k in levels])
+    ax.set_xlabel('Contention Level', fontsize=11)
+    ax.set_ylabel('Execution Time (seconds, log scale)', fontsize=11)
+    ax.set_title(f'All Primitives at {top} Threads', fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3, axis='y')
+    ax.legend(fontsize=9)
+
+    plt.tight_layout()
+    plt.savefig('sync_suite.png', dpi=300, bbox_inches='tight')
+    plt.show()
+    print("- sync_suite.png")
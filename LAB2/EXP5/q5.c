@@ -1,6 +1,17 @@
 #include <omp.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+
+#include "../lib/cacheline.h"
+
+// --suite: every primitive below on the same N and thread sweep, with each
+// thread counting locally and publishing to the shared total every k
+// iterations (k = 1 is the fully contended case).
+enum method { CRITICAL, ATOMIC, LOCK, PADDED, TREE, REDUCTION, N_METHODS };
+static const char *method_names[N_METHODS] = {
+    "critical", "atomic", "lock", "padded", "tree", "reduction"
+};
 
 void test_sync_methods(long long N, int n_threads) {
     double sum_critical = 0.0;
@@ -36,16 +47,143 @@ void test_sync_methods(long long N, int n_threads) {
     }
 }
 
-int main() {
+// Add a thread's pending count to the shared total (critical, atomic, lock)
+// or to its own line-sized slot (padded, tree).
+static inline void publish(enum method m, double value, double *shared, omp_lock_t *lock,
+                           volatile double *slot) {
+    switch (m) {
+    case CRITICAL:
+        #pragma omp critical
+        *shared += value;
+        break;
+    case ATOMIC:
+        #pragma omp atomic
+        *shared += value;
+        break;
+    case LOCK:
+        omp_set_lock(lock);
+        *shared += value;
+        omp_unset_lock(lock);
+        break;
+    default:
+        *slot += value;
+    }
+}
+
+double run_method(enum method m, long long N, int n_threads, long k, long line) {
+    double shared = 0.0;
+    omp_lock_t lock;
+    omp_init_lock(&lock);
+    char *slots = (char*)aligned_buffer(line, n_threads * line);
+    memset(slots, 0, n_threads * line);
+
+    double start = omp_get_wtime();
+    if (m == REDUCTION) {
+        #pragma omp parallel for num_threads(n_threads) reduction(+:shared)
+        for (long long i = 0; i < N; i++) {
+            shared += 1.0;
+        }
+    } else {
+        #pragma omp parallel num_threads(n_threads)
+        {
+            int tid = omp_get_thread_num();
+            volatile double *slot = (volatile double*)(slots + tid * line);
+            double local = 0.0;
+            long pending = 0;
+
+            #pragma omp for schedule(static)
+            for (long long i = 0; i < N; i++) {
+                local += 1.0;
+                if (++pending == k) {
+                    publish(m, local, &shared, &lock, slot);
+                    local = 0.0;
+                    pending = 0;
+                }
+            }
+            if (pending) publish(m, local, &shared, &lock, slot);
+
+            // tree: pairwise combine of the slots in log2(threads) rounds
+            if (m == TREE) {
+                for (int step = 1; step < n_threads; step *= 2) {
+                    #pragma omp barrier
+                    if (tid % (2 * step) == 0 && tid + step < n_threads)
+                        *slot += *(volatile double*)(slots + (tid + step) * line);
+                }
+            }
+        }
+        // padded: linear merge of the per-thread slots after the region
+        if (m == PADDED)
+            for (int t = 0; t < n_threads; t++) shared += *(double*)(slots + t * line);
+        if (m == TREE) shared = *(double*)slots;
+    }
+    double end = omp_get_wtime();
+
+    if (shared != (double)N) {
+        fprintf(stderr, "%s (k=%ld, %d threads): sum %.0f, expected %lld\n",
+                method_names[m], k, n_threads, shared, N);
+        exit(1);
+    }
+    omp_destroy_lock(&lock);
+    aligned_release(slots);
+    return end - start;
+}
+
+void run_suite(long long N, const int *thread_list, int num_runs, const long *every, int num_every) {
+    const char *source;
+    long line = cache_line_size(&source);
+    printf("Synchronisation suite: %lld operations, shared update every k iterations\n", N);
+    printf("Cache line: %ld bytes (%s)\n", line, source);
+
+    for (int e = 0; e < num_every; e++) {
+        printf("\nUpdate every %ld iterations\n", every[e]);
+        printf("%-8s", "Threads");
+        for (int m = 0; m < N_METHODS; m++) printf(" %-12s", method_names[m]);
+        printf("\n------------------------------------------------------------------------------------\n");
+        for (int r = 0; r < num_runs; r++) {
+            printf("%-8d", thread_list[r]);
+            for (int m = 0; m < N_METHODS; m++) {
+                printf(" %-12.6f", run_method((enum method)m, N, thread_list[r], every[e], line));
+                fflush(stdout);
+            }
+            printf("\n");
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
     long long N = 10000000;
 
+    // Thread counts to test: given on the command line, or 1..17 by default.
+    // --suite [--every K1,K2,...] runs the full primitive family instead.
+    int thread_list[64];
+    int num_runs = 0;
+    int suite = 0;
+    long every[16] = {1, 16, 256};
+    int num_every = 3;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--suite") == 0) suite = 1;
+        else if (strcmp(argv[a], "--every") == 0 && a + 1 < argc) {
+            num_every = 0;
+            for (char *k = strtok(argv[++a], ","); k && num_every < 16; k = strtok(NULL, ","))
+                every[num_every++] = atol(k);
+        } else if (num_runs < 64) thread_list[num_runs++] = atoi(argv[a]);
+    }
+    if (num_runs == 0) {
+        for (int t = 1; t <= 17; t++) thread_list[num_runs++] = t;
+    }
+
+    if (suite) {
+        run_suite(N, thread_list, num_runs, every, num_every);
+        return 0;
+    }
+
     printf("Comparing Critical Section vs Reduction with different thread counts\n");
     printf("Problem Size: %lld operations\n\n", N);
     printf("%-8s %-20s %-20s %s\n", "Threads", "Critical (s)", "Reduction (s)", "Overhead Factor");
     printf("------------------------------------------------------------------------\n");
 
-    for (int threads = 1; threads <= 17; threads++) {
-        test_sync_methods(N, threads);
+    for (int r = 0; r < num_runs; r++) {
+        test_sync_methods(N, thread_list[r]);
     }
 
     return 0;
@@ -1,10 +1,22 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, store
 
 # Results from experiment with 1-17 threads
 threads = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 false_sharing_times = [0.270, 0.437, 0.658, 0.894, 1.152, 1.304, 0.950, 1.484, 1.553, 1.827, 1.873, 1.839, 1.852, 1.973, 1.874, 1.942, 2.178]
 padded_times = [0.277, 0.271, 0.286, 0.298, 0.354, 0.340, 0.333, 0.360, 0.399, 0.474, 0.464, 0.506, 0.526, 0.560, 0.595, 0.632, 0.638]
+
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp6")
+if records:
+    threads = [r.threads for r in runner.select(records, "unpadded")]
+    false_sharing_times = [r.time for r in runner.select(records, "unpadded")]
+    padded_times = [r.time for r in runner.select(records, "padded")]
 speedups = [fs/p for fs, p in zip(false_sharing_times, padded_times)]
 
 # Create comprehensive visualization
@@ -96,3 +108,30 @@ print("\nAll plots saved:")
 print("- false_sharing_analysis.png")
 print("- time_comparison.png")
 print("- speedup_comparison.png")
+
+# Hardware counters (`python -m bench run exp6 --counters`): derived rates per variant
+COUNTER_PANELS = [('ipc', 'Instructions per Cycle'),
+                  ('cache_misses_per_iter', 'Cache Misses per Iteration'),
+                  ('llc_stores_per_iter', 'LLC Stores per Iteration'),
+                  ('context_switches', 'Context Switches')]
+if records and any(key in r.metrics for r in records for key, _ in COUNTER_PANELS):
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    for ax, (key, title) in zip(axes.flat, COUNTER_PANELS):
+        for variant, color, label in (('unpadded', 'red', 'False Sharing'), ('padded', 'green', 'Padded')):
+            rs = [r for r in runner.select(records, variant) if key in r.metrics]
+            if rs:
+                ax.plot([r.threads for r in rs], [r.metrics[key] for r in rs], marker='o',
+                        linewidth=2, markersize=6, color=color, label=label)
+        if not ax.lines:
+            ax.text(0.5, 0.5, 'not available on this host', ha='center', va='center',
+                    transform=ax.transAxes, fontsize=11, color='gray')
+        else:
+            ax.legend()
+        ax.set_xlabel('Number of Threads', fontsize=11)
+        ax.set_ylabel(title, fontsize=11)
+        ax.set_title(title, fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+        ax.set_xticks(threads)
+    plt.tight_layout()
+    plt.savefig('counter_analysis.png', dpi=300, bbox_inches='tight')
+    print("- counter_analysis.png")
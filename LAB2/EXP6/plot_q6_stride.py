@@ -0,0 +1,62 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import store
+
+# `python -m bench run exp6-stride` stores a sweep; `--host`/`--batch` pick another one
+records = store.from_argv("exp6-stride") or store.from_argv("exp6-stride", ["--latest"])
+
+strides = sorted({int(r.metrics["stride"]) for r in records})
+threads = sorted({r.threads for r in records})
+line_size = int(records[0].metrics.get("line_size", 64))
+times = {(int(r.metrics["stride"]), r.threads): r.time for r in records}
+free_from = {r.threads: int(r.metrics["contention_free"]) for r in records}
+
+# Slowdown relative to the widest stride, where no two accumulators share a line
+slowdown = np.array([[times[s, t] / times[strides[-1], t] for s in strides] for t in threads])
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+colors = plt.cm.viridis(np.linspace(0, 0.9, len(threads)))
+
+# 1. Slowdown vs stride, one line per thread count
+for row, t, color in zip(slowdown, threads, colors):
+    ax1.plot(strides, row, marker='o', linewidth=2, markersize=6, color=color, label=f'{t} threads')
+ax1.axvline(x=line_size, color='red', linestyle='--', linewidth=1.5, label=f'Cache line ({line_size} B)')
+ax1.axhline(y=1.1, color='gray', linestyle=':', linewidth=1, label='10% threshold')
+ax1.set_xscale('log', base=2)
+ax1.set_xticks(strides)
+ax1.set_xticklabels([f'{s}' for s in strides])
+ax1.set_xlabel('Accumulator Stride (bytes)', fontsize=11)
+ax1.set_ylabel(f'Time / Time at {strides[-1]} B', fontsize=11)
+ax1.set_title('False Sharing vs Accumulator Stride', fontsize=12, fontweight='bold')
+ax1.grid(True, alpha=0.3)
+ax1.legend(fontsize=8, ncol=2)
+
+# 2. Heatmap, contention-free stride outlined per thread count
+im = ax2.imshow(slowdown, aspect='auto', cmap='Reds', origin='lower')
+ax2.set_xticks(range(len(strides)))
+ax2.set_xticklabels(strides)
+ax2.set_yticks(range(len(threads)))
+ax2.set_yticklabels(threads)
+ax2.set_xlabel('Accumulator Stride (bytes)', fontsize=11)
+ax2.set_ylabel('Threads', fontsize=11)
+ax2.set_title('Slowdown (contention-free stride outlined)', fontsize=12, fontweight='bold')
+for (i, j), v in np.ndenumerate(slowdown):
+    ax2.text(j, i, f'{v:.2f}', ha='center', va='center', fontsize=8)
+for i, t in enumerate(threads):
+    j = strides.index(free_from[t])
+    ax2.add_patch(plt.Rectangle((j - 0.5, i - 0.5), 1, 1, fill=False, edgecolor='blue', linewidth=2))
+fig.colorbar(im, ax=ax2, label='Slowdown')
+
+plt.tight_layout()
+plt.savefig('stride_sweep.png', dpi=300, bbox_inches='tight')
+plt.show()
+
+print(f"Cache line size: {line_size} bytes")
+for t in threads:
+    print(f"{t:3d} threads: contention-free from {free_from[t]} bytes")
+print(f"Minimal padding for per-thread counters: {max(free_from.values())} bytes")
+print("Stride sweep plot saved as 'stride_sweep.png'")
@@ -1,57 +1,127 @@
 #include <omp.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
-#define CACHE_LINE_SIZE 8
+#include "../lib/cacheline.h"
+#include "../lib/counters.h"
 
-typedef struct {
-    double value;
-} UnpaddedData;
+#define MAX_STRIDE 256
 
-typedef struct {
-    double value;
-    double padding[CACHE_LINE_SIZE];
-} PaddedData;
+// Each thread adds 1.0 to its own double, `stride` bytes after the previous
+// thread's.  The buffer starts on a cache line boundary, so thread t's value
+// shares a line with exactly those of the threads within line/stride of it.
+// The volatile access keeps the compiler from holding the value in a
+// register, so every iteration really stores to the (possibly shared) line.
+double accumulate(int n_threads, long stride, long line, long long iterations,
+                  struct counter_totals *counts) {
+    long align = stride > line ? stride : line;
+    size_t bytes = (n_threads * stride + align - 1) / align * align;
+    char *buffer = (char*)aligned_buffer(align, bytes);
+    memset(buffer, 0, bytes);
 
-int main() {
+    // the counters are opened and closed outside [start, end]; the barriers
+    // line the threads up so the window covers exactly the loop
+    double start = 0.0, end = 0.0;
+    #pragma omp parallel num_threads(n_threads)
+    {
+        volatile double *value = (volatile double*)(buffer + omp_get_thread_num() * stride);
+        int fds[COUNTER_EVENTS];
+        counters_open(fds);
+        #pragma omp barrier
+        #pragma omp single
+        start = omp_get_wtime();
+        counters_start(fds);
+        for (long long i = 0; i < iterations; i++) {
+            *value += 1.0;
+        }
+        counters_stop(fds);
+        #pragma omp barrier
+        #pragma omp single
+        end = omp_get_wtime();
+        counters_close(fds, counts);
+    }
+
+    aligned_release(buffer);
+    return end - start;
+}
+
+int main(int argc, char *argv[]) {
     const long long iterations = 100000000;
 
-    printf("Testing False Sharing vs Padding with 1-17 threads\n\n");
-    printf("%-8s %-20s %-20s %s\n", "Threads", "False Sharing (s)", "Padded (s)", "Speedup");
-    printf("------------------------------------------------------------------------\n");
+    // Thread counts to test: given on the command line, or 1..17 by default.
+    // --counters adds a 'Counters' line per variant (see ../lib/counters.h).
+    // --stride-sweep times accumulators 8..256 bytes apart instead of the
+    // unpadded/padded pair.
+    int thread_list[64];
+    int num_runs = 0;
+    int stride_sweep = 0;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--counters") == 0) counters_enabled = 1;
+        else if (strcmp(argv[a], "--stride-sweep") == 0) stride_sweep = 1;
+        else if (num_runs < 64) thread_list[num_runs++] = atoi(argv[a]);
+    }
+    if (num_runs == 0) {
+        for (int t = 1; t <= 17; t++) thread_list[num_runs++] = t;
+    }
+
+    const char *source;
+    long line = cache_line_size(&source);
+    printf("Cache line: %ld bytes (%s)\n", line, source);
+
+    struct counter_totals counts_unpadded, counts_padded, counts_stride[16];
+    char label[32];
 
-    for (int n_threads = 1; n_threads <= 17; n_threads++) {
-        UnpaddedData *unpadded = (UnpaddedData*)calloc(n_threads, sizeof(UnpaddedData));
-        PaddedData *padded = (PaddedData*)calloc(n_threads, sizeof(PaddedData));
+    if (stride_sweep) {
+        printf("Stride sweep: time (s) per accumulator stride in bytes\n\n");
+        printf("%-8s", "Threads");
+        for (long stride = 8; stride <= MAX_STRIDE; stride *= 2) printf(" %-10ld", stride);
+        printf("  Contention-free from\n");
+        printf("------------------------------------------------------------------------------------\n");
 
-        double s1 = omp_get_wtime();
-        #pragma omp parallel num_threads(n_threads)
-        {
-            int tid = omp_get_thread_num();
-            for (long long i = 0; i < iterations; i++) {
-                unpadded[tid].value += 1.0;
+        for (int r = 0; r < num_runs; r++) {
+            int n_threads = thread_list[r];
+            double times[16];
+            int n = 0;
+            printf("%-8d", n_threads);
+            for (long stride = 8; stride <= MAX_STRIDE; stride *= 2, n++) {
+                counters_reset(&counts_stride[n]);
+                times[n] = accumulate(n_threads, stride, line, iterations, &counts_stride[n]);
+                printf(" %-10.6f", times[n]);
+                fflush(stdout);
             }
-        }
-        double e1 = omp_get_wtime();
-        double time_unpadded = e1 - s1;
-
-        double s2 = omp_get_wtime();
-        #pragma omp parallel num_threads(n_threads)
-        {
-            int tid = omp_get_thread_num();
-            for (long long i = 0; i < iterations; i++) {
-                padded[tid].value += 1.0;
+            // smallest stride from which every wider stride is within 10% of the widest
+            int free_from = n - 1;
+            while (free_from > 0 && times[free_from - 1] <= times[n - 1] * 1.10) free_from--;
+            printf("  %ld\n", 8L << free_from);
+
+            n = 0;
+            for (long stride = 8; stride <= MAX_STRIDE; stride *= 2, n++) {
+                snprintf(label, sizeof(label), "stride-%ld", stride);
+                counters_print(label, n_threads, iterations * n_threads, &counts_stride[n]);
             }
         }
-        double e2 = omp_get_wtime();
-        double time_padded = e2 - s2;
+        return 0;
+    }
+
+    printf("Testing False Sharing vs Padding with 1-17 threads\n\n");
+    printf("%-8s %-20s %-20s %s\n", "Threads", "False Sharing (s)", "Padded (s)", "Speedup");
+    printf("------------------------------------------------------------------------\n");
+
+    for (int r = 0; r < num_runs; r++) {
+        int n_threads = thread_list[r];
+
+        // unpadded: adjacent doubles; padded: one cache line per thread
+        counters_reset(&counts_unpadded);
+        counters_reset(&counts_padded);
+        double time_unpadded = accumulate(n_threads, sizeof(double), line, iterations, &counts_unpadded);
+        double time_padded = accumulate(n_threads, line, line, iterations, &counts_padded);
 
         printf("%-8d %-20.6f %-20.6f %.2fx\n",
                n_threads, time_unpadded, time_padded, time_unpadded / time_padded);
-
-        free(unpadded);
-        free(padded);
+        counters_print("unpadded", n_threads, iterations * n_threads, &counts_unpadded);
+        counters_print("padded", n_threads, iterations * n_threads, &counts_padded);
     }
 
     return 0;
-}
\ No newline at end of file
+}
@@ -1,17 +1,45 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import runner, stats, store
 
 # Experimental results
 cores = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17]
 time = [0.419, 0.120, 0.100, 0.089, 0.104, 0.104, 0.108, 0.095, 0.087, 0.094, 0.104, 0.107, 0.093, 0.103, 0.105, 0.088, 0.097]
 bandwidth = [5.73, 20.00, 24.00, 26.97, 23.08, 23.08, 22.22, 25.26, 27.59, 25.53, 23.08, 22.43, 25.81, 23.30, 22.86, 27.27, 24.74]
 speedup = [1.00, 3.49, 4.19, 4.71, 4.03, 4.03, 3.88, 4.41, 4.82, 4.46, 4.03, 3.92, 4.51, 4.07, 3.99, 4.76, 4.32]
+time_err = bandwidth_err = speedup_err = None
+
+# `--host`/`--batch`/`--latest` plot a stored sweep (see `python -m bench history`)
+records = store.from_argv("exp7")
+placements = {}
+if records:
+    # Placement / first-touch sweeps store several variants: the main curves show
+    # the one with the highest peak bandwidth, the bandwidth plots show them all
+    variants = runner.by_variant(records)
+    best = min(variants, key=lambda v: min(r.time for r in variants[v]))
+    placements = {v: ([r.threads for r in rs], [3 * r.size * 8 / 1e9 / r.time for r in rs])
+                  for v, rs in variants.items()} if len(variants) > 1 else {}
+    records = variants[best]
+    cores = [r.threads for r in records]
+    time = [r.time for r in records]
+    # Bandwidth and speedup from the median time, with 95% CI error bars
+    gbytes = [3 * r.size * 8 / 1e9 for r in records]
+    bandwidth = [g / t for g, t in zip(gbytes, time)]
+    bandwidth_err = [[bw - g / r.metrics["time_ci_high"] for bw, g, r in zip(bandwidth, gbytes, records)],
+                     [g / r.metrics["time_ci_low"] - bw for bw, g, r in zip(bandwidth, gbytes, records)]]
+    speedup = [r.metrics["speedup"] for r in records]
+    time_err = stats.error_bars(records)
+    speedup_err = stats.error_bars(records, "speedup")
 
 # Create figure with 3 subplots
 fig, (ax1, ax2, ax3) = plt.subplots(1, 3, figsize=(18, 5))
 
 # 1. Execution Time vs Cores
-ax1.plot(cores, time, 'o-', color='red', linewidth=2, markersize=8, label='Execution Time')
+ax1.errorbar(cores, time, yerr=time_err, fmt='o-', capsize=4, color='red', linewidth=2, markersize=8, label='Execution Time')
 ax1.set_xlabel('Number of Cores', fontsize=12)
 ax1.set_ylabel('Execution Time (seconds)', fontsize=12)
 ax1.set_title('Execution Time vs Number of Cores', fontsize=13, fontweight='bold')
@@ -23,7 +51,9 @@ for i, (c, t) in enumerate(zip(cores, time)):
     ax1.text(c, t + 0.02, f'{t:.3f}s', ha='center', fontsize=9)
 
 # 2. Memory Bandwidth vs Cores
-ax2.plot(cores, bandwidth, 'o-', color='blue', linewidth=2, markersize=8, label='Bandwidth')
+ax2.errorbar(cores, bandwidth, yerr=bandwidth_err, fmt='o-', capsize=4, color='blue', linewidth=2, markersize=8, label='Bandwidth')
+for v, (v_cores, v_bandwidth) in placements.items():
+    ax2.plot(v_cores, v_bandwidth, '.--', linewidth=1, alpha=0.6, label=v)
 ax2.axhline(y=max(bandwidth), color='green', linestyle='--', alpha=0.5, label=f'Peak: {max(bandwidth):.2f} GB/s')
 ax2.set_xlabel('Number of Cores', fontsize=12)
 ax2.set_ylabel('Bandwidth (GB/s)', fontsize=12)
@@ -37,7 +67,7 @@ for i, (c, bw) in enumerate(zip(cores, bandwidth)):
     ax2.text(c, bw + 0.3, f'{bw:.2f}', ha='center', fontsize=9)
 
 # 3. Speedup vs Cores
-ax3.plot(cores, speedup, 'o-', color='green', linewidth=2, markersize=8, label='Actual Speedup')
+ax3.errorbar(cores, speedup, yerr=speedup_err, fmt='o-', capsize=4, color='green', linewidth=2, markersize=8, label='Actual Speedup')
 ax3.plot(cores, cores, '--', color='gray', linewidth=1.5, label='Ideal Linear Speedup')
 ax3.set_xlabel('Number of Cores', fontsize=12)
 ax3.set_ylabel('Speedup', fontsize=12)
@@ -59,7 +89,7 @@ print("Combined plot saved as 'triad_benchmark_results.png'")
 # Individual detailed plots
 # 1. Execution Time
 plt.figure(figsize=(10, 6))
-plt.plot(cores, time, 'o-', color='red', linewidth=3, markersize=10)
+plt.errorbar(cores, time, yerr=time_err, fmt='o-', capsize=4, color='red', linewidth=3, markersize=10)
 plt.fill_between(cores, 0, time, alpha=0.3, color='lightcoral')
 plt.xlabel('Number of Cores', fontsize=12)
 plt.ylabel('Execution Time (seconds)', fontsize=12)
@@ -76,8 +106,10 @@ plt.show()
 
 # 2. Memory Bandwidth
 plt.figure(figsize=(10, 6))
-plt.plot(cores, bandwidth, 'o-', color='blue', linewidth=3, markersize=10)
+plt.errorbar(cores, bandwidth, yerr=bandwidth_err, fmt='o-', capsize=4, color='blue', linewidth=3, markersize=10)
 plt.fill_between(cores, 0, bandwidth, alpha=0.3, color='skyblue')
+for v, (v_cores, v_bandwidth) in placements.items():
+    plt.plot(v_cores, v_bandwidth, '.--', linewidth=1.5, alpha=0.7, label=v)
 plt.axhline(y=max(bandwidth), color='red', linestyle='--', linewidth=2, 
             label=f'Peak Bandwidth: {max(bandwidth):.2f} GB/s')
 plt.xlabel('Number of Cores', fontsize=12)
@@ -96,7 +128,7 @@ plt.show()
 
 # 3. Speedup Analysis
 plt.figure(figsize=(10, 6))
-plt.plot(cores, speedup, 'o-', color='green', linewidth=3, markersize=10, label='Actual Speedup')
+plt.errorbar(cores, speedup, yerr=speedup_err, fmt='o-', capsize=4, color='green', linewidth=3, markersize=10, label='Actual Speedup')
 plt.plot(cores, cores, '--', color='red', linewidth=2, alpha=0.7, label='Ideal Linear Speedup')
 plt.fill_between(cores, speedup, alpha=0.3, color='lightgreen')
 plt.xlabel('Number of Cores', fontsize=12)
@@ -109,16 +141,12 @@ plt.xticks(cores)
 for c, s in zip(cores, speedup):
     plt.text(c, s + 0.2, f'{s:.2f}x', ha='center', fontsize=10, fontweight='bold')
 
-# Add efficiency annotations
-efficiency_2 = (speedup[1] / 2) * 100
-efficiency_9 = (speedup[8] / 9) * 100
-efficiency_17 = (speedup[-1] / 17) * 100
-plt.text(2, speedup[1] - 0.5, f'Efficiency: {efficiency_2:.1f}%', ha='center', fontsize=9, 
-         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
-plt.text(9, speedup[8] + 0.3, f'Efficiency: {efficiency_9:.1f}%', ha='center', fontsize=9,
-         bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.8))
-plt.text(17, speedup[-1] - 0.5, f'Efficiency: {efficiency_17:.1f}%', ha='center', fontsize=9,
-         bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.8))
+# Add efficiency annotations at 2, 9 and 17 cores, where those were measured
+for c, offset, color in [(2, -0.5, 'wheat'), (9, 0.3, 'lightgreen'), (17, -0.5, 'lightcoral')]:
+    if c in cores:
+        s = speedup[cores.index(c)]
+        plt.text(c, s + offset, f'Efficiency: {s / c * 100:.1f}%', ha='center', fontsize=9,
+                 bbox=dict(boxstyle='round', facecolor=color, alpha=0.8))
 
 plt.tight_layout()
 plt.savefig('speedup_vs_cores.png', dpi=300, bbox_inches='tight')
@@ -147,6 +175,12 @@ plt.tight_layout()
 plt.savefig('efficiency_vs_cores.png', dpi=300, bbox_inches='tight')
 plt.show()
 
+if placements:
+    print("\nPeak bandwidth per variant:")
+    for v, (v_cores, v_bandwidth) in sorted(placements.items(), key=lambda item: -max(item[1][1])):
+        peak = max(v_bandwidth)
+        print(f"  {v:<36} {peak:6.2f} GB/s at {v_cores[v_bandwidth.index(peak)]} cores")
+
 print("\nAll individual plots saved:")
 print("- execution_time_vs_cores.png")
 print("- bandwidth_vs_cores.png")
@@ -0,0 +1,65 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from bench import store, working_set
+
+# Working-set sweep from `python -m bench sizes` (latest stored sweep by default)
+records = store.from_argv(working_set.EXPERIMENT, sys.argv[1:] or ["--latest"])
+
+sizes = sorted({r.size for r in records})
+threads = sorted({r.threads for r in records})
+working_set_mb = [n * working_set.BYTES_PER_ELEMENT / 2**20 for n in sizes]
+bandwidth = np.full((len(threads), len(sizes)), np.nan)
+for r in records:
+    bandwidth[threads.index(r.threads), sizes.index(r.size)] = r.metrics["bandwidth"]
+caches = {key[len("cache_"):]: value for key, value in records[0].metrics.items()
+          if key.startswith("cache_")}
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 6))
+
+# 1. Bandwidth vs working-set size, one curve per thread count
+colors = plt.cm.viridis(np.linspace(0, 0.9, len(threads)))
+for row, p, color in zip(bandwidth, threads, colors):
+    ax1.plot(working_set_mb, row, 'o-', color=color, linewidth=2, markersize=5, label=f'{p} threads')
+for level, size in sorted(caches.items()):
+    ax1.axvline(x=size / 2**20, color='gray', linestyle='--', alpha=0.6)
+    ax1.text(size / 2**20, ax1.get_ylim()[1] * 0.97, f' {level}', fontsize=10, va='top')
+ax1.set_xscale('log')
+ax1.set_xlabel('Working Set (MB, log scale)', fontsize=12)
+ax1.set_ylabel('Bandwidth (GB/s)', fontsize=12)
+ax1.set_title('Triad Bandwidth vs Working-Set Size', fontsize=13, fontweight='bold')
+ax1.grid(True, alpha=0.3, which='both')
+ax1.legend(fontsize=9, ncol=2)
+
+# 2. Bandwidth surface: threads x working-set size
+mesh = ax2.pcolormesh(np.arange(len(sizes) + 1), np.arange(len(threads) + 1), bandwidth,
+                      cmap='magma', shading='flat')
+fig.colorbar(mesh, ax=ax2, label='Bandwidth (GB/s)')
+ax2.set_xticks(np.arange(len(sizes)) + 0.5)
+ax2.set_xticklabels([f'{mb:.3g}' for mb in working_set_mb], rotation=60, fontsize=8)
+ax2.set_yticks(np.arange(len(threads)) + 0.5)
+ax2.set_yticklabels(threads)
+ax2.set_xlabel('Working Set (MB)', fontsize=12)
+ax2.set_ylabel('Number of Threads', fontsize=12)
+ax2.set_title('Bandwidth Surface (Threads x Working Set)', fontsize=13, fontweight='bold')
+
+plt.tight_layout()
+plt.savefig('bandwidth_vs_working_set.png', dpi=300, bbox_inches='tight')
+plt.show()
+
+print("Working-set plot saved as 'bandwidth_vs_working_set.png'")
+
+# Peak bandwidth per cache regime
+edges = [0] + sorted(caches.values()) + [np.inf]
+names = sorted(caches, key=caches.get) + ['DRAM']
+print(f"\n{'Regime':<8} {'Peak BW (GB/s)':<16} {'Threads':<8}")
+for name, low, high in zip(names, edges, edges[1:]):
+    cols = [i for i, n in enumerate(sizes) if low < n * working_set.BYTES_PER_ELEMENT <= high]
+    if not cols:
+        continue
+    block = bandwidth[:, cols]
+    row, _ = np.unravel_index(np.nanargmax(block), block.shape)
+    print(f"{name:<8} {np.nanmax(block):<16.2f} {threads[row]:<8}")
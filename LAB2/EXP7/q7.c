@@ -1,36 +1,92 @@
 #include <omp.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
-int main() {
+#include "../lib/counters.h"
+
+// --first-touch: allocate and initialise the arrays in parallel with the same
+// static partition as the triad loop, once per thread count, so every page is
+// placed on the NUMA node of the thread that later reads/writes it.
+void init_arrays(double **A, double **B, double **C, long long N, int threads, int first_touch) {
+    *A = (double*)malloc(N * sizeof(double));
+    *B = (double*)malloc(N * sizeof(double));
+    *C = (double*)malloc(N * sizeof(double));
+    double *a = *A, *b = *B, *c = *C;
+
+    if (first_touch) {
+        #pragma omp parallel for schedule(static) num_threads(threads)
+        for (long long i = 0; i < N; i++) {
+            a[i] = 0.0;
+            b[i] = 1.1;
+            c[i] = 2.2;
+        }
+    } else {
+        for (long long i = 0; i < N; i++) {
+            a[i] = 0.0;
+            b[i] = 1.1;
+            c[i] = 2.2;
+        }
+    }
+}
+
+int main(int argc, char *argv[]) {
     long long N = 100000000; 
-    double *A = (double*)calloc(N, sizeof(double));
-    double *B = (double*)malloc(N * sizeof(double));
-    double *C = (double*)malloc(N * sizeof(double));
+    double *A = NULL, *B = NULL, *C = NULL;
     double scalar = 3.3;
 
-    for (long long i = 0; i < N; i++) {
-        B[i] = 1.1;
-        C[i] = 2.2;
+    // Thread counts to test: given on the command line, or 1..17 by default.
+    // --counters adds a 'Counters' line per run (see ../lib/counters.h).
+    int max_threads = 17;
+    int thread_list[64];
+    int num_runs = 0;
+    int first_touch = 0;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--first-touch") == 0) first_touch = 1;
+        else if (strcmp(argv[a], "--counters") == 0) counters_enabled = 1;
+        else if (num_runs < 64) thread_list[num_runs++] = atoi(argv[a]);
+    }
+    if (num_runs == 0) {
+        for (int t = 1; t <= max_threads; t++) thread_list[num_runs++] = t;
     }
 
-    int max_threads = 17;
+    if (!first_touch) init_arrays(&A, &B, &C, N, 1, 0);
 
     printf("Memory Bandwidth & Scalability Test (Triad Kernel)\n");
+    printf("Initialisation: %s\n", first_touch ? "first-touch" : "serial");
     printf("%-10s %-15s %-15s %s\n", "Cores", "Time (s)", "BW (GB/s)", "Speedup");
     printf("-------------------------------------------------------\n");
 
     double t_serial = 0;
+    struct counter_totals counts;
 
-    for (int threads = 1; threads <= max_threads; threads++) {
-        double start = omp_get_wtime();
+    for (int r = 0; r < num_runs; r++) {
+        int threads = thread_list[r];
+        if (first_touch) init_arrays(&A, &B, &C, N, threads, 1);
 
-        #pragma omp parallel for num_threads(threads)
-        for (long long i = 0; i < N; i++) {
-            A[i] = B[i] + scalar * C[i];
+        counters_reset(&counts);
+        double start = 0.0, end = 0.0;
+
+        // counters are opened and closed outside [start, end]
+        #pragma omp parallel num_threads(threads)
+        {
+            int fds[COUNTER_EVENTS];
+            counters_open(fds);
+            #pragma omp barrier
+            #pragma omp single
+            start = omp_get_wtime();
+            counters_start(fds);
+            #pragma omp for schedule(static) nowait
+            for (long long i = 0; i < N; i++) {
+                A[i] = B[i] + scalar * C[i];
+            }
+            counters_stop(fds);
+            #pragma omp barrier
+            #pragma omp single
+            end = omp_get_wtime();
+            counters_close(fds, &counts);
         }
 
-        double end = omp_get_wtime();
         double Tp = end - start;
 
         if (threads == 1) t_serial = Tp;
@@ -38,12 +94,21 @@ int main() {
         double total_data_gb = (3.0 * N * sizeof(double)) / 1e9;
         double BW = total_data_gb / Tp;
 
-        printf("%-10d %-15.6f %-15.2f %.2fx\n", threads, Tp, BW, t_serial / Tp);
+        printf("%-10d %-15.6f %-15.2f %.2fx\n", threads, Tp, BW, t_serial > 0 ? t_serial / Tp : 0.0);
+        counters_print("triad", threads, N, &counts);
+
+        if (first_touch) {
+            free(A);
+            free(B);
+            free(C);
+        }
     }
 
-    free(A);
-    free(B);
-    free(C);
+    if (!first_touch) {
+        free(A);
+        free(B);
+        free(C);
+    }
 
     return 0;
-}
\ No newline at end of file
+}
@@ -0,0 +1,55 @@
+// Coherence granularity of the data cache, detected at runtime, and buffers
+// aligned to it.
+#ifndef CACHELINE_H
+#define CACHELINE_H
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <unistd.h>
+#ifdef _WIN32
+#include <malloc.h>
+#endif
+
+// sysconf, then sysfs, then the common 64 bytes; *source (if not NULL) says
+// where the value came from.
+static long cache_line_size(const char **source) {
+    const char *from = "sysconf";
+    long line = 0;
+#ifdef _SC_LEVEL1_DCACHE_LINESIZE
+    line = sysconf(_SC_LEVEL1_DCACHE_LINESIZE);
+#endif
+    if (line <= 0) {
+        FILE *f = fopen("/sys/devices/system/cpu/cpu0/cache/index0/coherency_line_size", "r");
+        from = "sysfs";
+        if (!f || fscanf(f, "%ld", &line) != 1) line = 0;
+        if (f) fclose(f);
+    }
+    if (line <= 0) {
+        line = 64;
+        from = "default";
+    }
+    if (source) *source = from;
+    return line;
+}
+
+// `bytes` bytes starting on an `align` boundary (a power of two, at least
+// sizeof(void*)), or NULL; release with aligned_release.  C11 aligned_alloc
+// is missing from MSVCRT, which MinGW builds link against.
+static void *aligned_buffer(size_t align, size_t bytes) {
+#ifdef _WIN32
+    return _aligned_malloc(bytes, align);
+#else
+    void *p = NULL;
+    return posix_memalign(&p, align, bytes) == 0 ? p : NULL;
+#endif
+}
+
+static void aligned_release(void *p) {
+#ifdef _WIN32
+    _aligned_free(p);
+#else
+    free(p);
+#endif
+}
+
+#endif
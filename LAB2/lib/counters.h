@@ -0,0 +1,142 @@
+// Per-thread hardware/software event counters through perf_event_open(2).
+//
+// Each thread opens its own counters inside a parallel region
+// (counters_open), starts and stops them around the measured loop
+// (counters_start / counters_stop) and adds them to shared totals before the
+// region ends (counters_close), so OpenMP's pooled threads are counted
+// without relying on inherit.  Opening and closing are syscalls per thread
+// and event: callers keep them outside the timed window.  Hardware events
+// count user space only, which perf_event_paranoid <= 2 allows for
+// unprivileged users; software events such as context switches are counted
+// whole (a switch happens in the kernel, so excluding it would read 0).
+// Events the CPU or hypervisor does not expose are skipped and left out of
+// the printed line.
+//
+// Output, one line per measured region:
+//   Counters <label> <threads>: iterations=N cycles=... instructions=... ...
+//
+// perf_event_open is Linux-only; elsewhere the functions are no-ops and every
+// event is reported as unavailable, so --counters prints no event counts.
+#ifndef COUNTERS_H
+#define COUNTERS_H
+
+#include <stdio.h>
+#include <string.h>
+
+#ifdef __linux__
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+#define COUNTER_EVENTS 7
+
+static const char *counter_names[COUNTER_EVENTS] = {
+    "cycles", "instructions", "cache-references", "cache-misses",
+    "LLC-loads", "LLC-stores", "context-switches"
+};
+
+struct counter_totals {
+    long long value[COUNTER_EVENTS];
+    int available[COUNTER_EVENTS];
+};
+
+static int counters_enabled = 0;
+
+static void counters_reset(struct counter_totals *t) {
+    memset(t, 0, sizeof(*t));
+}
+
+#ifdef __linux__
+
+#define LLC(op) (PERF_COUNT_HW_CACHE_LL | (op) << 8 | PERF_COUNT_HW_CACHE_RESULT_ACCESS << 16)
+
+// in counter_names order
+static const struct {
+    unsigned int type;
+    unsigned long long config;
+} counter_events[COUNTER_EVENTS] = {
+    {PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES},
+    {PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS},
+    {PERF_TYPE_HARDWARE, PERF_COUNT_HW_CACHE_REFERENCES},
+    {PERF_TYPE_HARDWARE, PERF_COUNT_HW_CACHE_MISSES},
+    {PERF_TYPE_HW_CACHE, LLC(PERF_COUNT_HW_CACHE_OP_READ)},
+    {PERF_TYPE_HW_CACHE, LLC(PERF_COUNT_HW_CACHE_OP_WRITE)},
+    {PERF_TYPE_SOFTWARE, PERF_COUNT_SW_CONTEXT_SWITCHES},
+};
+
+// Open this thread's counters, stopped; fds[i] < 0 for unavailable events.
+static void counters_open(int fds[COUNTER_EVENTS]) {
+    for (int e = 0; e < COUNTER_EVENTS; e++) {
+        fds[e] = -1;
+        if (!counters_enabled) continue;
+        struct perf_event_attr attr;
+        memset(&attr, 0, sizeof(attr));
+        attr.size = sizeof(attr);
+        attr.type = counter_events[e].type;
+        attr.config = counter_events[e].config;
+        attr.disabled = 1;
+        if (attr.type == PERF_TYPE_HARDWARE || attr.type == PERF_TYPE_HW_CACHE) {
+            attr.exclude_kernel = 1;
+            attr.exclude_hv = 1;
+        }
+        attr.read_format = PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+        fds[e] = (int)syscall(SYS_perf_event_open, &attr, 0, -1, -1, 0);
+    }
+}
+
+static void counters_start(const int fds[COUNTER_EVENTS]) {
+    for (int e = 0; e < COUNTER_EVENTS; e++)
+        if (fds[e] >= 0) ioctl(fds[e], PERF_EVENT_IOC_ENABLE, 0);
+}
+
+static void counters_stop(const int fds[COUNTER_EVENTS]) {
+    for (int e = 0; e < COUNTER_EVENTS; e++)
+        if (fds[e] >= 0) ioctl(fds[e], PERF_EVENT_IOC_DISABLE, 0);
+}
+
+// Add this thread's (stopped) counters, scaled for multiplexing, to t and
+// close them.
+static void counters_close(int fds[COUNTER_EVENTS], struct counter_totals *t) {
+    for (int e = 0; e < COUNTER_EVENTS; e++) {
+        if (fds[e] < 0) continue;
+        unsigned long long data[3];  // value, time enabled, time running
+        if (read(fds[e], data, sizeof(data)) == sizeof(data) && data[2] > 0) {
+            long long value = (long long)((double)data[0] * data[1] / data[2]);
+            #pragma omp atomic
+            t->value[e] += value;
+            #pragma omp atomic write
+            t->available[e] = 1;
+        }
+        close(fds[e]);
+    }
+}
+
+#else
+
+static void counters_open(int fds[COUNTER_EVENTS]) {
+    for (int e = 0; e < COUNTER_EVENTS; e++) fds[e] = -1;
+}
+
+static void counters_start(const int fds[COUNTER_EVENTS]) { (void)fds; }
+
+static void counters_stop(const int fds[COUNTER_EVENTS]) { (void)fds; }
+
+static void counters_close(int fds[COUNTER_EVENTS], struct counter_totals *t) {
+    (void)fds;
+    (void)t;
+}
+
+#endif
+
+static void counters_print(const char *label, int threads, long long iterations,
+                           const struct counter_totals *t) {
+    if (!counters_enabled) return;
+    printf("Counters %s %d: iterations=%lld", label, threads, iterations);
+    for (int e = 0; e < COUNTER_EVENTS; e++)
+        if (t->available[e]) printf(" %s=%lld", counter_names[e], t->value[e]);
+    printf("\n");
+}
+
+#endif
@@ -0,0 +1,174 @@
+// LAB2 kernels as a shared library for in-process benchmarking.
+//
+// The arrays are owned by the caller (NumPy), so one allocation can serve a
+// whole sweep. Every kernel takes the thread count and an OpenMP schedule
+// (kind as in omp_sched_t: 1 static, 2 dynamic, 3 guided, 4 auto; chunk 0 =
+// runtime default) and returns the elapsed time of the measured loop only.
+//
+// Build: gcc -O2 -fopenmp -shared -fPIC kernels.c -o libkernels.so
+
+#include <omp.h>
+
+static void set_schedule(int kind, int chunk) {
+    omp_set_schedule((omp_sched_t)kind, chunk);
+}
+
+// Parallel fill with the static partition used by the kernels (first touch)
+void fill(double *A, long long n, double value, int threads) {
+    #pragma omp parallel for schedule(static) num_threads(threads)
+    for (long long i = 0; i < n; i++) {
+        A[i] = value;
+    }
+}
+
+// EXP1/EXP2: C[i] = A[i] + B[i]
+double vector_add(const double *A, const double *B, double *C, long long n,
+                  int threads, int kind, int chunk) {
+    set_schedule(kind, chunk);
+    double start = omp_get_wtime();
+
+    #pragma omp parallel for schedule(runtime) num_threads(threads)
+    for (long long i = 0; i < n; i++) {
+        C[i] = A[i] + B[i];
+    }
+
+    return omp_get_wtime() - start;
+}
+
+// EXP7: A[i] = B[i] + scalar * C[i]
+double triad(double *A, const double *B, const double *C, double scalar, long long n,
+             int threads, int kind, int chunk) {
+    set_schedule(kind, chunk);
+    double start = omp_get_wtime();
+
+    #pragma omp parallel for schedule(runtime) num_threads(threads)
+    for (long long i = 0; i < n; i++) {
+        A[i] = B[i] + scalar * C[i];
+    }
+
+    return omp_get_wtime() - start;
+}
+
+// EXP3: pi by midpoint integration of 4 / (1 + x^2) over [0, 1]
+double pi_integrate(long long steps, int threads, int kind, int chunk, double *pi) {
+    set_schedule(kind, chunk);
+    double step = 1.0 / (double)steps;
+    double sum = 0.0;
+    double start = omp_get_wtime();
+
+    #pragma omp parallel for schedule(runtime) num_threads(threads) reduction(+:sum)
+    for (long long i = 0; i < steps; i++) {
+        double x = (i + 0.5) * step;
+        sum += 4.0 / (1.0 + x * x);
+    }
+
+    double elapsed = omp_get_wtime() - start;
+    *pi = sum * step;
+    return elapsed;
+}
+
+// EXP5: q5.c's two ways of adding 1.0 n times into one shared sum (no array
+// traffic): a critical section around every update, and reduction(+), which
+// only combines the per-thread partial sums at the end.
+double critical_sum(long long n, int threads, int kind, int chunk, double *total) {
+    set_schedule(kind, chunk);
+    double sum = 0.0;
+    double start = omp_get_wtime();
+
+    #pragma omp parallel for schedule(runtime) num_threads(threads)
+    for (long long i = 0; i < n; i++) {
+        #pragma omp critical
+        sum += 1.0;
+    }
+
+    double elapsed = omp_get_wtime() - start;
+    *total = sum;
+    return elapsed;
+}
+
+double reduce_sum(long long n, int threads, int kind, int chunk, double *total) {
+    set_schedule(kind, chunk);
+    double sum = 0.0;
+    double start = omp_get_wtime();
+
+    #pragma omp parallel for schedule(runtime) num_threads(threads) reduction(+:sum)
+    for (long long i = 0; i < n; i++) {
+        sum += 1.0;
+    }
+
+    double elapsed = omp_get_wtime() - start;
+    *total = sum;
+    return elapsed;
+}
+
+// EXP7 working-set sweep: `passes` back-to-back triads inside one parallel
+// region, so small (cache-resident) arrays run long enough to time. Returns
+// the total time; divide by `passes` for the time of one triad.
+double triad_passes(double *A, const double *B, const double *C, double scalar, long long n,
+                    int threads, int kind, int chunk, int passes) {
+    set_schedule(kind, chunk);
+    double start = omp_get_wtime();
+
+    #pragma omp parallel num_threads(threads)
+    for (int p = 0; p < passes; p++) {
+        #pragma omp for schedule(runtime)
+        for (long long i = 0; i < n; i++) {
+            A[i] = B[i] + scalar * C[i];
+        }
+    }
+
+    return omp_get_wtime() - start;
+}
+
+// Roofline compute ceiling: every thread runs FLOP_CHAINS independent
+// multiply-add chains (no memory traffic), enough to keep the vector units
+// busy. *flops receives the number of floating-point operations executed.
+//
+// The chains are cloned for x86-64-v3 like the LAB1 blocked GEMM and the LAB7
+// sort kernels, so the ceiling uses the same AVX2/FMA units as the fastest
+// kernels on the plot (the plain -O2 build is SSE2 only), and they are held
+// in vector registers: an array the compiler spills to the stack would bound
+// the loop by store forwarding rather than by the FMA units.  target_clones
+// needs ifunc, i.e. GCC >= 11 on x86-64 Linux.
+#define FLOP_CHAINS 32
+
+typedef double vec4 __attribute__((vector_size(4 * sizeof(double))));
+
+#if defined(__x86_64__) && defined(__linux__) && __GNUC__ >= 11
+#define TARGET_CLONES __attribute__((target_clones("arch=x86-64-v3", "default")))
+#else
+#define TARGET_CLONES
+#endif
+
+// a function of its own: OpenMP outlines the parallel region's body, which a
+// clone of peak_flops would not cover
+TARGET_CLONES
+static double flop_chains(long long iterations) {
+    vec4 acc[FLOP_CHAINS / 4];
+    for (int v = 0; v < FLOP_CHAINS / 4; v++)
+        for (int j = 0; j < 4; j++) acc[v][j] = 1.0 + (v * 4 + j) * 1e-3;
+
+    for (long long it = 0; it < iterations; it++) {
+        #pragma GCC unroll 8
+        for (int v = 0; v < FLOP_CHAINS / 4; v++) {
+            acc[v] = acc[v] * 0.999999 + 1e-6;
+        }
+    }
+
+    double sum = 0.0;
+    for (int v = 0; v < FLOP_CHAINS / 4; v++)
+        for (int j = 0; j < 4; j++) sum += acc[v][j];
+    return sum;
+}
+
+double peak_flops(int threads, long long iterations, double *flops) {
+    double sink = 0.0;
+    double start = omp_get_wtime();
+
+    #pragma omp parallel num_threads(threads) reduction(+:sink)
+    sink += flop_chains(iterations);
+
+    double elapsed = omp_get_wtime() - start;
+    *flops = 2.0 * FLOP_CHAINS * iterations * threads + (sink < 0 ? 1 : 0);
+    return elapsed;
+}
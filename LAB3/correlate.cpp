@@ -1,5 +1,39 @@
+#include <algorithm>
 #include <cmath>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <new>
+#include <utility>
+#include <vector>
 #include <omp.h>
+#ifdef _WIN32
+#include <malloc.h>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
+
+// C linkage so that the kernels can also be loaded with ctypes
+// (bench/correlation.py).
+extern "C" {
+void correlate_seq(int ny, int nx, const float* data, float* result);
+void correlate_omp(int ny, int nx, const float* data, float* result);
+void correlate_fast(int ny, int nx, const float* data, float* result);
+void correlate_blocked(int ny, int nx, const float* data, float* result);
+void correlate_packed(int ny, int nx, const float* data, float* result);
+long correlate_stream(const char* input, long long offset, int ny, int nx,
+                      const char* output, long long budget);
+long long correlate_threshold(int ny, int nx, const float* data, double threshold,
+                              int** rows, int** cols, float** values);
+void correlate_release(void* memory);
+void correlate_topk(int ny, int nx, const float* data, int k, int* partners, float* values);
+void correlate_accumulate(int ny, int k, const float* batch, const double* shift, double sign,
+                          double* sums, double* cross);
+void correlate_finish(int ny, long long n, const double* sums, const double* cross,
+                      float* result);
+}
 
 // Sequential implementation of correlation matrix computation
 void correlate_seq(int ny, int nx, const float* data, float* result) {
@@ -109,3 +143,595 @@ void correlate_fast(int ny, int nx, const float* data, float* result) {
 
     delete[] norm;
 }
+
+// Cache-blocked version with register tiling.
+//
+// Rows are normalised into a contiguous, zero-padded array of 4-double
+// vectors, so every dot product runs over whole vectors and the padding adds
+// nothing.  The lower triangle is split into blocks of BLOCK_ROWS x BLOCK_ROWS
+// row pairs, handed out dynamically one block pair at a time.  Within a block
+// pair the columns are walked in slices of BLOCK_VECTORS vectors, small enough
+// that the slices of all 2 * BLOCK_ROWS rows stay in L2, and each slice is
+// consumed by TILE x TILE register tiles: TILE rows of i and TILE rows of j
+// are loaded once per vector and feed TILE * TILE independent accumulators.
+typedef double double4_t __attribute__((vector_size(4 * sizeof(double))));
+
+static const int TILE = 3;
+static const int BLOCK_ROWS = 16 * TILE;
+static const int BLOCK_VECTORS = 64;
+
+static inline double hsum(const double4_t& v) {
+    return (v[0] + v[1]) + (v[2] + v[3]);
+}
+
+// Row buffers aligned for double4_t; release with free_rows.  MSVCRT (MinGW)
+// has neither posix_memalign nor aligned_alloc.
+static double4_t* alloc_rows(long rows, int nv) {
+    size_t bytes = static_cast<size_t>(rows) * nv * sizeof(double4_t);
+#ifdef _WIN32
+    void* memory = _aligned_malloc(bytes, sizeof(double4_t));
+    if (!memory)
+        throw std::bad_alloc();
+#else
+    void* memory = nullptr;
+    if (posix_memalign(&memory, sizeof(double4_t), bytes) != 0)
+        throw std::bad_alloc();
+#endif
+    return static_cast<double4_t*>(memory);
+}
+
+static void free_rows(double4_t* rows) {
+#ifdef _WIN32
+    _aligned_free(rows);
+#else
+    free(rows);
+#endif
+}
+
+// Normalises the first `valid` of `rows` rows of data into norm (nv vectors
+// per row); the remaining rows and the padding columns are zero.
+static void normalise(const float* data, long rows, long valid, int nx, int nv, double4_t* norm) {
+    #pragma omp parallel for schedule(static)
+    for (long y = 0; y < rows; y++) {
+        double4_t* row = norm + y * nv;
+        for (int v = 0; v < nv; v++)
+            row[v] = double4_t{0.0, 0.0, 0.0, 0.0};
+        if (y >= valid)
+            continue;
+
+        const float* in = data + y * nx;
+        double mean = 0.0;
+        for (int x = 0; x < nx; x++)
+            mean += in[x];
+        mean /= nx;
+
+        double sq = 0.0;
+        for (int x = 0; x < nx; x++) {
+            double d = in[x] - mean;
+            row[x / 4][x % 4] = d;
+            sq += d * d;
+        }
+
+        double inv = 1.0 / std::sqrt(sq);
+        for (int v = 0; v < nv; v++)
+            row[v] *= inv;
+    }
+}
+
+// sums[r * BLOCK_ROWS + c] = dot product of row r of block a and row c of
+// block b; on a diagonal block (a == b) only tiles with c <= r are filled.
+static void block_pair(const double4_t* a, const double4_t* b, int nv, bool diagonal,
+                       double* sums) {
+    std::fill(sums, sums + BLOCK_ROWS * BLOCK_ROWS, 0.0);
+    for (int v0 = 0; v0 < nv; v0 += BLOCK_VECTORS) {
+        int v1 = std::min(v0 + BLOCK_VECTORS, nv);
+        for (int ti = 0; ti < BLOCK_ROWS; ti += TILE) {
+            // on the diagonal block only tiles with tj <= ti are needed
+            int tj_end = diagonal ? ti + TILE : BLOCK_ROWS;
+            for (int tj = 0; tj < tj_end; tj += TILE) {
+                const double4_t* ra = a + static_cast<long>(ti) * nv;
+                const double4_t* rb = b + static_cast<long>(tj) * nv;
+                double4_t acc[TILE][TILE] = {};
+                for (int v = v0; v < v1; v++) {
+                    double4_t av[TILE], bv[TILE];
+                    for (int r = 0; r < TILE; r++) {
+                        av[r] = ra[r * nv + v];
+                        bv[r] = rb[r * nv + v];
+                    }
+                    for (int r = 0; r < TILE; r++)
+                        for (int c = 0; c < TILE; c++)
+                            acc[r][c] += av[r] * bv[c];
+                }
+                for (int r = 0; r < TILE; r++)
+                    for (int c = 0; c < TILE; c++)
+                        sums[(ti + r) * BLOCK_ROWS + tj + c] += hsum(acc[r][c]);
+            }
+        }
+    }
+}
+
+// Passes the lower-triangle entries (i, j), j <= i < ny, of the block pair
+// starting at rows (i0, j0) to store(i, j, value).
+template <typename Store>
+static void store_block(const double* sums, int i0, int j0, int ny, Store store) {
+    for (int r = 0; r < BLOCK_ROWS && i0 + r < ny; r++) {
+        int i = i0 + r;
+        for (int c = 0; c < BLOCK_ROWS && j0 + c <= i; c++)
+            store(i, j0 + c, sums[r * BLOCK_ROWS + c]);
+    }
+}
+
+// Runs the blocked kernel and stores correlation (i, j), j <= i, at
+// result[index(i, j)], which lets the dense and packed layouts share it.
+template <typename Index>
+static void blocked(int ny, int nx, const float* data, float* result, Index index) {
+    int nv = (nx + 3) / 4;                                        // vectors per row
+    int nb = (ny + BLOCK_ROWS - 1) / BLOCK_ROWS;                  // row blocks
+    long padded = static_cast<long>(nb) * BLOCK_ROWS;             // rows incl. zero rows
+    double4_t* norm = alloc_rows(padded, nv);
+    normalise(data, padded, ny, nx, nv, norm);
+
+    std::vector<std::pair<int, int>> pairs;
+    for (int bi = 0; bi < nb; bi++)
+        for (int bj = 0; bj <= bi; bj++)
+            pairs.push_back(std::make_pair(bi, bj));
+
+    #pragma omp parallel
+    {
+        std::vector<double> sums(BLOCK_ROWS * BLOCK_ROWS);
+
+        #pragma omp for schedule(dynamic)
+        for (size_t p = 0; p < pairs.size(); p++) {
+            int i0 = pairs[p].first * BLOCK_ROWS;
+            int j0 = pairs[p].second * BLOCK_ROWS;
+            block_pair(norm + static_cast<long>(i0) * nv, norm + static_cast<long>(j0) * nv,
+                       nv, i0 == j0, sums.data());
+            store_block(sums.data(), i0, j0, ny, [&](int i, int j, double value) {
+                result[index(i, j)] = static_cast<float>(value);
+            });
+        }
+    }
+
+    free_rows(norm);
+}
+
+void correlate_blocked(int ny, int nx, const float* data, float* result) {
+    blocked(ny, nx, data, result, [ny](int i, int j) {
+        return i + static_cast<long long>(j) * ny;
+    });
+}
+
+// Packed lower triangle: row i holds correlations (i, 0..i) contiguously at
+// result[i * (i + 1) / 2], ny * (ny + 1) / 2 floats in total.
+void correlate_packed(int ny, int nx, const float* data, float* result) {
+    blocked(ny, nx, data, result, [](int i, int j) {
+        return static_cast<long long>(i) * (i + 1) / 2 + j;
+    });
+}
+
+// Out-of-core streaming maps its input and output files (mmap, madvise),
+// which Windows builds do not have: there correlate_stream only reports that.
+#ifndef _WIN32
+
+// Rows per stripe of correlate_stream: the largest multiple of BLOCK_ROWS
+// whose working set fits in `budget` bytes (at least one block).
+static long stream_stripe_rows(int ny, int nx, long long budget) {
+    long nv = (nx + 3) / 4;
+    long per_row = 2 * nv * sizeof(double4_t) + 4L * nx + 4L * ny;
+    long rows = budget / per_row / BLOCK_ROWS * BLOCK_ROWS;
+    long all = (ny + BLOCK_ROWS - 1) / BLOCK_ROWS * BLOCK_ROWS;
+    return std::max(static_cast<long>(BLOCK_ROWS), std::min(rows, all));
+}
+
+// Writes back and unmaps the pages covering [start, start + bytes); they are
+// read in again from the file if touched later.
+static void drop_pages(const void* start, size_t bytes) {
+    static const uintptr_t page = sysconf(_SC_PAGESIZE);
+    uintptr_t first = reinterpret_cast<uintptr_t>(start) / page * page;
+    uintptr_t last = reinterpret_cast<uintptr_t>(start) + bytes;
+    msync(reinterpret_cast<void*>(first), last - first, MS_SYNC);
+    madvise(reinterpret_cast<void*>(first), last - first, MADV_DONTNEED);
+}
+
+// Out-of-core version: the input is a memory-mapped file of ny x nx float32
+// values starting `offset` bytes in, the output the packed lower triangle in
+// a memory-mapped file (as written by correlate --output).
+//
+// Rows are processed in stripes of a whole number of blocks.  For every
+// stripe i the stripe itself and then each stripe j <= i is normalised into
+// one of two buffers (earlier stripes are renormalised rather than kept,
+// which costs ny / stripe_rows extra passes over the input), and the block
+// pairs between them are computed as in correlate_blocked.  Input pages are
+// dropped from the mapping once a stripe is normalised and output pages once
+// the stripe's rows are written, so the resident memory is about
+//     stripe_rows * (2 * 8 * nx + 4 * nx + 4 * ny)
+// bytes: two normalised stripes, one stripe of input and one stripe of output
+// rows, with stripe_rows chosen to keep this within `budget`.
+//
+// Returns the rows per stripe, or -1 (after printing the error) if a file could
+// not be opened or mapped.
+long correlate_stream(const char* input, long long offset, int ny, int nx,
+                      const char* output, long long budget) {
+    size_t in_bytes = offset + static_cast<size_t>(ny) * nx * sizeof(float);
+    size_t out_bytes = static_cast<size_t>(ny) * (ny + 1) / 2 * sizeof(float);
+
+    int in_fd = open(input, O_RDONLY);
+    if (in_fd < 0) {
+        perror(input);
+        return -1;
+    }
+    void* in_map = mmap(nullptr, in_bytes, PROT_READ, MAP_SHARED, in_fd, 0);
+    close(in_fd);
+    if (in_map == MAP_FAILED) {
+        perror(input);
+        return -1;
+    }
+    int out_fd = open(output, O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (out_fd < 0 || ftruncate(out_fd, out_bytes) != 0) {
+        perror(output);
+        if (out_fd >= 0) close(out_fd);
+        munmap(in_map, in_bytes);
+        return -1;
+    }
+    void* out_map = mmap(nullptr, out_bytes, PROT_READ | PROT_WRITE, MAP_SHARED, out_fd, 0);
+    close(out_fd);
+    if (out_map == MAP_FAILED) {
+        perror(output);
+        munmap(in_map, in_bytes);
+        return -1;
+    }
+
+    const float* data = reinterpret_cast<const float*>(static_cast<const char*>(in_map) + offset);
+    float* result = static_cast<float*>(out_map);
+    auto packed = [](int i, int j) { return static_cast<long long>(i) * (i + 1) / 2 + j; };
+
+    int nv = (nx + 3) / 4;
+    long stripe = stream_stripe_rows(ny, nx, budget);
+    int blocks = stripe / BLOCK_ROWS;
+    double4_t* a = alloc_rows(stripe, nv);
+    double4_t* b = alloc_rows(stripe, nv);
+
+    // normalise the rows [y0, y0 + stripe) into buf and release their input pages
+    auto load = [&](long y0, double4_t* buf) {
+        long valid = std::min(stripe, ny - y0);
+        normalise(data + y0 * nx, stripe, valid, nx, nv, buf);
+        drop_pages(data + y0 * nx, valid * nx * sizeof(float));
+    };
+
+    for (long i0 = 0; i0 < ny; i0 += stripe) {
+        load(i0, a);
+        for (long j0 = 0; j0 <= i0; j0 += stripe) {
+            bool diagonal = i0 == j0;
+            if (!diagonal)
+                load(j0, b);
+            const double4_t* other = diagonal ? a : b;
+
+            #pragma omp parallel
+            {
+                std::vector<double> sums(BLOCK_ROWS * BLOCK_ROWS);
+
+                #pragma omp for collapse(2) schedule(dynamic)
+                for (int bi = 0; bi < blocks; bi++) {
+                    for (int bj = 0; bj < blocks; bj++) {
+                        int i = i0 + bi * BLOCK_ROWS;
+                        int j = j0 + bj * BLOCK_ROWS;
+                        if (i >= ny || j > i)
+                            continue;
+                        block_pair(a + static_cast<long>(bi) * BLOCK_ROWS * nv,
+                                   other + static_cast<long>(bj) * BLOCK_ROWS * nv,
+                                   nv, i == j, sums.data());
+                        store_block(sums.data(), i, j, ny, [&](int r, int c, double value) {
+                            result[packed(r, c)] = static_cast<float>(value);
+                        });
+                    }
+                }
+            }
+        }
+        long i1 = std::min(i0 + stripe, static_cast<long>(ny));
+        drop_pages(result + packed(i0, 0), (packed(i1, 0) - packed(i0, 0)) * sizeof(float));
+    }
+
+    free_rows(a);
+    free_rows(b);
+    munmap(out_map, out_bytes);
+    munmap(in_map, in_bytes);
+    return stripe;
+}
+
+#else
+
+long correlate_stream(const char* input, long long, int, int, const char*, long long) {
+    fprintf(stderr, "%s: out-of-core streaming needs mmap and is not available on Windows\n",
+            input);
+    return -1;
+}
+
+#endif
+
+// Incremental correlation: running per-row sums plus the packed lower
+// triangle of pairwise cross products (whose diagonal holds the sums of
+// squares), all of values shifted by a fixed per-row reference (e.g. the
+// first batch's means) so the differences in correlate_finish do not cancel
+// catastrophically.  The caller owns the accumulators (see
+// bench/correlation.py); new columns are added with sign = +1 and columns
+// leaving a sliding window are removed with sign = -1, each in O(ny^2 * k)
+// through the blocked kernel.
+//
+// batch is ny x k (row-major, k new samples per row).
+void correlate_accumulate(int ny, int k, const float* batch, const double* shift, double sign,
+                          double* sums, double* cross) {
+    int nv = (k + 3) / 4;
+    int nb = (ny + BLOCK_ROWS - 1) / BLOCK_ROWS;
+    long padded = static_cast<long>(nb) * BLOCK_ROWS;
+    double4_t* rows = alloc_rows(padded, nv);
+
+    #pragma omp parallel for schedule(static)
+    for (long y = 0; y < padded; y++) {
+        double4_t* row = rows + y * nv;
+        for (int v = 0; v < nv; v++)
+            row[v] = double4_t{0.0, 0.0, 0.0, 0.0};
+        if (y >= ny)
+            continue;
+        double sum = 0.0;
+        for (int x = 0; x < k; x++) {
+            double d = batch[x + y * k] - shift[y];
+            row[x / 4][x % 4] = d;
+            sum += d;
+        }
+        sums[y] += sign * sum;
+    }
+
+    std::vector<std::pair<int, int>> pairs;
+    for (int bi = 0; bi < nb; bi++)
+        for (int bj = 0; bj <= bi; bj++)
+            pairs.push_back(std::make_pair(bi, bj));
+
+    #pragma omp parallel
+    {
+        std::vector<double> dots(BLOCK_ROWS * BLOCK_ROWS);
+
+        #pragma omp for schedule(dynamic)
+        for (size_t p = 0; p < pairs.size(); p++) {
+            int i0 = pairs[p].first * BLOCK_ROWS;
+            int j0 = pairs[p].second * BLOCK_ROWS;
+            block_pair(rows + static_cast<long>(i0) * nv, rows + static_cast<long>(j0) * nv,
+                       nv, i0 == j0, dots.data());
+            store_block(dots.data(), i0, j0, ny, [&](int i, int j, double value) {
+                cross[static_cast<long long>(i) * (i + 1) / 2 + j] += sign * value;
+            });
+        }
+    }
+
+    free_rows(rows);
+}
+
+// Packed correlations of the n samples in the accumulators:
+//     r(i, j) = (C_ij - S_i S_j / n) / sqrt((C_ii - S_i^2 / n) (C_jj - S_j^2 / n))
+void correlate_finish(int ny, long long n, const double* sums, const double* cross,
+                      float* result) {
+    std::vector<double> inv(ny);
+    for (int i = 0; i < ny; i++) {
+        double squares = cross[static_cast<long long>(i) * (i + 3) / 2];
+        inv[i] = 1.0 / std::sqrt(squares - sums[i] * sums[i] / n);
+    }
+
+    #pragma omp parallel for schedule(dynamic, 64)
+    for (int i = 0; i < ny; i++) {
+        long long row = static_cast<long long>(i) * (i + 1) / 2;
+        double mean_i = sums[i] / n;
+        for (int j = 0; j <= i; j++)
+            result[row + j] = static_cast<float>((cross[row + j] - mean_i * sums[j]) * inv[i] * inv[j]);
+    }
+}
+
+// Sparse queries: the pairs with |r| >= threshold, or the k partners with the
+// largest |r| of every row, computed tile by tile without a ny x ny result.
+//
+// Rows are normalised as in correlate_blocked.  rest[y * (slices + 1) + s] is
+// the norm of row y from column slice s on, so after slice s the dot product
+// of rows i and j can change by at most rest_i * rest_j (Cauchy-Schwarz).  A
+// TILE x TILE tile is dropped as soon as every pair in it is below its row's
+// limit even with that much left -- the threshold, or the k-th best |r| found
+// so far for the row -- which skips most of the columns of weakly correlated
+// pairs.  Both queries visit the lower triangle only; for top-k a pair
+// (i, j) is offered to the heaps of both rows, under a per-row lock, and a
+// tile is dropped only once it is below the limits of both of its rows.
+struct Partner {
+    float strength;   // |r|
+    float value;
+    int j;
+};
+
+// heap order: the weakest partner on top
+static bool weaker(const Partner& a, const Partner& b) {
+    return a.strength > b.strength;
+}
+
+static void query(int ny, int nx, const float* data, double threshold, int k,
+                  std::vector<std::vector<Partner>>& heaps,
+                  std::vector<std::vector<std::pair<long long, float>>>& found) {
+    int nv = (nx + 3) / 4;
+    int nb = (ny + BLOCK_ROWS - 1) / BLOCK_ROWS;
+    long padded = static_cast<long>(nb) * BLOCK_ROWS;
+    int slices = (nv + BLOCK_VECTORS - 1) / BLOCK_VECTORS;
+    double4_t* norm = alloc_rows(padded, nv);
+    normalise(data, padded, ny, nx, nv, norm);
+
+    std::vector<double> rest(padded * (slices + 1));
+    #pragma omp parallel for schedule(static)
+    for (long y = 0; y < padded; y++) {
+        double* r = &rest[y * (slices + 1)];
+        r[slices] = 0.0;
+        double sq = 0.0;
+        for (int s = slices - 1; s >= 0; s--) {
+            for (int v = s * BLOCK_VECTORS; v < std::min((s + 1) * BLOCK_VECTORS, nv); v++) {
+                double4_t x = norm[y * nv + v] * norm[y * nv + v];
+                sq += hsum(x);
+            }
+            r[s] = std::sqrt(sq);
+        }
+    }
+
+    const int tiles = BLOCK_ROWS / TILE;
+    found.assign(omp_get_max_threads(), std::vector<std::pair<long long, float>>());
+    std::vector<omp_lock_t> locks(k ? ny : 0);
+    for (size_t y = 0; y < locks.size(); y++)
+        omp_init_lock(&locks[y]);
+
+    #pragma omp parallel
+    {
+        std::vector<double> sums(BLOCK_ROWS * BLOCK_ROWS);
+        std::vector<char> live(tiles * tiles);
+        std::vector<double> limit_i(BLOCK_ROWS), limit_j(BLOCK_ROWS);
+        std::vector<std::pair<long long, float>>& mine = found[omp_get_thread_num()];
+
+        // the smallest |r| row y still accepts
+        auto limit = [&](int y) {
+            if (!k)
+                return threshold;
+            if (y >= ny)
+                return 2.0;   // zero padding rows
+            omp_set_lock(&locks[y]);
+            double l = static_cast<int>(heaps[y].size()) == k ? heaps[y].front().strength : -1.0;
+            omp_unset_lock(&locks[y]);
+            return l;
+        };
+        auto offer = [&](int y, int partner, float value) {
+            Partner p{std::fabs(value), value, partner};
+            omp_set_lock(&locks[y]);
+            if (static_cast<int>(heaps[y].size()) < k) {
+                heaps[y].push_back(p);
+                std::push_heap(heaps[y].begin(), heaps[y].end(), weaker);
+            } else if (p.strength > heaps[y].front().strength) {
+                std::pop_heap(heaps[y].begin(), heaps[y].end(), weaker);
+                heaps[y].back() = p;
+                std::push_heap(heaps[y].begin(), heaps[y].end(), weaker);
+            }
+            omp_unset_lock(&locks[y]);
+        };
+
+        #pragma omp for schedule(dynamic)
+        for (int bi = 0; bi < nb; bi++) {
+            int i0 = bi * BLOCK_ROWS;
+            for (int bj = 0; bj <= bi; bj++) {
+                int j0 = bj * BLOCK_ROWS;
+                bool diagonal = bi == bj;
+                for (int r = 0; r < BLOCK_ROWS; r++) {
+                    limit_i[r] = limit(i0 + r);
+                    limit_j[r] = limit(j0 + r);
+                }
+                std::fill(sums.begin(), sums.end(), 0.0);
+                std::fill(live.begin(), live.end(), 1);
+
+                for (int s = 0; s < slices; s++) {
+                    int v0 = s * BLOCK_VECTORS, v1 = std::min(v0 + BLOCK_VECTORS, nv);
+                    for (int ti = 0; ti < BLOCK_ROWS; ti += TILE) {
+                        int tj_end = diagonal ? ti + TILE : BLOCK_ROWS;
+                        for (int tj = 0; tj < tj_end; tj += TILE) {
+                            char& alive = live[(ti / TILE) * tiles + tj / TILE];
+                            if (!alive)
+                                continue;
+                            const double4_t* ra = norm + static_cast<long>(i0 + ti) * nv;
+                            const double4_t* rb = norm + static_cast<long>(j0 + tj) * nv;
+                            double4_t acc[TILE][TILE] = {};
+                            for (int v = v0; v < v1; v++) {
+                                double4_t av[TILE], bv[TILE];
+                                for (int r = 0; r < TILE; r++) {
+                                    av[r] = ra[r * nv + v];
+                                    bv[r] = rb[r * nv + v];
+                                }
+                                for (int r = 0; r < TILE; r++)
+                                    for (int c = 0; c < TILE; c++)
+                                        acc[r][c] += av[r] * bv[c];
+                            }
+                            bool prune = true;
+                            for (int r = 0; r < TILE; r++) {
+                                double rest_i = rest[(i0 + ti + r) * (slices + 1) + s + 1];
+                                for (int c = 0; c < TILE; c++) {
+                                    double& sum = sums[(ti + r) * BLOCK_ROWS + tj + c];
+                                    sum += hsum(acc[r][c]);
+                                    double rest_j = rest[(j0 + tj + c) * (slices + 1) + s + 1];
+                                    double bound = std::fabs(sum) + rest_i * rest_j;
+                                    if (bound >= std::min(limit_i[ti + r], limit_j[tj + c]))
+                                        prune = false;
+                                }
+                            }
+                            if (prune)
+                                alive = 0;
+                        }
+                    }
+                }
+
+                for (int r = 0; r < BLOCK_ROWS && i0 + r < ny; r++) {
+                    int i = i0 + r;
+                    for (int c = 0; c < BLOCK_ROWS && j0 + c < i; c++) {
+                        int j = j0 + c;
+                        if (!live[(r / TILE) * tiles + c / TILE])
+                            continue;
+                        float value = static_cast<float>(sums[r * BLOCK_ROWS + c]);
+                        if (k) {
+                            offer(i, j, value);
+                            offer(j, i, value);
+                        } else if (std::fabs(value) >= threshold) {
+                            mine.push_back(std::make_pair(static_cast<long long>(i) * ny + j, value));
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    for (size_t y = 0; y < locks.size(); y++)
+        omp_destroy_lock(&locks[y]);
+    free_rows(norm);
+}
+
+// Pairs (i, j), j < i, with |r| >= threshold.  The n results are returned in
+// malloc'd arrays (*rows, *cols, *values), which the caller releases with
+// correlate_release.  Returns n.
+long long correlate_threshold(int ny, int nx, const float* data, double threshold,
+                              int** rows, int** cols, float** values) {
+    std::vector<std::vector<Partner>> heaps;
+    std::vector<std::vector<std::pair<long long, float>>> found;
+    query(ny, nx, data, threshold, 0, heaps, found);
+
+    long long n = 0;
+    for (size_t t = 0; t < found.size(); t++)
+        n += found[t].size();
+    *rows = static_cast<int*>(malloc(std::max(n, 1LL) * sizeof(int)));
+    *cols = static_cast<int*>(malloc(std::max(n, 1LL) * sizeof(int)));
+    *values = static_cast<float*>(malloc(std::max(n, 1LL) * sizeof(float)));
+    long long o = 0;
+    for (size_t t = 0; t < found.size(); t++) {
+        for (size_t p = 0; p < found[t].size(); p++, o++) {
+            (*rows)[o] = static_cast<int>(found[t][p].first / ny);
+            (*cols)[o] = static_cast<int>(found[t][p].first % ny);
+            (*values)[o] = found[t][p].second;
+        }
+    }
+    return n;
+}
+
+void correlate_release(void* memory) {
+    free(memory);
+}
+
+// The k partners j != i with the largest |r| of every row i, strongest first:
+// partners[i * k + m] and values[i * k + m] (signed r).  Rows with fewer than
+// k partners (ny <= k) are padded with -1 and NaN.
+void correlate_topk(int ny, int nx, const float* data, int k, int* partners, float* values) {
+    std::vector<std::vector<Partner>> heaps(ny);
+    std::vector<std::vector<std::pair<long long, float>>> found;
+    query(ny, nx, data, 0.0, k, heaps, found);
+
+    #pragma omp parallel for schedule(dynamic, 64)
+    for (int i = 0; i < ny; i++) {
+        std::sort_heap(heaps[i].begin(), heaps[i].end(), weaker);
+        int found_k = static_cast<int>(heaps[i].size());
+        for (int m = 0; m < k; m++) {
+            long long o = static_cast<long long>(i) * k + m;
+            partners[o] = m < found_k ? heaps[i][m].j : -1;
+            values[o] = m < found_k ? heaps[i][m].value : NAN;
+        }
+    }
+}
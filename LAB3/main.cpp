@@ -4,27 +4,88 @@
 #include <cstring>
 #include <iomanip>
 #include <omp.h>
+#ifndef _WIN32
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <unistd.h>
+#endif
 
+extern "C" {
 void correlate_seq(int ny, int nx, const float* data, float* result);
 void correlate_omp(int ny, int nx, const float* data, float* result);
 void correlate_fast(int ny, int nx, const float* data, float* result);
+void correlate_blocked(int ny, int nx, const float* data, float* result);
+void correlate_packed(int ny, int nx, const float* data, float* result);
+}
+
+// Computes the packed lower triangle straight into a memory-mapped file of
+// ny * (ny + 1) / 2 raw float32 values, readable with np.memmap (see
+// bench/correlation.py).  Pages are written back by the kernel as needed, so
+// the output may be larger than RAM.  Needs mmap: not available on Windows.
+#ifdef _WIN32
+static bool write_packed(const char* path, int, int, const float*) {
+    std::cerr << path << ": --output needs mmap and is not available on Windows\n";
+    return false;
+}
+#else
+static bool write_packed(const char* path, int ny, int nx, const float* data) {
+    size_t bytes = static_cast<size_t>(ny) * (ny + 1) / 2 * sizeof(float);
+    int fd = open(path, O_RDWR | O_CREAT | O_TRUNC, 0644);
+    if (fd < 0 || ftruncate(fd, bytes) != 0) {
+        perror(path);
+        if (fd >= 0) close(fd);
+        return false;
+    }
+    void* map = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+    close(fd);
+    if (map == MAP_FAILED) {
+        perror(path);
+        return false;
+    }
+    correlate_packed(ny, nx, data, static_cast<float*>(map));
+    munmap(map, bytes);
+    return true;
+}
+#endif
 
 int main(int argc, char* argv[]) {
     if (argc < 3) {
-        std::cout << "Usage: ./correlate <ny> <nx>\n";
+        std::cout << "Usage: ./correlate <ny> <nx> [--output FILE]\n";
         return 1;
     }
 
     int ny = std::atoi(argv[1]);
     int nx = std::atoi(argv[2]);
+    const char* output = nullptr;
+    if (argc >= 5 && std::strcmp(argv[3], "--output") == 0)
+        output = argv[4];
 
-    float* data = new float[ny * nx];
-    float* result = new float[ny * ny];
+    size_t elements = static_cast<size_t>(ny) * nx;
+    float* data = new float[elements];
 
     // Fill matrix with random values
-    for (int i = 0; i < ny * nx; i++)
+    for (size_t i = 0; i < elements; i++)
         data[i] = static_cast<float>(rand()) / RAND_MAX;
 
+    // --output only writes the packed triangle: no dense ny x ny result and
+    // no timing table, which is what makes sizes beyond RAM possible
+    if (output) {
+        omp_set_num_threads(omp_get_num_procs());
+        auto start = std::chrono::high_resolution_clock::now();
+        bool written = write_packed(output, ny, nx, data);
+        auto end = std::chrono::high_resolution_clock::now();
+        delete[] data;
+        if (!written)
+            return 1;
+        std::cout << "Packed lower triangle written to " << output << " ("
+                  << static_cast<size_t>(ny) * (ny + 1) / 2 << " floats) in "
+                  << std::fixed << std::setprecision(6)
+                  << std::chrono::duration<double>(end - start).count() << " sec\n";
+        return 0;
+    }
+
+    float* result = new float[static_cast<size_t>(ny) * ny];
+
     // Thread counts to test
     int thread_counts[] = {1, 2, 4, 8, 10};
     int num_tests = 5;
@@ -33,6 +94,7 @@ int main(int argc, char* argv[]) {
     double seq_time = 0.0;
     double omp_times[5];
     double fast_times[5];
+    double blocked_times[5];
 
     std::cout << "\n" << std::string(80, '=') << "\n";
     std::cout << "Parallel Correlation Matrix Computation - Performance Analysis\n";
@@ -47,7 +109,7 @@ int main(int argc, char* argv[]) {
     seq_time = std::chrono::duration<double>(end - start).count();
     std::cout << "Sequential Time: " << seq_time << " sec\n\n";
 
-    // Run OpenMP and Fast with different thread counts
+    // Run OpenMP, Fast and Blocked with different thread counts
     for (int i = 0; i < num_tests; i++) {
         int threads = thread_counts[i];
         omp_set_num_threads(threads);
@@ -65,8 +127,15 @@ int main(int argc, char* argv[]) {
         correlate_fast(ny, nx, data, result);
         end = std::chrono::high_resolution_clock::now();
         fast_times[i] = std::chrono::duration<double>(end - start).count();
+
+        // Blocked version
+        start = std::chrono::high_resolution_clock::now();
+        correlate_blocked(ny, nx, data, result);
+        end = std::chrono::high_resolution_clock::now();
+        blocked_times[i] = std::chrono::duration<double>(end - start).count();
         
-        std::cout << "  OpenMP: " << omp_times[i] << " sec, Fast: " << fast_times[i] << " sec\n";
+        std::cout << "  OpenMP: " << omp_times[i] << " sec, Fast: " << fast_times[i]
+                  << " sec, Blocked: " << blocked_times[i] << " sec\n";
     }
 
     // Print results table
@@ -79,6 +148,7 @@ int main(int argc, char* argv[]) {
               << std::right << std::setw(12) << "Sequential"
               << std::setw(12) << "OpenMP"
               << std::setw(12) << "Fast"
+              << std::setw(12) << "Blocked"
               << std::setw(12) << "Speedup"
               << std::setw(12) << "Efficiency"
               << "\n";
@@ -95,6 +165,7 @@ int main(int argc, char* argv[]) {
                   << std::setw(12) << seq_time
                   << std::setw(12) << omp_times[i]
                   << std::setw(12) << fast_times[i]
+                  << std::setw(12) << blocked_times[i]
                   << std::setprecision(2)
                   << std::setw(11) << speedup << "x"
                   << std::setw(11) << efficiency << "%"
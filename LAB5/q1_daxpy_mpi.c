@@ -1,9 +1,91 @@
 #include <mpi.h>
+#include <omp.h>
+#include <math.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
 #define N 65536 // 2^16
+#define CHUNKS 16
 
+// Hybrid mode: instead of rank 0 filling X and Y and scattering them, every
+// rank initialises its own slice with OpenMP threads (first touch, with the
+// same static partition as the compute loop) and updates it in `chunks`
+// pieces.  Each finished piece is sent towards rank 0 with MPI_Igatherv
+// straight into its place in X (displacement rank * local_n), so gathering
+// earlier pieces overlaps computing later ones.  Returns the max error of
+// the gathered X on rank 0.
+double hybrid_daxpy(int n, double a, int chunks, double *compute_time, double *wait_time) {
+    int rank, size;
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+    int local_n = n / size;
+    int piece = (local_n + chunks - 1) / chunks;
+    long long offset = (long long)rank * local_n;
+
+    double *local_X = (double*)malloc(local_n * sizeof(double));
+    double *local_Y = (double*)malloc(local_n * sizeof(double));
+    double *X = NULL;
+    int *counts = (int*)malloc((long long)chunks * size * sizeof(int));   // per piece, per rank
+    int *displs = (int*)malloc(size * sizeof(int));
+    MPI_Request *requests = (MPI_Request*)malloc(chunks * sizeof(MPI_Request));
+    if (rank == 0) X = (double*)malloc((long long)local_n * size * sizeof(double));
+    for (int r = 0; r < size; r++) displs[r] = r * local_n;
+
+    for (int c = 0; c < chunks; c++) {
+        int lo = c * piece < local_n ? c * piece : local_n;
+        int hi = lo + piece < local_n ? lo + piece : local_n;
+        #pragma omp parallel for schedule(static)
+        for (int i = lo; i < hi; i++) {
+            local_X[i] = (offset + i) * 1.0;
+            local_Y[i] = (offset + i) * 2.0;
+        }
+    }
+    MPI_Barrier(MPI_COMM_WORLD);
+
+    double start = MPI_Wtime();
+    for (int c = 0; c < chunks; c++) {
+        int lo = c * piece < local_n ? c * piece : local_n;
+        int hi = lo + piece < local_n ? lo + piece : local_n;
+        #pragma omp parallel for schedule(static)
+        for (int i = lo; i < hi; i++) {
+            local_X[i] = a * local_X[i] + local_Y[i];
+        }
+        // piece c has the same length on every rank; its counts must stay
+        // untouched until the gather completes
+        int *piece_counts = counts + (long long)c * size;
+        for (int r = 0; r < size; r++) piece_counts[r] = hi - lo;
+        MPI_Igatherv(local_X + lo, hi - lo, MPI_DOUBLE, rank == 0 ? X + lo : NULL, piece_counts,
+                     displs, MPI_DOUBLE, 0, MPI_COMM_WORLD, &requests[c]);
+        int done;
+        MPI_Testall(c + 1, requests, &done, MPI_STATUSES_IGNORE);
+    }
+    *compute_time = MPI_Wtime() - start;
+
+    start = MPI_Wtime();
+    MPI_Waitall(chunks, requests, MPI_STATUSES_IGNORE);
+    *wait_time = MPI_Wtime() - start;
+
+    double max_error = 0.0;
+    if (rank == 0) {
+        for (long long i = 0; i < (long long)local_n * size; i++) {
+            double error = fabs(X[i] - (a * i + 2.0 * i));
+            if (error > max_error) max_error = error;
+        }
+        free(X);
+    }
+    free(local_X);
+    free(local_Y);
+    free(counts);
+    free(displs);
+    free(requests);
+    return max_error;
+}
+
+// q1_daxpy_mpi [n] [--hybrid] [--chunks K]
+//   n: vector length (default 2^16)
+//   --hybrid: OpenMP inside each rank (OMP_NUM_THREADS), pipelined gather
+//   --chunks: pieces per rank in hybrid mode (default 16)
 int main(int argc, char** argv) {
     MPI_Init(&argc, &argv);
 
@@ -11,18 +93,56 @@ int main(int argc, char** argv) {
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
     MPI_Comm_size(MPI_COMM_WORLD, &size);
 
+    int n = N;
+    int hybrid = 0;
+    int chunks = CHUNKS;
+    for (int arg = 1; arg < argc; arg++) {
+        if (strcmp(argv[arg], "--hybrid") == 0) hybrid = 1;
+        else if (strcmp(argv[arg], "--chunks") == 0 && arg + 1 < argc) chunks = atoi(argv[++arg]);
+        else n = atoi(argv[arg]);
+    }
+
     double a = 2.5;
+
+    if (hybrid) {
+        double compute_time, wait_time;
+        double max_error = hybrid_daxpy(n, a, chunks, &compute_time, &wait_time);
+
+        // slowest rank
+        double local_times[2] = {compute_time, wait_time}, times[2];
+        MPI_Reduce(local_times, times, 2, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD);
+
+        if (rank == 0) {
+            long long elements = (long long)(n / size) * size;
+            double kernel_time = times[0] + times[1];
+            printf("Processes: %d\n", size);
+            printf("Threads per process: %d\n", omp_get_max_threads());
+            printf("Mode: hybrid (%d chunks, pipelined MPI_Igatherv)\n", chunks);
+            printf("Elements: %lld\n", elements);
+            printf("Compute time: %f seconds\n", times[0]);
+            printf("Gather wait: %f seconds\n", times[1]);
+            printf("Max error: %g\n", max_error);
+            printf("Kernel time: %f seconds\n", kernel_time);
+            // read X and Y, write X
+            printf("Bandwidth: %.2f GB/s\n", 3.0 * sizeof(double) * elements / kernel_time / 1e9);
+            printf("Process 0: Execution time = %f seconds\n", kernel_time);
+        }
+
+        MPI_Finalize();
+        return 0;
+    }
+
     double *X = NULL;
     double *Y = NULL;
-    int local_n = N / size;
+    int local_n = n / size;
 
     double *local_X = (double*)malloc(local_n * sizeof(double));
     double *local_Y = (double*)malloc(local_n * sizeof(double));
 
     if (rank == 0) {
-        X = (double*)malloc(N * sizeof(double));
-        Y = (double*)malloc(N * sizeof(double));
-        for (int i = 0; i < N; i++) {
+        X = (double*)malloc(n * sizeof(double));
+        Y = (double*)malloc(n * sizeof(double));
+        for (int i = 0; i < n; i++) {
             X[i] = i * 1.0;
             Y[i] = i * 2.0;
         }
@@ -42,6 +162,7 @@ int main(int argc, char** argv) {
     double end_time = MPI_Wtime();
 
     if (rank == 0) {
+        printf("Processes: %d\n", size);
         printf("Process 0: Execution time = %f seconds\n", end_time - start_time);
         free(X);
         free(Y);
@@ -1,9 +1,78 @@
 #include <mpi.h>
+#include <omp.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
 
 #define TOTAL_ELEMENTS 500000000 // 500 million
+#define CHUNKS 16
 
+// Hybrid mode: every rank runs OpenMP threads over its slice, and the slice
+// is processed in `chunks` pieces.  Each piece is initialised with the same
+// static partition that later reads it (first touch: the pages land on the
+// NUMA node of the thread that uses them), and as soon as a piece's partial
+// sum is ready its MPI_Iallreduce is started, so the reductions of earlier
+// pieces proceed while later pieces are computed.  The per-piece results
+// are added in piece order, so every rank ends up with the same value.
+double hybrid_dot(long long local_elements, double multiplier, int chunks,
+                  double *init_time, double *compute_time, double *wait_time) {
+    double *local_A = (double*)malloc(local_elements * sizeof(double));
+    double *local_B = (double*)malloc(local_elements * sizeof(double));
+    double *partial = (double*)malloc(chunks * sizeof(double));
+    double *reduced = (double*)malloc(chunks * sizeof(double));
+    MPI_Request *requests = (MPI_Request*)malloc(chunks * sizeof(MPI_Request));
+    long long piece = (local_elements + chunks - 1) / chunks;
+
+    double start = MPI_Wtime();
+    for (int c = 0; c < chunks; c++) {
+        long long lo = c * piece;
+        long long hi = lo + piece < local_elements ? lo + piece : local_elements;
+        #pragma omp parallel for schedule(static)
+        for (long long i = lo; i < hi; i++) {
+            local_A[i] = 1.0;
+            local_B[i] = 2.0 * multiplier;
+        }
+    }
+    MPI_Barrier(MPI_COMM_WORLD);
+    *init_time = MPI_Wtime() - start;
+
+    start = MPI_Wtime();
+    for (int c = 0; c < chunks; c++) {
+        long long lo = c * piece;
+        long long hi = lo + piece < local_elements ? lo + piece : local_elements;
+        double sum = 0.0;
+        #pragma omp parallel for schedule(static) reduction(+:sum)
+        for (long long i = lo; i < hi; i++) {
+            sum += local_A[i] * local_B[i];
+        }
+        partial[c] = sum;
+        MPI_Iallreduce(&partial[c], &reduced[c], 1, MPI_DOUBLE, MPI_SUM, MPI_COMM_WORLD,
+                       &requests[c]);
+        // give the library a chance to progress the reductions in flight
+        int done;
+        MPI_Testall(c + 1, requests, &done, MPI_STATUSES_IGNORE);
+    }
+    *compute_time = MPI_Wtime() - start;
+
+    start = MPI_Wtime();
+    MPI_Waitall(chunks, requests, MPI_STATUSES_IGNORE);
+    *wait_time = MPI_Wtime() - start;
+
+    double global_dot = 0.0;
+    for (int c = 0; c < chunks; c++) global_dot += reduced[c];
+
+    free(local_A);
+    free(local_B);
+    free(partial);
+    free(reduced);
+    free(requests);
+    return global_dot;
+}
+
+// q3_dot_product [total_elements] [--hybrid] [--chunks K]
+//   total_elements: vector length over all ranks (default 500 million)
+//   --hybrid: OpenMP inside each rank (OMP_NUM_THREADS), pipelined reduction
+//   --chunks: pieces per rank in hybrid mode (default 16)
 int main(int argc, char** argv) {
     MPI_Init(&argc, &argv);
 
@@ -11,18 +80,59 @@ int main(int argc, char** argv) {
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
     MPI_Comm_size(MPI_COMM_WORLD, &size);
 
+    long long total_elements = TOTAL_ELEMENTS;
+    int hybrid = 0;
+    int chunks = CHUNKS;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--hybrid") == 0) hybrid = 1;
+        else if (strcmp(argv[a], "--chunks") == 0 && a + 1 < argc) chunks = atoi(argv[++a]);
+        else total_elements = atoll(argv[a]);
+    }
+
     double multiplier = 0.0;
     if (rank == 0) {
         multiplier = 2.5; // Hardcoded instead of prompt for automated runs
     }
 
+    if (hybrid) {
+        double start_time = MPI_Wtime();
+        MPI_Bcast(&multiplier, 1, MPI_DOUBLE, 0, MPI_COMM_WORLD);
+        long long local_elements = total_elements / size;
+        double init_time, compute_time, wait_time;
+        double global_dot = hybrid_dot(local_elements, multiplier, chunks,
+                                       &init_time, &compute_time, &wait_time);
+        double end_time = MPI_Wtime();
+
+        // slowest rank
+        double local_times[2] = {compute_time, wait_time}, times[2];
+        MPI_Reduce(local_times, times, 2, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD);
+
+        if (rank == 0) {
+            double kernel_time = times[0] + times[1];
+            printf("Processes: %d\n", size);
+            printf("Threads per process: %d\n", omp_get_max_threads());
+            printf("Mode: hybrid (%d chunks, pipelined MPI_Iallreduce)\n", chunks);
+            printf("Elements: %lld\n", local_elements * size);
+            printf("Init time: %f seconds\n", init_time);
+            printf("Compute time: %f seconds\n", times[0]);
+            printf("Reduction wait: %f seconds\n", times[1]);
+            printf("Final Dot Product: %f\n", global_dot);
+            printf("Kernel time: %f seconds\n", kernel_time);
+            printf("Bandwidth: %.2f GB/s\n", 2.0 * sizeof(double) * local_elements * size / kernel_time / 1e9);
+            printf("Time taken: %f seconds\n", end_time - start_time);
+        }
+
+        MPI_Finalize();
+        return 0;
+    }
+
     double start_time = MPI_Wtime();
 
     // 1. Initialization & Broadcast
     MPI_Bcast(&multiplier, 1, MPI_DOUBLE, 0, MPI_COMM_WORLD);
 
     // 2. Local Generation
-    long long local_elements = TOTAL_ELEMENTS / size;
+    long long local_elements = total_elements / size;
     double *local_A = (double*)malloc(local_elements * sizeof(double));
     double *local_B = (double*)malloc(local_elements * sizeof(double));
 
@@ -1,20 +1,38 @@
 #include <mpi.h>
 #include <stdio.h>
 #include <stdlib.h>
-#include <math.h>
+#include <string.h>
+
+#include "workqueue.h"
 
 #define MAX_VAL 1000
 
-int is_prime(int n) {
+int is_prime(long long n) {
     if (n <= 1) return 0;
     if (n <= 3) return 1;
     if (n % 2 == 0 || n % 3 == 0) return 0;
-    for (int i = 5; i * i <= n; i += 6) {
+    for (long long i = 5; i * i <= n; i += 6) {
         if (n % i == 0 || n % (i + 2) == 0) return 0;
     }
     return 1;
 }
 
+// Primes are only counted, so no values are sent back (capacity 0).
+long long count_primes(long long lo, long long hi, long long *found, int capacity) {
+    long long count = 0;
+    for (long long n = lo; n <= hi; n++) {
+        if (is_prime(n)) {
+            if (count < capacity) found[count] = n;
+            count++;
+        }
+    }
+    return count;
+}
+
+// q4_prime_finder [max_val] [--target-ms T] [--chunk C]
+//   max_val: test 2..max_val (default 1000)
+//   --target-ms: time a slave should spend on one range (default 20 ms)
+//   --chunk: size of each slave's first range (default 64)
 int main(int argc, char** argv) {
     MPI_Init(&argc, &argv);
 
@@ -22,52 +40,25 @@ int main(int argc, char** argv) {
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
     MPI_Comm_size(MPI_COMM_WORLD, &size);
 
-    if (rank == 0) {
-        // Master process
-        int current_num = 2;
-        int active_slaves = size - 1;
-        int msg;
-        MPI_Status status;
-
-        int primes[MAX_VAL];
-        int prime_count = 0;
-
-        while (active_slaves > 0) {
-            MPI_Recv(&msg, 1, MPI_INT, MPI_ANY_SOURCE, 0, MPI_COMM_WORLD, &status);
-            int slave_rank = status.MPI_SOURCE;
-
-            if (msg > 0) { // It's a prime
-                primes[prime_count++] = msg;
-            }
-
-            if (current_num <= MAX_VAL) {
-                MPI_Send(&current_num, 1, MPI_INT, slave_rank, 0, MPI_COMM_WORLD);
-                current_num++;
-            } else {
-                int terminate_signal = -1;
-                MPI_Send(&terminate_signal, 1, MPI_INT, slave_rank, 0, MPI_COMM_WORLD);
-                active_slaves--;
-            }
-        }
-
-        printf("Found %d primes up to %d\n", prime_count, MAX_VAL);
-    } else {
-        // Slave process
-        int msg = 0; // 0 indicates just starting
-        MPI_Send(&msg, 1, MPI_INT, 0, 0, MPI_COMM_WORLD);
+    long long max_val = MAX_VAL;
+    double target_ms = 20.0;
+    long long chunk = 64;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--target-ms") == 0 && a + 1 < argc) target_ms = atof(argv[++a]);
+        else if (strcmp(argv[a], "--chunk") == 0 && a + 1 < argc) chunk = atoll(argv[++a]);
+        else max_val = atoll(argv[a]);
+    }
 
-        int num_to_test;
-        while (1) {
-            MPI_Recv(&num_to_test, 1, MPI_INT, 0, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
-            if (num_to_test == -1) break; // Terminate signal
+    // Master hands out ranges of 2..max_val, slaves test them (see workqueue.h)
+    struct workqueue_stats stats;
+    workqueue_run(2, max_val, count_primes, 0, target_ms * 1e-3, chunk, NULL, 0, &stats);
 
-            if (is_prime(num_to_test)) {
-                msg = num_to_test;
-            } else {
-                msg = -num_to_test;
-            }
-            MPI_Send(&msg, 1, MPI_INT, 0, 0, MPI_COMM_WORLD);
-        }
+    if (rank == 0) {
+        printf("Found %lld primes up to %lld\n", stats.found, max_val);
+        printf("Time: %.4f s on %d ranks, %.3e numbers/s\n",
+               stats.seconds, size, (max_val - 1) / stats.seconds);
+        printf("Chunks: %lld (sizes %lld..%lld, target %.1f ms)\n",
+               stats.chunks, stats.min_chunk, stats.max_chunk, target_ms);
     }
 
     MPI_Finalize();
@@ -1,13 +1,17 @@
 #include <mpi.h>
 #include <stdio.h>
 #include <stdlib.h>
+#include <string.h>
+
+#include "workqueue.h"
 
 #define MAX_VAL 10000
+#define MAX_PERFECT 64
 
-int is_perfect(int n) {
+int is_perfect(long long n) {
     if (n <= 1) return 0;
-    int sum = 1;
-    for (int i = 2; i * i <= n; i++) {
+    long long sum = 1;
+    for (long long i = 2; i * i <= n; i++) {
         if (n % i == 0) {
             sum += i;
             if (i * i != n) {
@@ -18,6 +22,27 @@ int is_perfect(int n) {
     return sum == n;
 }
 
+// Perfect numbers are rare, so every one found goes back in the batch.
+long long find_perfect(long long lo, long long hi, long long *found, int capacity) {
+    long long count = 0;
+    for (long long n = lo; n <= hi; n++) {
+        if (is_perfect(n)) {
+            if (count < capacity) found[count] = n;
+            count++;
+        }
+    }
+    return count;
+}
+
+int compare_ll(const void *a, const void *b) {
+    long long x = *(const long long*)a, y = *(const long long*)b;
+    return (x > y) - (x < y);
+}
+
+// q5_perfect_numbers [max_val] [--target-ms T] [--chunk C]
+//   max_val: test 2..max_val (default 10000)
+//   --target-ms: time a slave should spend on one range (default 20 ms)
+//   --chunk: size of each slave's first range (default 64)
 int main(int argc, char** argv) {
     MPI_Init(&argc, &argv);
 
@@ -25,56 +50,33 @@ int main(int argc, char** argv) {
     MPI_Comm_rank(MPI_COMM_WORLD, &rank);
     MPI_Comm_size(MPI_COMM_WORLD, &size);
 
-    if (rank == 0) {
-        // Master process
-        int current_num = 2;
-        int active_slaves = size - 1;
-        int msg;
-        MPI_Status status;
-
-        int perfects[MAX_VAL];
-        int perfect_count = 0;
-
-        while (active_slaves > 0) {
-            MPI_Recv(&msg, 1, MPI_INT, MPI_ANY_SOURCE, 0, MPI_COMM_WORLD, &status);
-            int slave_rank = status.MPI_SOURCE;
-
-            if (msg > 0) { // It's a perfect number
-                perfects[perfect_count++] = msg;
-            }
+    long long max_val = MAX_VAL;
+    double target_ms = 20.0;
+    long long chunk = 64;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--target-ms") == 0 && a + 1 < argc) target_ms = atof(argv[++a]);
+        else if (strcmp(argv[a], "--chunk") == 0 && a + 1 < argc) chunk = atoll(argv[++a]);
+        else max_val = atoll(argv[a]);
+    }
 
-            if (current_num <= MAX_VAL) {
-                MPI_Send(&current_num, 1, MPI_INT, slave_rank, 0, MPI_COMM_WORLD);
-                current_num++;
-            } else {
-                int terminate_signal = -1;
-                MPI_Send(&terminate_signal, 1, MPI_INT, slave_rank, 0, MPI_COMM_WORLD);
-                active_slaves--;
-            }
-        }
+    // Master hands out ranges of 2..max_val, slaves test them (see workqueue.h)
+    long long perfects[MAX_PERFECT];
+    struct workqueue_stats stats;
+    workqueue_run(2, max_val, find_perfect, MAX_PERFECT, target_ms * 1e-3, chunk,
+                  perfects, MAX_PERFECT, &stats);
 
-        printf("Found perfect numbers up to %d: ", MAX_VAL);
-        for(int i = 0; i < perfect_count; i++) {
-            printf("%d ", perfects[i]);
+    if (rank == 0) {
+        // batches arrive in completion order
+        qsort(perfects, stats.stored, sizeof(long long), compare_ll);
+        printf("Found perfect numbers up to %lld: ", max_val);
+        for (long long i = 0; i < stats.stored; i++) {
+            printf("%lld ", perfects[i]);
         }
         printf("\n");
-    } else {
-        // Slave process
-        int msg = 0; // 0 indicates just starting
-        MPI_Send(&msg, 1, MPI_INT, 0, 0, MPI_COMM_WORLD);
-
-        int num_to_test;
-        while (1) {
-            MPI_Recv(&num_to_test, 1, MPI_INT, 0, 0, MPI_COMM_WORLD, MPI_STATUS_IGNORE);
-            if (num_to_test == -1) break; // Terminate signal
-
-            if (is_perfect(num_to_test)) {
-                msg = num_to_test;
-            } else {
-                msg = -num_to_test;
-            }
-            MPI_Send(&msg, 1, MPI_INT, 0, 0, MPI_COMM_WORLD);
-        }
+        printf("Time: %.4f s on %d ranks, %.3e numbers/s\n",
+               stats.seconds, size, (max_val - 1) / stats.seconds);
+        printf("Chunks: %lld (sizes %lld..%lld, target %.1f ms)\n",
+               stats.chunks, stats.min_chunk, stats.max_chunk, target_ms);
     }
 
     MPI_Finalize();
@@ -0,0 +1,213 @@
+#include <mpi.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define MAX_VAL 10000000
+#define SEGMENT 32768        // numbers per segment: 32 KiB of flags, 512 KiB of divisor sums
+#define MAX_PERFECT 64
+
+// Data-parallel alternative to the master-slave finders (q4, q5): instead of
+// testing every number independently in O(sqrt(n)), each rank owns one
+// contiguous block of 2..max_val and sieves it a cache-sized segment at a
+// time with the primes up to sqrt(max_val), which rank 0 computes and
+// broadcasts once.
+//   - primes: segmented Sieve of Eratosthenes, crossing off multiples of
+//     each base prime inside the segment;
+//   - divisor sums: segmented sigma sieve.  For every base prime p the
+//     multiples of p in the segment have p divided out of their remaining
+//     cofactor and sigma multiplied by 1 + p + ... + p^k; whatever cofactor
+//     is left is a single prime q > sqrt(n) and contributes (1 + q).  The
+//     aliquot sum sigma(n) - n then classifies n as perfect, abundant or
+//     deficient.
+// Counts are combined with MPI_Reduce, perfect numbers with MPI_Gather.
+
+struct divisor_counts {
+    long long perfect;
+    long long abundant;
+    long long deficient;
+};
+
+long long isqrt(long long n) {
+    long long r = 0;
+    while ((r + 1) * (r + 1) <= n) r++;
+    return r;
+}
+
+// All primes <= limit, by a plain sieve; returns how many.
+int base_primes(long long limit, int **primes) {
+    char *composite = (char*)calloc(limit + 1, 1);
+    int count = 0;
+    *primes = (int*)malloc((limit / 2 + 2) * sizeof(int));
+    for (long long n = 2; n <= limit; n++) {
+        if (composite[n]) continue;
+        (*primes)[count++] = (int)n;
+        for (long long m = n * n; m <= limit; m += n) composite[m] = 1;
+    }
+    free(composite);
+    return count;
+}
+
+long long sieve_primes(long long lo, long long hi, const int *primes, int n_primes,
+                       long long segment) {
+    char *flags = (char*)malloc(segment);
+    long long count = 0;
+    for (long long s = lo; s <= hi; s += segment) {
+        long long e = s + segment - 1 < hi ? s + segment - 1 : hi;
+        memset(flags, 1, e - s + 1);
+        for (int i = 0; i < n_primes; i++) {
+            long long p = primes[i];
+            if (p * p > e) break;
+            long long m = (s + p - 1) / p * p;
+            if (m < p * p) m = p * p;
+            for (; m <= e; m += p) flags[m - s] = 0;
+        }
+        for (long long n = s; n <= e; n++) count += flags[n - s];
+    }
+    free(flags);
+    return count;
+}
+
+void sieve_divisors(long long lo, long long hi, const int *primes, int n_primes,
+                    long long segment, struct divisor_counts *counts,
+                    long long *perfects, int *n_perfect) {
+    unsigned long long *rest = (unsigned long long*)malloc(segment * sizeof(unsigned long long));
+    unsigned long long *sigma = (unsigned long long*)malloc(segment * sizeof(unsigned long long));
+    for (long long s = lo; s <= hi; s += segment) {
+        long long e = s + segment - 1 < hi ? s + segment - 1 : hi;
+        for (long long n = s; n <= e; n++) {
+            rest[n - s] = n;
+            sigma[n - s] = 1;
+        }
+        for (int i = 0; i < n_primes; i++) {
+            unsigned long long p = primes[i];
+            if ((long long)(p * p) > e) break;
+            for (long long m = (s + p - 1) / p * p; m <= e; m += p) {
+                unsigned long long power = 1, sum = 1;
+                do {
+                    rest[m - s] /= p;
+                    power *= p;
+                    sum += power;
+                } while (rest[m - s] % p == 0);
+                sigma[m - s] *= sum;
+            }
+        }
+        for (long long n = s; n <= e; n++) {
+            unsigned long long total = sigma[n - s];
+            if (rest[n - s] > 1) total *= rest[n - s] + 1;
+            unsigned long long aliquot = total - n;
+            if (aliquot == (unsigned long long)n) {
+                counts->perfect++;
+                if (*n_perfect < MAX_PERFECT) perfects[(*n_perfect)++] = n;
+            } else if (aliquot > (unsigned long long)n) {
+                counts->abundant++;
+            } else {
+                counts->deficient++;
+            }
+        }
+    }
+    free(rest);
+    free(sigma);
+}
+
+// q6_sieve [max_val ...] [--segment S]
+//   max_val: one table row per value, each covering 2..max_val (default 10^7)
+//   --segment: numbers per segment (default 32768)
+int main(int argc, char** argv) {
+    MPI_Init(&argc, &argv);
+
+    int rank, size;
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+
+    long long max_vals[32];
+    int n_runs = 0;
+    long long segment = SEGMENT;
+    for (int a = 1; a < argc; a++) {
+        if (strcmp(argv[a], "--segment") == 0 && a + 1 < argc) segment = atoll(argv[++a]);
+        else if (n_runs < 32) max_vals[n_runs++] = atoll(argv[a]);
+    }
+    if (n_runs == 0) max_vals[n_runs++] = MAX_VAL;
+
+    // 1. Base primes up to sqrt of the largest max_val, broadcast once
+    long long largest = 0;
+    for (int r = 0; r < n_runs; r++)
+        if (max_vals[r] > largest) largest = max_vals[r];
+    int n_primes = 0;
+    int *primes = NULL;
+    if (rank == 0) n_primes = base_primes(isqrt(largest), &primes);
+    MPI_Bcast(&n_primes, 1, MPI_INT, 0, MPI_COMM_WORLD);
+    if (rank != 0) primes = (int*)malloc((n_primes + 1) * sizeof(int));
+    MPI_Bcast(primes, n_primes, MPI_INT, 0, MPI_COMM_WORLD);
+
+    if (rank == 0) {
+        printf("Segmented sieves on %d ranks (%d base primes, segment %lld numbers)\n\n",
+               size, n_primes, segment);
+        printf("%-12s %-10s %-10s %-14s %-8s %-10s %-10s %-14s\n", "MAX_VAL", "Primes",
+               "Time (s)", "Numbers/s/rank", "Perfect", "Abundant", "Time (s)", "Numbers/s/rank");
+        printf("----------------------------------------------------------------------------------------------\n");
+    }
+
+    long long perfects[MAX_PERFECT];
+    long long *all_perfects = (long long*)malloc((long long)size * (MAX_PERFECT + 1) * sizeof(long long));
+    long long last_max = 0;
+    for (int r = 0; r < n_runs; r++) {
+        long long max_val = max_vals[r];
+        last_max = max_val;
+
+        // 2. Each rank owns one contiguous block of 2..max_val
+        long long total = max_val - 1;
+        long long lo = 2 + total * rank / size;
+        long long hi = 1 + total * (rank + 1) / size;
+
+        MPI_Barrier(MPI_COMM_WORLD);
+        double start = MPI_Wtime();
+        long long local_primes = sieve_primes(lo, hi, primes, n_primes, segment);
+        double prime_local = MPI_Wtime() - start;
+
+        MPI_Barrier(MPI_COMM_WORLD);
+        start = MPI_Wtime();
+        struct divisor_counts local = {0, 0, 0};
+        int n_perfect = 0;
+        sieve_divisors(lo, hi, primes, n_primes, segment, &local, perfects, &n_perfect);
+        double divisor_local = MPI_Wtime() - start;
+
+        // 3. Combine
+        long long prime_count = 0;
+        long long local_counts[3] = {local.perfect, local.abundant, local.deficient};
+        long long counts[3] = {0, 0, 0};
+        double prime_time = 0.0, divisor_time = 0.0;
+        MPI_Reduce(&local_primes, &prime_count, 1, MPI_LONG_LONG, MPI_SUM, 0, MPI_COMM_WORLD);
+        MPI_Reduce(local_counts, counts, 3, MPI_LONG_LONG, MPI_SUM, 0, MPI_COMM_WORLD);
+        MPI_Reduce(&prime_local, &prime_time, 1, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD);
+        MPI_Reduce(&divisor_local, &divisor_time, 1, MPI_DOUBLE, MPI_MAX, 0, MPI_COMM_WORLD);
+
+        // count followed by the values, MAX_PERFECT + 1 slots per rank
+        long long packed[MAX_PERFECT + 1];
+        packed[0] = n_perfect;
+        memcpy(packed + 1, perfects, n_perfect * sizeof(long long));
+        MPI_Gather(packed, MAX_PERFECT + 1, MPI_LONG_LONG, all_perfects, MAX_PERFECT + 1,
+                   MPI_LONG_LONG, 0, MPI_COMM_WORLD);
+
+        if (rank == 0) {
+            printf("%-12lld %-10lld %-10.4f %-14.3e %-8lld %-10lld %-10.4f %-14.3e\n",
+                   max_val, prime_count, prime_time, total / prime_time / size,
+                   counts[0], counts[1], divisor_time, total / divisor_time / size);
+        }
+    }
+
+    if (rank == 0) {
+        // blocks are in rank order, so the gathered values are already sorted
+        printf("\nPerfect numbers up to %lld: ", last_max);
+        for (int p = 0; p < size; p++) {
+            long long *block = all_perfects + (long long)p * (MAX_PERFECT + 1);
+            for (long long i = 0; i < block[0]; i++) printf("%lld ", block[1 + i]);
+        }
+        printf("\n");
+    }
+
+    free(all_perfects);
+    free(primes);
+    MPI_Finalize();
+    return 0;
+}
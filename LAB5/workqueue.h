@@ -0,0 +1,193 @@
+// Master-worker distribution of an integer range over MPI ranks.
+//
+// Rank 0 hands out chunks [lo, hi] of the range and collects results; every
+// other rank scans the chunks it is given.  Compared with one number per
+// MPI_Send/MPI_Recv round trip:
+//   - work goes out as ranges, so one message covers many numbers;
+//   - each worker always has a second chunk in flight: both receives are
+//     posted with MPI_Irecv up front and re-posted as soon as a chunk is
+//     taken, so the next range has usually arrived before the current one is
+//     finished;
+//   - a worker reports one batch per chunk (the count, the chunk's length and
+//     time, and up to `capacity` found values) with MPI_Isend and keeps
+//     working while it is delivered;
+//   - the master sizes every worker's next chunk from that worker's measured
+//     rate so that a chunk takes about `target` seconds, at most doubling or
+//     halving per step, and caps it at remaining / (2 * workers) so the last
+//     chunks shrink and the workers finish together.
+// With a single rank, rank 0 scans the range itself.
+#ifndef WORKQUEUE_H
+#define WORKQUEUE_H
+
+#include <mpi.h>
+#include <stdlib.h>
+#include <string.h>
+
+#define WORK_TAG 1
+#define RESULT_TAG 2
+
+// Scans [lo, hi]; returns how many numbers matched and stores the first
+// `capacity` of them in found.
+typedef long long (*scan_fn)(long long lo, long long hi, long long *found, int capacity);
+
+struct workqueue_stats {
+    long long found;        // total matches
+    long long stored;       // matches stored in the caller's values array
+    long long chunks;
+    long long min_chunk;
+    long long max_chunk;
+    double seconds;         // wall time on rank 0
+};
+
+// Result message: count, chunk length, chunk time in ns, then the values.
+#define RESULT_HEADER 3
+
+static void workqueue_worker(scan_fn scan, int capacity) {
+    long long work[2][2];
+    long long *result[2];
+    MPI_Request recv[2], send[2] = {MPI_REQUEST_NULL, MPI_REQUEST_NULL};
+    for (int s = 0; s < 2; s++) {
+        result[s] = (long long*)malloc((RESULT_HEADER + capacity) * sizeof(long long));
+        MPI_Irecv(work[s], 2, MPI_LONG_LONG, 0, WORK_TAG, MPI_COMM_WORLD, &recv[s]);
+    }
+
+    // Receives were posted in slot order and the master's messages are
+    // non-overtaking, so chunks arrive alternately in slots 0 and 1.
+    for (int s = 0;; s ^= 1) {
+        MPI_Wait(&recv[s], MPI_STATUS_IGNORE);
+        long long lo = work[s][0], hi = work[s][1];
+        if (hi < lo) {
+            // stop: the other slot's receive will never be matched
+            MPI_Cancel(&recv[s ^ 1]);
+            MPI_Wait(&recv[s ^ 1], MPI_STATUS_IGNORE);
+            break;
+        }
+
+        MPI_Wait(&send[s], MPI_STATUS_IGNORE);   // result[s] free again
+        double start = MPI_Wtime();
+        long long count = scan(lo, hi, result[s] + RESULT_HEADER, capacity);
+        result[s][0] = count;
+        result[s][1] = hi - lo + 1;
+        result[s][2] = (long long)((MPI_Wtime() - start) * 1e9);
+        int n = RESULT_HEADER + (count < capacity ? (int)count : capacity);
+        MPI_Isend(result[s], n, MPI_LONG_LONG, 0, RESULT_TAG, MPI_COMM_WORLD, &send[s]);
+        MPI_Irecv(work[s], 2, MPI_LONG_LONG, 0, WORK_TAG, MPI_COMM_WORLD, &recv[s]);
+    }
+
+    MPI_Waitall(2, send, MPI_STATUSES_IGNORE);
+    free(result[0]);
+    free(result[1]);
+}
+
+// Runs the master (rank 0) or a worker (other ranks) over [first, last].
+// On rank 0 the matches are counted in stats and the first max_values of
+// them, in arrival order, stored in values; other ranks return zeroed stats.
+static void workqueue_run(long long first, long long last, scan_fn scan, int capacity,
+                          double target, long long initial_chunk,
+                          long long *values, long long max_values, struct workqueue_stats *stats) {
+    int rank, size;
+    MPI_Comm_rank(MPI_COMM_WORLD, &rank);
+    MPI_Comm_size(MPI_COMM_WORLD, &size);
+    memset(stats, 0, sizeof(*stats));
+    if (rank != 0) {
+        workqueue_worker(scan, capacity);
+        return;
+    }
+
+    double start = MPI_Wtime();
+    long long *found = (long long*)malloc((RESULT_HEADER + capacity) * sizeof(long long));
+    if (size == 1) {
+        stats->found = scan(first, last, found + RESULT_HEADER, capacity);
+        stats->stored = stats->found < capacity ? stats->found : capacity;
+        if (stats->stored > max_values) stats->stored = max_values;
+        for (long long i = 0; i < stats->stored; i++)
+            values[i] = found[RESULT_HEADER + i];
+        stats->chunks = 1;
+        stats->min_chunk = stats->max_chunk = last - first + 1;
+        stats->seconds = MPI_Wtime() - start;
+        free(found);
+        return;
+    }
+
+    int workers = size - 1;
+    long long *chunk = (long long*)malloc(size * sizeof(long long));
+    int *slot = (int*)calloc(size, sizeof(int));
+    int *stopped = (int*)calloc(size, sizeof(int));
+    long long (*out)[2][2] = (long long(*)[2][2])malloc(size * sizeof(*out));
+    MPI_Request (*sent)[2] = (MPI_Request(*)[2])malloc(size * sizeof(*sent));
+    for (int w = 0; w < size; w++) {
+        chunk[w] = initial_chunk;
+        sent[w][0] = sent[w][1] = MPI_REQUEST_NULL;
+    }
+    stats->min_chunk = last - first + 1;
+
+    long long next = first;
+    int pending = 0;
+
+    // next chunk, or the stop message once the range is exhausted
+    #define SEND_NEXT(w) do {                                                       \
+        long long *msg = out[w][slot[w]];                                           \
+        MPI_Wait(&sent[w][slot[w]], MPI_STATUS_IGNORE);                             \
+        if (next <= last) {                                                         \
+            long long remaining = last - next + 1;                                  \
+            long long cap = remaining / (2 * workers);                              \
+            long long n = chunk[w] < cap ? chunk[w] : cap;                          \
+            if (n < 1) n = 1;                                                       \
+            msg[0] = next;                                                          \
+            msg[1] = next + n - 1;                                                  \
+            next += n;                                                              \
+            pending++;                                                              \
+            stats->chunks++;                                                        \
+            if (n < stats->min_chunk) stats->min_chunk = n;                         \
+            if (n > stats->max_chunk) stats->max_chunk = n;                         \
+        } else {                                                                    \
+            msg[0] = 0;                                                             \
+            msg[1] = -1;                                                            \
+            stopped[w] = 1;                                                         \
+        }                                                                           \
+        MPI_Isend(msg, 2, MPI_LONG_LONG, w, WORK_TAG, MPI_COMM_WORLD, &sent[w][slot[w]]); \
+        slot[w] ^= 1;                                                               \
+    } while (0)
+
+    for (int w = 1; w < size; w++) {
+        SEND_NEXT(w);
+        if (!stopped[w]) SEND_NEXT(w);
+    }
+
+    while (pending > 0) {
+        MPI_Status status;
+        MPI_Recv(found, RESULT_HEADER + capacity, MPI_LONG_LONG, MPI_ANY_SOURCE, RESULT_TAG,
+                 MPI_COMM_WORLD, &status);
+        int w = status.MPI_SOURCE;
+        pending--;
+
+        long long count = found[0];
+        long long n = count < capacity ? count : capacity;
+        for (long long i = 0; i < n && stats->stored < max_values; i++)
+            values[stats->stored++] = found[RESULT_HEADER + i];
+        stats->found += count;
+
+        // resize towards `target` seconds per chunk, at most 2x per step
+        double seconds = found[2] * 1e-9;
+        double ideal = seconds > 0 ? found[1] * target / seconds : 2.0 * chunk[w];
+        if (ideal > 2.0 * chunk[w]) ideal = 2.0 * chunk[w];
+        if (ideal < 0.5 * chunk[w]) ideal = 0.5 * chunk[w];
+        chunk[w] = ideal < 1 ? 1 : (long long)ideal;
+
+        if (!stopped[w]) SEND_NEXT(w);
+    }
+    #undef SEND_NEXT
+
+    for (int w = 1; w < size; w++)
+        MPI_Waitall(2, sent[w], MPI_STATUSES_IGNORE);
+    stats->seconds = MPI_Wtime() - start;
+
+    free(found);
+    free(chunk);
+    free(slot);
+    free(stopped);
+    free(out);
+    free(sent);
+}
+
+#endif
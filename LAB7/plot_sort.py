@@ -0,0 +1,58 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from bench import sorting, stats, store
+
+# Sort benchmark from `python -m bench sort` (latest stored run by default)
+records = stats.collapse(store.from_argv(sorting.EXPERIMENT, sys.argv[1:] or ["--latest"]))
+
+sizes = sorted({r.size for r in records})
+algorithms = [a for a in sorting.ALGORITHMS if any(r.variant == a for r in records)]
+rate = {a: np.full(len(sizes), np.nan) for a in algorithms}
+threads = {}
+for r in records:
+    rate[r.variant][sizes.index(r.size)] = r.metrics["keys_per_s"] / 1e6
+    threads[r.variant] = r.threads
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+# 1. Throughput vs number of keys
+colors = plt.cm.tab10(np.arange(len(algorithms)))
+for algorithm, color in zip(algorithms, colors):
+    ax1.plot(sizes, rate[algorithm], 'o-', color=color, linewidth=2, markersize=6,
+             label=f'{algorithm} ({threads[algorithm]} threads)')
+ax1.set_xscale('log')
+ax1.set_yscale('log')
+ax1.set_xlabel('Keys (uint32, log scale)', fontsize=12)
+ax1.set_ylabel('Throughput (Mkeys/s, log scale)', fontsize=12)
+ax1.set_title('Sort Throughput vs Input Size', fontsize=13, fontweight='bold')
+ax1.grid(True, alpha=0.3, which='both')
+ax1.legend(fontsize=10)
+
+# 2. Speedup over the serial merge sort
+if "merge" in rate:
+    for algorithm, color in zip(algorithms, colors):
+        if algorithm != "merge":
+            ax2.plot(sizes, rate[algorithm] / rate["merge"], 'o-', color=color, linewidth=2,
+                     markersize=6, label=algorithm)
+    ax2.axhline(y=1, color='gray', linestyle='--', alpha=0.6)
+ax2.set_xscale('log')
+ax2.set_xlabel('Keys (uint32, log scale)', fontsize=12)
+ax2.set_ylabel('Speedup over serial merge sort', fontsize=12)
+ax2.set_title('Speedup over Serial Merge Sort', fontsize=13, fontweight='bold')
+ax2.grid(True, alpha=0.3, which='both')
+ax2.legend(fontsize=10)
+
+plt.tight_layout()
+plt.savefig('sort_throughput.png', dpi=300, bbox_inches='tight')
+plt.show()
+
+print("Sort plot saved as 'sort_throughput.png'")
+
+print(f"\n{'Keys':<12} {'Fastest':<12} {'Mkeys/s':<10}")
+for i, n in enumerate(sizes):
+    best = max(algorithms, key=lambda a: np.nan_to_num(rate[a][i]))
+    print(f"{n:<12} {best:<12} {rate[best][i]:<10.2f}")
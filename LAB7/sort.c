@@ -0,0 +1,260 @@
+#include <omp.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+// CPU sorting kernels for 32-bit unsigned keys, called from bench/sorting.py.
+//
+//   sort_merge_serial  top-down merge sort, ping-ponging between keys and tmp
+//                      so every level is one merge pass (no copy back)
+//   sort_merge_tasks   the same recursion as OpenMP tasks; above the cutoff the
+//                      merges are split too (median of the longer run, binary
+//                      search in the other), so the top levels are not serial
+//   sort_bitonic       bitonic network, n padded to a power of two; every
+//                      compare-exchange stage is a contiguous min/max loop
+//                      (omp simd).  Stages with a stride below BITONIC_BLOCK
+//                      stay inside one cache-sized block, so the network does
+//                      log2(n / BITONIC_BLOCK) passes over memory per merge
+//                      step instead of one per stage
+//   sort_radix         LSD radix sort, 8 bits per pass: per-thread histograms,
+//                      one prefix sum over (digit, thread), stable scatter
+//
+// Keys are sorted in place; tmp, where taken, is scratch of n keys.
+#define INSERTION 32           // runs this short are insertion-sorted
+#define TASK_CUTOFF 16384      // keys below which a sort or merge stays in one task
+#define BITONIC_BLOCK 8192     // keys per cache-resident bitonic block (32 KiB)
+#define SHORT_STRIDE 2         // stride-1 stages: one scalar loop, not a call per pair
+#define RADIX_BITS 8
+#define RADIX (1 << RADIX_BITS)
+
+// AVX2 clone of compare_exchange, picked at load time; target_clones needs
+// ifunc (GCC >= 11 on x86-64 Linux), so other targets get the generic build.
+#if defined(__x86_64__) && defined(__linux__) && __GNUC__ >= 11
+#define TARGET_CLONES __attribute__((target_clones("arch=x86-64-v3", "default")))
+#else
+#define TARGET_CLONES
+#endif
+
+static void insertion(uint32_t *a, long long n) {
+    for (long long i = 1; i < n; i++) {
+        uint32_t key = a[i];
+        long long j = i - 1;
+        while (j >= 0 && a[j] > key) {
+            a[j + 1] = a[j];
+            j--;
+        }
+        a[j + 1] = key;
+    }
+}
+
+// branch-free while both runs last: random keys would mispredict half the time
+static void merge(const uint32_t *a, long long na, const uint32_t *b, long long nb, uint32_t *out) {
+    long long i = 0, j = 0, k = 0;
+    while (i < na && j < nb) {
+        uint32_t x = a[i], y = b[j];
+        int take_b = y < x;
+        out[k++] = take_b ? y : x;
+        j += take_b;
+        i += !take_b;
+    }
+    while (i < na) out[k++] = a[i++];
+    while (j < nb) out[k++] = b[j++];
+}
+
+// Sorts a[0..n); the result ends up in b if into_b, else in a.
+static void merge_sort(uint32_t *a, uint32_t *b, long long n, int into_b) {
+    if (n <= INSERTION) {
+        insertion(a, n);
+        if (into_b) memcpy(b, a, n * sizeof(uint32_t));
+        return;
+    }
+    long long h = n / 2;
+    merge_sort(a, b, h, !into_b);
+    merge_sort(a + h, b + h, n - h, !into_b);
+    if (into_b) merge(a, h, a + h, n - h, b);
+    else merge(b, h, b + h, n - h, a);
+}
+
+void sort_merge_serial(uint32_t *keys, uint32_t *tmp, long long n) {
+    merge_sort(keys, tmp, n, 0);
+}
+
+// first index in b[0..n) whose key is >= key
+static long long lower_bound(const uint32_t *b, long long n, uint32_t key) {
+    long long lo = 0, hi = n;
+    while (lo < hi) {
+        long long mid = lo + (hi - lo) / 2;
+        if (b[mid] < key) lo = mid + 1;
+        else hi = mid;
+    }
+    return lo;
+}
+
+static void merge_tasks(const uint32_t *a, long long na, const uint32_t *b, long long nb,
+                        uint32_t *out, long long cutoff) {
+    if (na + nb <= cutoff) {
+        merge(a, na, b, nb, out);
+        return;
+    }
+    if (na < nb) {
+        merge_tasks(b, nb, a, na, out, cutoff);
+        return;
+    }
+    long long ma = na / 2;
+    long long mb = lower_bound(b, nb, a[ma]);
+    out[ma + mb] = a[ma];
+    #pragma omp task
+    merge_tasks(a, ma, b, mb, out, cutoff);
+    merge_tasks(a + ma + 1, na - ma - 1, b + mb, nb - mb, out + ma + mb + 1, cutoff);
+    #pragma omp taskwait
+}
+
+static void merge_sort_tasks(uint32_t *a, uint32_t *b, long long n, int into_b, long long cutoff) {
+    if (n <= cutoff) {
+        merge_sort(a, b, n, into_b);
+        return;
+    }
+    long long h = n / 2;
+    #pragma omp task
+    merge_sort_tasks(a, b, h, !into_b, cutoff);
+    merge_sort_tasks(a + h, b + h, n - h, !into_b, cutoff);
+    #pragma omp taskwait
+    if (into_b) merge_tasks(a, h, a + h, n - h, b, cutoff);
+    else merge_tasks(b, h, b + h, n - h, a, cutoff);
+}
+
+// cutoff <= 0: TASK_CUTOFF
+void sort_merge_tasks(uint32_t *keys, uint32_t *tmp, long long n, long long cutoff) {
+    if (cutoff <= 0) cutoff = TASK_CUTOFF;
+    #pragma omp parallel
+    #pragma omp single
+    merge_sort_tasks(keys, tmp, n, 0, cutoff);
+}
+
+// compare-exchange lo[m] with hi[m] for m in [0, len), smaller key to lo if ascending
+TARGET_CLONES
+static void compare_exchange(uint32_t *lo, uint32_t *hi, long long len, int ascending) {
+    if (ascending) {
+        #pragma omp simd
+        for (long long m = 0; m < len; m++) {
+            uint32_t x = lo[m], y = hi[m];
+            lo[m] = x < y ? x : y;
+            hi[m] = x < y ? y : x;
+        }
+    } else {
+        #pragma omp simd
+        for (long long m = 0; m < len; m++) {
+            uint32_t x = lo[m], y = hi[m];
+            lo[m] = x < y ? y : x;
+            hi[m] = x < y ? x : y;
+        }
+    }
+}
+
+// one stage with a short stride j over a[base..base+len): pairs (i, i + j)
+// for every i with bit j clear, in a single loop instead of a call per pair
+static void compare_exchange_short(uint32_t *a, long long base, long long len, long long k,
+                                   long long j) {
+    for (long long t = 0; t < len / 2; t++) {
+        long long i = base + (t & ~(j - 1)) * 2 + (t & (j - 1));
+        uint32_t x = a[i], y = a[i + j];
+        uint32_t small = x < y ? x : y, large = x < y ? y : x;
+        int ascending = (i & k) == 0;
+        a[i] = ascending ? small : large;
+        a[i + j] = ascending ? large : small;
+    }
+}
+
+// stages j = j0, j0/2, ..., 1 of merge step k on the block a[base..base+len)
+static void bitonic_block(uint32_t *a, long long base, long long len, long long k, long long j0) {
+    for (long long j = j0; j >= 1; j /= 2) {
+        if (j < SHORT_STRIDE) {
+            compare_exchange_short(a, base, len, k, j);
+            continue;
+        }
+        for (long long i = base; i < base + len; i += 2 * j)
+            compare_exchange(a + i, a + i + j, j, (i & k) == 0);
+    }
+}
+
+// n a power of two
+static void bitonic_network(uint32_t *a, long long n) {
+    long long block = n < BITONIC_BLOCK ? n : BITONIC_BLOCK;
+    #pragma omp parallel
+    {
+        // merge steps k <= block never leave a block: sort every block in one go
+        #pragma omp for schedule(static)
+        for (long long base = 0; base < n; base += block)
+            for (long long k = 2; k <= block; k *= 2)
+                bitonic_block(a, base, block, k, k / 2);
+
+        for (long long k = 2 * block; k <= n; k *= 2) {
+            // wide strides: one pass over memory per stage, split into
+            // block/2-long runs of independent pairs
+            for (long long j = k / 2; j >= block; j /= 2) {
+                #pragma omp for schedule(static)
+                for (long long t = 0; t < n / 2; t += block / 2) {
+                    long long i = t / j * 2 * j + t % j;
+                    compare_exchange(a + i, a + i + j, block / 2, (i & k) == 0);
+                }
+            }
+            // the remaining strides stay inside a block
+            #pragma omp for schedule(static)
+            for (long long base = 0; base < n; base += block)
+                bitonic_block(a, base, block, k, block / 2);
+        }
+    }
+}
+
+void sort_bitonic(uint32_t *keys, long long n) {
+    long long padded = 1;
+    while (padded < n) padded *= 2;
+    if (padded == n) {
+        bitonic_network(keys, n);
+        return;
+    }
+    // pad with the largest key, which sorts to the end
+    uint32_t *a = (uint32_t*)malloc(padded * sizeof(uint32_t));
+    #pragma omp parallel for schedule(static)
+    for (long long i = 0; i < padded; i++) a[i] = i < n ? keys[i] : UINT32_MAX;
+    bitonic_network(a, padded);
+    #pragma omp parallel for schedule(static)
+    for (long long i = 0; i < n; i++) keys[i] = a[i];
+    free(a);
+}
+
+void sort_radix(uint32_t *keys, uint32_t *tmp, long long n) {
+    long long *counts = (long long*)malloc((long long)omp_get_max_threads() * RADIX * sizeof(long long));
+    uint32_t *src = keys, *dst = tmp;
+    for (int shift = 0; shift < 32; shift += RADIX_BITS) {
+        #pragma omp parallel
+        {
+            int t = omp_get_thread_num(), nt = omp_get_num_threads();
+            long long lo = n * t / nt, hi = n * (t + 1) / nt;
+            long long *count = counts + (long long)t * RADIX;
+            memset(count, 0, RADIX * sizeof(long long));
+            for (long long i = lo; i < hi; i++) count[src[i] >> shift & (RADIX - 1)]++;
+            #pragma omp barrier
+
+            // exclusive prefix in (digit, thread) order: thread t's keys of
+            // digit d go after every earlier thread's keys of digit d
+            #pragma omp single
+            {
+                long long sum = 0;
+                for (int d = 0; d < RADIX; d++) {
+                    for (int u = 0; u < nt; u++) {
+                        long long c = counts[(long long)u * RADIX + d];
+                        counts[(long long)u * RADIX + d] = sum;
+                        sum += c;
+                    }
+                }
+            }
+
+            for (long long i = lo; i < hi; i++) dst[count[src[i] >> shift & (RADIX - 1)]++] = src[i];
+        }
+        uint32_t *swap = src;
+        src = dst;
+        dst = swap;
+    }
+    free(counts);   // an even number of passes: the result is back in keys
+}
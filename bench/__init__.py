@@ -0,0 +1 @@
+"""Shared benchmarking helpers for the UCS645 lab experiments."""
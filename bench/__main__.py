@@ -0,0 +1,371 @@
+"""Command line entry point: ``python -m bench run exp7``."""
+
+import argparse
+import os
+import subprocess
+import time
+from pathlib import Path
+
+from bench import (affinity, autotune, correlation, gemm, hybrid, kernels, roofline, runner,
+                   scaling, sorting, stats, sweep, working_set)
+from bench.store import DEFAULT_PATH, ResultStore, build_id
+
+
+def absolute(path):
+    """Path argument resolved now: plot scripts run from their own directory."""
+    return Path(path).resolve()
+
+
+def cmd_list(args):
+    for name, exp in runner.EXPERIMENTS.items():
+        print(f"{name:15s} {exp.source.relative_to(runner.ROOT)}")
+
+
+def cmd_run(args):
+    # MPI experiments need mpirun (and MPIRUN_FLAGS as root): named explicitly only
+    names = ([name for name, exp in runner.EXPERIMENTS.items() if not exp.mpi]
+             if args.experiments == ["all"] else args.experiments)
+    store = ResultStore(args.store)
+    buffers = None
+    for name in names:
+        exp = runner.EXPERIMENTS[name]
+        build = build_id(*exp.dependencies)
+        extra = ["--first-touch"] if args.first_touch and exp.first_touch else []
+        if args.counters and exp.counters:
+            extra.append("--counters")
+        if args.inproc:
+            if name not in kernels.EXPERIMENT_KERNELS:
+                print(f"[{name}] no in-process kernel, skipped")
+                continue
+            print(f"[{name}] running {kernels.SOURCE.name} in-process ...")
+            size = args.size or exp.size
+            if name not in ("exp3", "exp5") and (buffers is None or buffers.n != size):
+                buffers = kernels.Buffers(size, args.max_threads)
+            records = kernels.sweep(name, range(1, args.max_threads + 1), size=size,
+                                    warmup=args.warmup, repeats=args.repeats, buffers=buffers)
+            build = "inproc " + build_id(kernels.SOURCE)
+        elif args.affinity:
+            print(f"[{name}] placement sweep of {exp.source.name} ...")
+            records = affinity.affinity_sweep(name, args=extra, warmup=args.warmup,
+                                              repeats=args.repeats)
+        elif args.budget and exp.thread_args:
+            print(f"[{name}] adaptive sweep of {exp.source.name} ...")
+            records = sweep.adaptive_sweep(name, args.budget, max_threads=args.max_threads,
+                                           ci_target=args.ci, min_repeats=args.repeats,
+                                           warmup=args.warmup, args=extra)
+        else:
+            print(f"[{name}] running {exp.source.name} ...")
+            records = runner.run(name, args=extra, warmup=args.warmup, repeats=args.repeats)
+        if args.affinity and not args.inproc:
+            affinity.report(records)
+        batch = store.append(records, build=build)
+        print(f"[{name}] {len(records)} records stored as batch {batch}")
+        if not args.no_plot and exp.plot:
+            runner.plot(name, "--store", args.store, "--batch", batch)
+    store.close()
+
+
+def cmd_sizes(args):
+    counts = working_set.sizes(args.min_bytes, args.max_bytes, args.per_decade)
+    print(f"[{working_set.EXPERIMENT}] {len(counts)} sizes x {len(args.threads)} thread counts ...")
+    records = working_set.size_sweep(args.threads, counts, repeats=args.repeats,
+                                     min_time=args.min_time)
+    store = ResultStore(args.store)
+    batch = store.append(records, build="inproc " + build_id(kernels.SOURCE))
+    store.close()
+    print(f"[{working_set.EXPERIMENT}] {len(records)} records stored as batch {batch}")
+    if not args.no_plot:
+        runner.plot_script(runner.LAB2 / "EXP7" / "plot_q7_sizes.py",
+                           "--store", args.store, "--batch", batch)
+
+
+def cmd_tune(args):
+    space = autotune.search_space(args.kinds, args.chunks)
+    print(f"[exp4] {len(args.profiles)} profiles x {len(space)} schedules x "
+          f"{len(args.threads)} thread counts ...")
+    records = autotune.tune(args.profiles, args.threads, args.kinds, args.chunks,
+                            iterations=args.iterations, unit=args.unit,
+                            warmup=args.warmup, repeats=args.repeats)
+    exp = runner.EXPERIMENTS["exp4"]
+    store = ResultStore(args.store)
+    build = build_id(*exp.dependencies)
+    batch = store.append(records, build=build)
+    store.close()
+    print(f"[exp4] {len(records)} records stored as batch {batch}\n")
+    winners = autotune.best(records)
+    autotune.report(records, winners)
+    autotune.save(winners, args.best, host=runner.host(), build=build, batch=batch)
+    print(f"Best configurations saved to {args.best}")
+    if not args.no_plot:
+        runner.plot("exp4", "--store", args.store, "--batch", batch)
+
+
+def cmd_trace(args):
+    binary = runner.build(runner.EXPERIMENTS["exp4"])
+    args.out.parent.mkdir(exist_ok=True)
+    cmd = [str(binary), "--profile", args.profile, "--threads", ",".join(map(str, args.threads)),
+           "--trace", str(args.out), *args.schedules]
+    if args.unit:
+        cmd += ["--unit", str(args.unit)]
+    print(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+    print(f"Trace written to {args.out}")
+    if not args.no_plot:
+        runner.plot_script(runner.LAB2 / "EXP4" / "q4_map.py", "--trace", args.out.resolve())
+
+
+def cmd_roofline(args):
+    roofline.roofline(args.store, host=args.host, threads=args.threads, out=args.out)
+
+
+def cmd_scaling(args):
+    store = ResultStore(args.store)
+    records = store.query(args.experiment, host=args.host, build=args.build, batch=args.batch,
+                          latest=args.batch is None).records()
+    store.close()
+    if not records:
+        raise SystemExit(f"no stored results for {args.experiment} matching the given filters")
+    fits = scaling.fit(stats.collapse(records), min_efficiency=args.min_efficiency)
+    if not fits:
+        raise SystemExit(f"{args.experiment}: no variant has a 1-thread baseline")
+    scaling.report(fits)
+
+
+def cmd_check(args):
+    store = ResultStore(args.store)
+    baseline = store.query(args.experiment, batch=args.baseline).records()
+    current = store.query(args.experiment, host=args.host, batch=args.batch,
+                          latest=args.batch is None).records()
+    store.close()
+    if not baseline or not current:
+        raise SystemExit(f"no stored results for {args.experiment} matching the given batches")
+    worse = stats.regressions(stats.collapse(baseline), stats.collapse(current),
+                              args.metric, args.tolerance)
+    for r, old, new in worse:
+        print(f"REGRESSION {r.variant} {r.threads} threads: {args.metric} {old:.4g} -> {new:.4g}")
+    print(f"{args.experiment}: {len(worse)} point(s) worse than batch {args.baseline} "
+          f"by more than {args.tolerance:.0%} in {args.metric}")
+    raise SystemExit(1 if worse else 0)
+
+
+def cmd_crosscheck(args):
+    sizes = [tuple(int(n) for n in size.split("x")) for size in args.sizes]
+    print(f"[{correlation.EXPERIMENT}] {len(args.variants)} variants x {len(sizes)} sizes "
+          f"against NumPy (seed {args.seed}) ...")
+    records = correlation.cross_validate(sizes, seed=args.seed, threads=args.threads,
+                                         repeats=args.repeats, variants=args.variants)
+    store = ResultStore(args.store)
+    batch = store.append(records, build="inproc " + build_id(correlation.SOURCE))
+    store.close()
+    failures = correlation.report(records, args.tolerance)
+    print(f"\n[{correlation.EXPERIMENT}] {len(records)} records stored as batch {batch}; "
+          f"{len(failures)} point(s) above max error {args.tolerance:g}")
+    raise SystemExit(1 if failures else 0)
+
+
+def cmd_gemm(args):
+    print(f"[{gemm.EXPERIMENT}] blocked GEMM vs np.dot, sizes {', '.join(map(str, args.sizes))} ...")
+    records = gemm.check(args.sizes, threads=args.threads, seed=args.seed, repeats=args.repeats)
+    store = ResultStore(args.store)
+    batch = store.append(records, build="inproc " + build_id(gemm.SOURCE))
+    store.close()
+    failures = gemm.report(records, args.tolerance)
+    print(f"\n[{gemm.EXPERIMENT}] {len(records)} records stored as batch {batch}; "
+          f"{len(failures)} size(s) above relative error {args.tolerance:g}")
+    raise SystemExit(1 if failures else 0)
+
+
+def cmd_hybrid(args):
+    store = ResultStore(args.store)
+    for name in args.experiments:
+        exp = runner.EXPERIMENTS[name]
+        print(f"[{name}] ranks x threads sweep of {exp.source.name} over "
+              f"{', '.join(map(str, args.cores))} cores ...")
+        records = hybrid.hybrid_sweep(name, args.cores, size=args.size, chunks=args.chunks,
+                                      warmup=args.warmup, repeats=args.repeats)
+        best = hybrid.report(records)
+        batch = store.append(records, build=build_id(*exp.dependencies))
+        print(f"[{name}] {len(records)} records stored as batch {batch}; "
+              f"highest bandwidth: {best}\n")
+    store.close()
+
+
+def cmd_sort(args):
+    sizes = [n for n in args.sizes if sorting.fits(n)]
+    for n in sorted(set(args.sizes) - set(sizes)):
+        print(f"[{sorting.EXPERIMENT}] {n} keys skipped: needs "
+              f"{sorting.memory_needed(n) / 2**30:.1f} GiB of memory")
+    if not sizes:
+        raise SystemExit(f"[{sorting.EXPERIMENT}] no size fits in memory")
+    print(f"[{sorting.EXPERIMENT}] {', '.join(args.algorithms)} on {len(sizes)} sizes ...")
+    records = sorting.benchmark(sizes, algorithms=args.algorithms, threads=args.threads,
+                                seed=args.seed, repeats=args.repeats)
+    store = ResultStore(args.store)
+    batch = store.append(records, build="inproc " + build_id(sorting.SOURCE))
+    store.close()
+    failures = sorting.report(records)
+    print(f"\n[{sorting.EXPERIMENT}] {len(records)} records stored as batch {batch}; "
+          f"{len(failures)} run(s) not sorted")
+    if not args.no_plot:
+        runner.plot_script(runner.ROOT / "LAB7" / "plot_sort.py",
+                           "--store", args.store, "--batch", batch)
+    raise SystemExit(1 if failures else 0)
+
+
+def cmd_history(args):
+    store = ResultStore(args.store)
+    for batch, experiment, host, build, created in store.batches(args.experiment):
+        stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(created))
+        print(f"{batch:6d}  {experiment:6s} {stamp}  {host:16s} {build}")
+    store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="list known experiments")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("run", help="build, run and plot experiments")
+    p.add_argument("experiments", nargs="+", choices=[*runner.EXPERIMENTS, "all"],
+                   help="'all' runs every experiment except the MPI ones")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.add_argument("--warmup", type=int, default=1, help="discarded runs before measuring")
+    p.add_argument("--repeats", type=int, default=5, help="measured runs per point")
+    p.add_argument("--budget", type=float,
+                   help="adaptive sweep: wall-clock budget in seconds per experiment")
+    p.add_argument("--max-threads", type=int, default=17, help="adaptive sweep: upper thread count")
+    p.add_argument("--ci", type=float, default=0.05,
+                   help="adaptive sweep: stop repeating a point below this relative CI half-width")
+    p.add_argument("--first-touch", action="store_true",
+                   help="exp1/exp7: initialise arrays in parallel with the compute partition")
+    p.add_argument("--counters", action="store_true",
+                   help="exp6/exp7: record cycles, instructions, cache and LLC events, "
+                        "context switches per run")
+    p.add_argument("--affinity", action="store_true",
+                   help="repeat the sweep for each OMP_PROC_BIND/OMP_PLACES placement")
+    p.add_argument("--inproc", action="store_true",
+                   help="run the kernels from LAB2/lib in-process on reused NumPy buffers")
+    p.add_argument("--size", type=int, help="--inproc: problem size (default: the experiment's)")
+    p.add_argument("--no-plot", action="store_true", help="only collect results")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("sizes", help="triad bandwidth across working-set sizes (cache vs DRAM)")
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 17])
+    p.add_argument("--min-bytes", type=float, default=8 * 1024)
+    p.add_argument("--max-bytes", type=float, default=2.4e9)
+    p.add_argument("--per-decade", type=int, default=4, help="sizes per factor of 10")
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--min-time", type=float, default=0.02, help="seconds timed per sample")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.add_argument("--no-plot", action="store_true")
+    p.set_defaults(func=cmd_sizes)
+
+    p = sub.add_parser("tune", help="search EXP4 schedule kind x chunk x threads per workload")
+    p.add_argument("--profiles", nargs="+", choices=autotune.PROFILES, default=autotune.PROFILES)
+    p.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 17])
+    p.add_argument("--kinds", nargs="+", choices=[*autotune.KINDS, "auto"], default=autotune.KINDS)
+    p.add_argument("--chunks", type=int, nargs="+", default=autotune.CHUNKS,
+                   help="chunk sizes (0 = runtime default)")
+    p.add_argument("--iterations", type=int, help="loop length (q4.c default: 2000)")
+    p.add_argument("--unit", type=int, help="sin/cos steps per unit of iteration cost (default: 20)")
+    p.add_argument("--warmup", type=int, default=0)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--best", type=Path, default=autotune.BEST_PATH,
+                   help="JSON file of the best configuration per profile")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.add_argument("--no-plot", action="store_true")
+    p.set_defaults(func=cmd_tune)
+
+    p = sub.add_parser("trace", help="per-chunk timeline of EXP4 schedules")
+    p.add_argument("schedules", nargs="*", default=["static", "dynamic,4", "guided"])
+    p.add_argument("--profile", choices=autotune.PROFILES, default="triangular")
+    p.add_argument("--threads", type=int, nargs="+", default=[4])
+    p.add_argument("--unit", type=int, help="sin/cos steps per unit of iteration cost (default: 20)")
+    p.add_argument("--out", type=Path, default=runner.ROOT / "results" / "q4_trace.bin")
+    p.add_argument("--no-plot", action="store_true")
+    p.set_defaults(func=cmd_trace)
+
+    p = sub.add_parser("roofline", help="place the stored sweeps on a roofline plot")
+    p.add_argument("--host", help="only use sweeps from this host")
+    p.add_argument("--threads", type=int, help="threads for the compute ceiling (default: all)")
+    p.add_argument("--out", type=Path, default=runner.ROOT / "results" / "roofline.png")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_roofline)
+
+    p = sub.add_parser("scaling", help="fit Amdahl/Gustafson/Karp-Flatt to a stored sweep")
+    p.add_argument("experiment")
+    p.add_argument("--host")
+    p.add_argument("--build")
+    p.add_argument("--batch", type=int, help="default: the latest matching sweep")
+    p.add_argument("--min-efficiency", type=float,
+                   help="recommend the most threads keeping at least this efficiency (%%)")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_scaling)
+
+    p = sub.add_parser("check", help="exit non-zero if a sweep regressed against a baseline batch")
+    p.add_argument("experiment")
+    p.add_argument("--baseline", type=int, required=True, help="batch to compare against")
+    p.add_argument("--batch", type=int, help="default: the latest matching sweep")
+    p.add_argument("--host")
+    p.add_argument("--metric", default="time",
+                   help="time or a stored metric, e.g. cache_misses_per_iter, ipc")
+    p.add_argument("--tolerance", type=float, default=0.1, help="allowed relative increase")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("crosscheck", help="check the LAB3 correlation kernels against NumPy")
+    p.add_argument("--sizes", nargs="+", default=["500x500", "1000x1000"], help="NYxNX inputs")
+    p.add_argument("--variants", nargs="+", choices=[*correlation.VARIANTS, "packed"],
+                   default=[*correlation.VARIANTS, "packed"])
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--threads", type=int, help="kernel threads (default: all CPUs)")
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--tolerance", type=float, default=1e-5, help="largest allowed |error|")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_crosscheck)
+
+    p = sub.add_parser("gemm", help="check the LAB1 blocked GEMM against np.dot")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000])
+    p.add_argument("--threads", type=int, help="engine threads (default: all CPUs)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--tolerance", type=float, default=1e-12,
+                   help="largest allowed error relative to max |C|")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_gemm)
+
+    p = sub.add_parser("hybrid", help="ranks x threads sweep of the LAB5 MPI+OpenMP kernels")
+    p.add_argument("experiments", nargs="+", choices=hybrid.EXPERIMENTS)
+    p.add_argument("--cores", type=int, nargs="+", default=[os.cpu_count()],
+                   help="total cores (ranks x threads) per sweep")
+    p.add_argument("--size", type=int, help="vector length (default: the experiment's)")
+    p.add_argument("--chunks", type=int, default=16, help="pipelined pieces per rank")
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_hybrid)
+
+    p = sub.add_parser("sort", help="LAB7 CPU sorts (merge, tasks, bitonic, radix) vs np.sort")
+    p.add_argument("--sizes", type=int, nargs="+", default=list(sorting.SIZES),
+                   help="key counts; sizes that do not fit in memory are skipped")
+    p.add_argument("--algorithms", nargs="+", choices=sorting.ALGORITHMS,
+                   default=list(sorting.ALGORITHMS))
+    p.add_argument("--threads", type=int, help="threads of the parallel sorts (default: all CPUs)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.add_argument("--no-plot", action="store_true")
+    p.set_defaults(func=cmd_sort)
+
+    p = sub.add_parser("history", help="list stored sweeps")
+    p.add_argument("experiment", nargs="?")
+    p.add_argument("--store", type=absolute, default=DEFAULT_PATH)
+    p.set_defaults(func=cmd_history)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Thread placement sweep over OMP_PROC_BIND / OMP_PLACES.
+
+Each placement runs the experiment with the OpenMP affinity variables set in
+the environment; its records are relabelled ``"<variant> <placement>"`` so the
+placements sit side by side in one stored batch and in the plots.
+"""
+
+from bench import runner, stats
+
+# label -> environment; "unbound" leaves placement to the OS scheduler
+PLACEMENTS = {
+    "unbound": {"OMP_PROC_BIND": "false"},
+    "close/cores": {"OMP_PROC_BIND": "close", "OMP_PLACES": "cores"},
+    "spread/cores": {"OMP_PROC_BIND": "spread", "OMP_PLACES": "cores"},
+    "close/sockets": {"OMP_PROC_BIND": "close", "OMP_PLACES": "sockets"},
+    "spread/sockets": {"OMP_PROC_BIND": "spread", "OMP_PLACES": "sockets"},
+}
+
+
+def affinity_sweep(name, placements=PLACEMENTS, args=(), warmup=0, repeats=1):
+    records = []
+    for label, env in placements.items():
+        for r in runner.run(name, args=args, env=env, warmup=warmup, repeats=repeats):
+            r.variant = f"{r.variant} {label}"
+            records.append(r)
+    return records
+
+
+def best_placement(records):
+    """(variant, threads, median record) per placement, fastest first.
+
+    For the bandwidth-bound kernels the lowest time at the best thread count
+    is also the peak bandwidth, so this ranks placements by peak bandwidth.
+    """
+    rows = []
+    for variant, rs in runner.by_variant(stats.collapse(records)).items():
+        fastest = min(rs, key=lambda r: r.time)
+        rows.append((variant, fastest.threads, fastest))
+    return sorted(rows, key=lambda row: row[2].time)
+
+
+def report(records):
+    """Print the placement ranking and return the best variant."""
+    rows = best_placement(records)
+    print(f"{'Placement':<36} {'Threads':<8} {'Time (s)':<12} {'BW (GB/s)'}")
+    for variant, threads, r in rows:
+        bandwidth = r.metrics.get("bandwidth")
+        print(f"{variant:<36} {threads:<8} {r.time:<12.6f} "
+              f"{'-' if bandwidth is None else f'{bandwidth:.2f}'}")
+    return rows[0][0]
@@ -0,0 +1,93 @@
+"""Schedule autotuner for EXP4's irregular loop.
+
+q4.c runs its loop under ``schedule(runtime)``, so every schedule kind and
+chunk size can be tried from the command line without recompiling.  For each
+workload profile the tuner searches kind x chunk x thread count, stores the
+whole search as one batch (records relabelled ``"<schedule> <profile>"``) and
+keeps the fastest configuration per profile in ``BEST_PATH``, ready to be
+used as ``OMP_SCHEDULE`` / ``OMP_NUM_THREADS``.
+"""
+
+import json
+
+from bench import runner, stats
+
+PROFILES = ("triangular", "uniform", "random")
+KINDS = ("static", "dynamic", "guided")
+CHUNKS = (0, 1, 4, 16, 64)   # 0 = the runtime's default chunk
+BEST_PATH = runner.ROOT / "results" / "schedules.json"
+
+
+def search_space(kinds=KINDS, chunks=CHUNKS):
+    """Schedule strings as q4.c takes them: 'static', 'dynamic,16', ... ('auto' takes no chunk)."""
+    space = [kind if chunk == 0 or kind == "auto" else f"{kind},{chunk}"
+             for kind in kinds for chunk in chunks]
+    return list(dict.fromkeys(space))
+
+
+def split(variant):
+    """'dynamic,4 triangular' -> ('dynamic,4', 'triangular')."""
+    schedule, _, profile = variant.partition(" ")
+    return schedule, profile
+
+
+def tune(profiles=PROFILES, threads=(1, 2, 4, 8, 17), kinds=KINDS, chunks=CHUNKS,
+         iterations=None, unit=None, warmup=0, repeats=3):
+    """Raw records of the full search, one q4 invocation per profile and trial."""
+    records = []
+    for profile in profiles:
+        args = ["--profile", profile, "--threads", ",".join(map(str, threads))]
+        if iterations:
+            args += ["--iterations", iterations]
+        if unit:
+            args += ["--unit", unit]
+        for r in runner.run("exp4", args=[*args, *search_space(kinds, chunks)],
+                            warmup=warmup, repeats=repeats):
+            r.variant = f"{r.variant} {profile}"
+            records.append(r)
+    return records
+
+
+def best(records):
+    """{profile: median record} with the lowest wall time (then imbalance)."""
+    winners = {}
+    for r in stats.collapse(records):
+        profile = split(r.variant)[1]
+        current = winners.get(profile)
+        if current is None or ((_wall(r), r.metrics["imbalance"]) <
+                               (_wall(current), current.metrics["imbalance"])):
+            winners[profile] = r
+    return winners
+
+
+def save(winners, path=BEST_PATH, **context):
+    """Merge the winners into the JSON file, keeping other profiles' entries."""
+    saved = json.loads(path.read_text()) if path.exists() else {}
+    for profile, r in winners.items():
+        saved[profile] = {"schedule": split(r.variant)[0], "threads": r.threads,
+                          "iterations": r.size, "wall": _wall(r),
+                          "imbalance": r.metrics["imbalance"], **context}
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(saved, indent=2) + "\n")
+
+
+def _wall(r):
+    return r.metrics.get("wall", r.time)
+
+
+def report(records, winners):
+    collapsed = stats.collapse(records)
+    for profile, winner in winners.items():
+        print(f"== {profile}")
+        print(f"{'Threads':<8} {'Best schedule':<15} {'Wall (s)':<10} {'Imbalance':<10} {'static wall'}")
+        for threads in sorted({r.threads for r in collapsed}):
+            rows = [r for r in collapsed if r.threads == threads and split(r.variant)[1] == profile]
+            if not rows:
+                continue
+            fastest = min(rows, key=_wall)
+            static = [_wall(r) for r in rows if split(r.variant)[0] == "static"]
+            imbalance = f"{fastest.metrics['imbalance']:.2f}%"
+            print(f"{threads:<8} {split(fastest.variant)[0]:<15} {_wall(fastest):<10.4f} "
+                  f"{imbalance:<10} {static[0] if static else float('nan'):.4f}")
+        print(f"Best: OMP_SCHEDULE={split(winner.variant)[0]} OMP_NUM_THREADS={winner.threads} "
+              f"({_wall(winner):.4f}s, {winner.metrics['imbalance']:.2f}% imbalance)\n")
@@ -0,0 +1,395 @@
+"""In-process access to the LAB3 correlation kernels (LAB3/correlate.cpp) through ctypes.
+
+Two output layouts are supported:
+
+* dense: the kernels' ``ny * ny`` float32 ``result``, where correlation
+  (i, j), j <= i, sits at ``result[i + j * ny]`` and the rest is untouched;
+* packed: only the lower triangle, row by row -- row i holds correlations
+  (i, 0..i) at offset ``i * (i + 1) / 2`` -- which halves the memory.
+
+A packed result can live in a file: ``correlate_packed(data, out=path)`` maps
+the file with ``np.memmap`` and lets the kernel write straight into it, and
+``Packed.open(path)`` maps it back (the same file ``correlate <ny> <nx>
+--output FILE`` writes).  Rows are read through the map, so only the pages
+touched are loaded::
+
+    corr = correlation.correlate_packed(data, out="corr.f32")
+    corr.row(17)             # all ny correlations of row 17
+    corr[17, 3]              # one coefficient
+
+Inputs larger than memory are handled by ``stream``, which maps an on-disk
+float32 matrix (raw or ``.npy``) and computes it stripe by stripe within a
+memory budget::
+
+    corr = correlation.stream("signals.npy", budget=512e6, out="corr.f32")
+
+Streams of samples are handled by ``Incremental``, which keeps running sums
+and cross products and folds in each batch of new columns in
+O(ny^2 * columns), optionally over a sliding window::
+
+    inc = correlation.Incremental(ny, window=10_000)
+    for batch in batches:        # (ny, k) arrays of new samples
+        inc.update(batch)
+    inc.correlation()            # Packed, as if correlated from scratch
+
+Queries that only need the strongest pairs skip the matrix altogether:
+``above(data, 0.9)`` and ``top_k(data, 10)`` return sparse (i, j, r) triples,
+with memory proportional to the result.
+
+``reference`` is the NumPy/BLAS baseline (row centring plus one
+``norm @ norm.T``), and ``cross_validate`` runs every kernel variant on seeded
+inputs against it (``python -m bench crosscheck``).
+"""
+
+import ctypes
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench import runner, stats
+from bench.runner import Record
+
+SOURCE = runner.ROOT / "LAB3" / "correlate.cpp"
+
+VARIANTS = ("seq", "omp", "fast", "blocked")
+
+# Experiment name of cross_validate's records
+EXPERIMENT = "correlate-check"
+
+_floats = np.ctypeslib.ndpointer(dtype=np.float32, flags="C_CONTIGUOUS")
+_doubles = np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS")
+_int, _ll = ctypes.c_int, ctypes.c_longlong
+_lib = None
+
+
+def library():
+    """Build (if needed) and load the correlation library, declaring its signatures once."""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(str(runner.build_library(SOURCE)))
+        for name in VARIANTS + ("packed",):
+            kernel = getattr(lib, f"correlate_{name}")
+            kernel.argtypes = [_int, _int, _floats, _floats]
+            kernel.restype = None
+        lib.correlate_stream.argtypes = [ctypes.c_char_p, _ll, _int, _int, ctypes.c_char_p, _ll]
+        lib.correlate_stream.restype = ctypes.c_long
+        lib.correlate_accumulate.argtypes = [_int, _int, _floats, _doubles, ctypes.c_double,
+                                             _doubles, _doubles]
+        lib.correlate_accumulate.restype = None
+        lib.correlate_finish.argtypes = [_int, _ll, _doubles, _doubles, _floats]
+        lib.correlate_finish.restype = None
+        _ptr = ctypes.POINTER
+        lib.correlate_threshold.argtypes = [_int, _int, _floats, ctypes.c_double,
+                                            _ptr(_ptr(_int)), _ptr(_ptr(_int)),
+                                            _ptr(_ptr(ctypes.c_float))]
+        lib.correlate_threshold.restype = _ll
+        lib.correlate_release.argtypes = [ctypes.c_void_p]
+        lib.correlate_release.restype = None
+        lib.correlate_topk.argtypes = [_int, _int, _floats, _int,
+                                       np.ctypeslib.ndpointer(dtype=np.int32, flags="C_CONTIGUOUS"),
+                                       _floats]
+        lib.correlate_topk.restype = None
+        _lib = lib
+    return _lib
+
+
+def _input(data):
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    if data.ndim != 2:
+        raise ValueError("correlation input must be a 2-D (ny, nx) array")
+    return data
+
+
+def packed_size(ny):
+    """Number of floats in the packed lower triangle of an ny x ny matrix."""
+    return ny * (ny + 1) // 2
+
+
+def packed_index(i, j):
+    """Offset of correlation (i, j) in the packed layout; (i, j) and (j, i) coincide."""
+    i, j = np.maximum(i, j), np.minimum(i, j)
+    return i * (i + 1) // 2 + j
+
+
+def correlate(data, variant="blocked"):
+    """Dense ``ny * ny`` result of one kernel variant, as an (ny, ny) array.
+
+    Only the kernels' lower triangle is filled: element ``[j, i]`` of the
+    returned array holds correlation (i, j) for j <= i, the rest is zero.
+    """
+    data = _input(data)
+    ny, nx = data.shape
+    result = np.zeros((ny, ny), dtype=np.float32)
+    getattr(library(), f"correlate_{variant}")(ny, nx, data, result)
+    return result
+
+
+def correlate_packed(data, out=None):
+    """Packed lower triangle of the correlation matrix of ``data``'s rows.
+
+    With ``out`` the result is written to that file through ``np.memmap``,
+    so it need not fit in memory.
+    """
+    data = _input(data)
+    ny, nx = data.shape
+    if out is None:
+        result = np.empty(packed_size(ny), dtype=np.float32)
+    else:
+        result = np.memmap(out, dtype=np.float32, mode="w+", shape=(packed_size(ny),))
+    library().correlate_packed(ny, nx, data, result)
+    if out is not None:
+        result.flush()
+    return Packed(result)
+
+
+def stream(path, budget, out=None, nx=None):
+    """Out-of-core packed correlation of the float32 matrix stored at ``path``.
+
+    ``path`` is a ``.npy`` file or, with ``nx`` given, raw row-major float32
+    values.  The input is memory-mapped, never read into Python, and the
+    kernel processes it in row stripes sized so that its resident memory stays
+    within ``budget`` bytes (see ``correlate_stream`` in LAB3/correlate.cpp).
+    The result goes to ``out`` (default: ``<path>.corr.f32``) and is returned
+    mapped as a ``Packed``, with the stripe height in ``stripe_rows``.
+    """
+    path = Path(path)
+    if path.suffix == ".npy":
+        header = np.load(path, mmap_mode="r")
+        if header.ndim != 2 or header.dtype != np.float32 or not header.flags.c_contiguous:
+            raise ValueError(f"{path}: expected a C-ordered 2-D float32 array")
+        (ny, nx), offset = header.shape, header.offset
+        del header
+    elif nx is None:
+        raise ValueError(f"{path}: raw input needs nx")
+    else:
+        ny, offset = path.stat().st_size // (4 * nx), 0
+    out = Path(out) if out is not None else path.with_suffix(".corr.f32")
+    stripe_rows = library().correlate_stream(str(path).encode(), offset, ny, nx,
+                                             str(out).encode(), int(budget))
+    if stripe_rows < 0:
+        raise OSError(f"correlate_stream failed for {path} -> {out}")
+    result = Packed.open(out)
+    result.stripe_rows = stripe_rows
+    return result
+
+
+def above(data, threshold):
+    """Pairs (i, j), j < i, of rows with |r| >= threshold as (i, j, r) arrays.
+
+    Tiles whose pairs cannot reach the threshold any more are abandoned part
+    way through the columns (see ``correlate_threshold``).
+    """
+    data = _input(data)
+    ny, nx = data.shape
+    lib = library()
+    rows, cols = ctypes.POINTER(_int)(), ctypes.POINTER(_int)()
+    values = ctypes.POINTER(ctypes.c_float)()
+    n = lib.correlate_threshold(ny, nx, data, threshold, ctypes.byref(rows), ctypes.byref(cols),
+                                ctypes.byref(values))
+    try:
+        return (np.ctypeslib.as_array(rows, (n,)).copy() if n else np.empty(0, np.int32),
+                np.ctypeslib.as_array(cols, (n,)).copy() if n else np.empty(0, np.int32),
+                np.ctypeslib.as_array(values, (n,)).copy() if n else np.empty(0, np.float32))
+    finally:
+        for pointer in (rows, cols, values):
+            lib.correlate_release(pointer)
+
+
+def top_k(data, k):
+    """The k partners with the largest |r| of every row, as (i, j, r) arrays.
+
+    Triples are grouped by row i, strongest first; ``ny * k`` of them, fewer
+    if rows have fewer than k partners.
+    """
+    data = _input(data)
+    ny, nx = data.shape
+    partners = np.empty((ny, k), dtype=np.int32)
+    values = np.empty((ny, k), dtype=np.float32)
+    library().correlate_topk(ny, nx, data, k, partners, values)
+    keep = partners >= 0
+    rows = np.broadcast_to(np.arange(ny, dtype=np.int32)[:, None], partners.shape)
+    return rows[keep], partners[keep], values[keep]
+
+
+class Incremental:
+    """Correlation of ny rows whose samples (columns) arrive in batches.
+
+    Keeps per-row sums and the packed cross products of all samples seen --
+    or, with ``window``, of the last ``window`` samples, whose values are kept
+    in a ring buffer so the ones leaving the window can be subtracted again.
+    Values are shifted by the first batch's row means before accumulating.
+    """
+
+    def __init__(self, ny, window=None):
+        self.ny = ny
+        self.window = window
+        self.count = 0
+        self.shift = None
+        self.sums = np.zeros(ny)
+        self.cross = np.zeros(packed_size(ny))
+        if window:
+            self._ring = np.empty((ny, window), dtype=np.float32)
+            self._head = 0   # ring column of the oldest sample
+
+    def _accumulate(self, columns, sign):
+        library().correlate_accumulate(self.ny, columns.shape[1], columns, self.shift, sign,
+                                       self.sums, self.cross)
+
+    def update(self, columns):
+        """Add a (ny, k) batch of new samples, dropping the oldest beyond the window."""
+        columns = _input(columns)
+        if columns.shape[0] != self.ny:
+            raise ValueError(f"expected {self.ny} rows, got {columns.shape[0]}")
+        if self.shift is None:
+            self.shift = columns.mean(axis=1, dtype=np.float64)
+        if self.window:
+            columns = np.ascontiguousarray(columns[:, -self.window:])
+            evict = max(0, self.count + columns.shape[1] - self.window)
+            if evict:
+                oldest = (self._head + np.arange(evict)) % self.window
+                self._accumulate(np.ascontiguousarray(self._ring[:, oldest]), -1.0)
+                self._head = (self._head + evict) % self.window
+                self.count -= evict
+            slots = (self._head + self.count + np.arange(columns.shape[1])) % self.window
+            self._ring[:, slots] = columns
+        self._accumulate(columns, 1.0)
+        self.count += columns.shape[1]
+
+    def rebuild(self):
+        """Recompute the window's accumulators from the ring buffer.
+
+        Subtracting evicted samples accumulates rounding error over very long
+        streams; calling this now and then resets it.
+        """
+        if not self.window or not self.count:
+            return
+        order = (self._head + np.arange(self.count)) % self.window
+        self.sums[:] = 0.0
+        self.cross[:] = 0.0
+        self._accumulate(np.ascontiguousarray(self._ring[:, order]), 1.0)
+
+    def correlation(self):
+        """Packed correlations of the current samples."""
+        if self.count < 2:
+            raise ValueError("need at least two samples")
+        result = np.empty(packed_size(self.ny), dtype=np.float32)
+        library().correlate_finish(self.ny, self.count, self.sums, self.cross, result)
+        return Packed(result)
+
+
+class Packed:
+    """Accessors over a packed lower-triangular correlation matrix."""
+
+    def __init__(self, values):
+        self.values = values
+        self.ny = math.isqrt(8 * len(values) + 1) // 2
+        if packed_size(self.ny) != len(values):
+            raise ValueError(f"{len(values)} values is not a packed triangle")
+
+    @classmethod
+    def open(cls, path, mode="r"):
+        """Map a packed result file written by ``correlate_packed`` or ``correlate --output``."""
+        return cls(np.memmap(path, dtype=np.float32, mode=mode))
+
+    def __len__(self):
+        return self.ny
+
+    def __getitem__(self, index):
+        i, j = index
+        return self.values[packed_index(i, j)]
+
+    def lower(self, i):
+        """Correlations (i, 0..i): a view into the packed storage."""
+        start = packed_index(i, 0)
+        return self.values[start:start + i + 1]
+
+    def row(self, i):
+        """All ny correlations of row i (a copy; entries j > i are gathered from later rows)."""
+        j = np.arange(self.ny)
+        return np.asarray(self.values[packed_index(i, j)])
+
+    def to_dense(self):
+        """The full symmetric (ny, ny) matrix."""
+        i, j = np.tril_indices(self.ny)
+        dense = np.empty((self.ny, self.ny), dtype=np.float32)
+        dense[i, j] = self.values
+        dense[j, i] = self.values
+        return dense
+
+
+def reference(data):
+    """NumPy/BLAS correlation matrix: centre and scale rows in float64, then one GEMM."""
+    norm = np.asarray(data, dtype=np.float64)
+    norm = norm - norm.mean(axis=1, keepdims=True)
+    norm /= np.linalg.norm(norm, axis=1, keepdims=True)
+    return norm @ norm.T
+
+
+def set_threads(threads):
+    """OpenMP threads for the kernels (libgomp's omp_set_num_threads through the library)."""
+    library().omp_set_num_threads(threads)
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def cross_validate(sizes, seed=0, threads=None, repeats=3, variants=VARIANTS + ("packed",)):
+    """Records of every variant and of ``reference`` on seeded (ny, nx) inputs.
+
+    Records are keyed by ``size`` = ny and a variant named ``"<variant>
+    nx=<nx>"``, so inputs that differ only in nx stay separate points.  Each
+    carries ``max_error``, the largest absolute difference from the reference
+    over the lower triangle, and ``nx``.  ``threads`` is the OpenMP thread
+    count of the kernels (default: all CPUs); NumPy's BLAS uses its own
+    threading.
+    """
+    threads = threads or os.cpu_count()
+    set_threads(threads)
+    records = []
+    for ny, nx in sizes:
+        data = np.random.default_rng(seed).standard_normal((ny, nx), dtype=np.float32)
+        i, j = np.tril_indices(ny)
+        expected = None
+        for _ in range(repeats):
+            elapsed, dense = _timed(reference, data)
+            expected = dense[i, j]
+            records.append(Record(EXPERIMENT, f"numpy nx={nx}", threads, ny, elapsed,
+                                  {"nx": nx, "max_error": 0.0}))
+        for variant in variants:
+            for _ in range(repeats):
+                if variant == "packed":
+                    elapsed, result = _timed(correlate_packed, data)
+                    got = result.values
+                else:
+                    elapsed, result = _timed(correlate, data, variant)
+                    got = result[j, i]
+                error = float(np.abs(got - expected).max())
+                records.append(Record(EXPERIMENT, f"{variant} nx={nx}", threads, ny, elapsed,
+                                      {"nx": nx, "max_error": error}))
+    return records
+
+
+def report(records, tolerance=1e-5):
+    """Print time, speed relative to NumPy and max error per size; returns the failing records."""
+    points = stats.collapse(records)
+    failures = []
+    for ny, nx in sorted({(r.size, r.metrics["nx"]) for r in points}):
+        rows = [r for r in points if (r.size, r.metrics["nx"]) == (ny, nx)]
+        numpy_time = next(r.time for r in rows if r.variant == f"numpy nx={nx:.0f}")
+        print(f"\n{ny} x {nx:.0f}, {rows[0].threads} threads")
+        print(f"{'Variant':10s} {'Time (s)':>10s} {'vs NumPy':>9s} {'Max error':>11s}")
+        for r in rows:
+            error = r.metrics["max_error"]
+            failed = error > tolerance
+            if failed:
+                failures.append(r)
+            variant = r.variant.rsplit(" nx=", 1)[0]
+            print(f"{variant:10s} {r.time:10.4f} {numpy_time / r.time:8.2f}x {error:11.2e}"
+                  f"{'  FAIL' if failed else ''}")
+    return failures
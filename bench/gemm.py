@@ -0,0 +1,97 @@
+"""NumPy checker for the blocked GEMM engine in LAB1/q2_matrix_blocked.c.
+
+The engine is built as a shared library and called through ctypes on
+C-contiguous float64 NumPy matrices; every result is compared with
+``np.dot`` on the same inputs and both are timed::
+
+    records = gemm.check([500, 1000, 2000], threads=8)
+    gemm.report(records)
+"""
+
+import ctypes
+import os
+import time
+
+import numpy as np
+
+from bench import runner, stats
+from bench.runner import Record
+
+SOURCE = runner.ROOT / "LAB1" / "q2_matrix_blocked.c"
+
+EXPERIMENT = "gemm-check"
+
+_matrix = np.ctypeslib.ndpointer(dtype=np.float64, ndim=2, flags="C_CONTIGUOUS")
+_lib = None
+
+
+def library():
+    """Build (if needed) and load the GEMM library, declaring its signatures once."""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(str(runner.build_library(SOURCE)))
+        lib.matrix_multiply_blocked.argtypes = [_matrix, _matrix, _matrix, ctypes.c_int]
+        lib.matrix_multiply_blocked.restype = None
+        _lib = lib
+    return _lib
+
+
+def matmul(a, b, out=None):
+    """C = A * B for square float64 matrices with the blocked engine."""
+    n = len(a)
+    if a.shape != (n, n) or b.shape != (n, n):
+        raise ValueError("matmul expects two n x n matrices")
+    a = np.ascontiguousarray(a, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    out = np.empty((n, n)) if out is None else out
+    library().matrix_multiply_blocked(a, b, out, n)
+    return out
+
+
+def check(sizes, threads=None, seed=0, repeats=3):
+    """Records for the engine ("blocked") and ``np.dot`` ("numpy") at every size.
+
+    ``gflops`` is 2n^3 / time; ``max_error`` is the engine's largest
+    difference from ``np.dot`` relative to the largest |C| entry.
+    """
+    threads = threads or os.cpu_count()
+    library().omp_set_num_threads(threads)
+    rng = np.random.default_rng(seed)
+    records = []
+    for n in sizes:
+        a, b = rng.standard_normal((n, n)), rng.standard_normal((n, n))
+        out = np.empty((n, n))
+        flops = 2.0 * n ** 3
+        for _ in range(repeats):
+            start = time.perf_counter()
+            expected = np.dot(a, b)
+            elapsed = time.perf_counter() - start
+            records.append(Record(EXPERIMENT, "numpy", threads, n, elapsed,
+                                  {"gflops": flops / elapsed / 1e9, "max_error": 0.0}))
+        scale = np.abs(expected).max()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            matmul(a, b, out)
+            elapsed = time.perf_counter() - start
+            error = float(np.abs(out - expected).max() / scale)
+            records.append(Record(EXPERIMENT, "blocked", threads, n, elapsed,
+                                  {"gflops": flops / elapsed / 1e9, "max_error": error}))
+    return records
+
+
+def report(records, tolerance=1e-12):
+    """Print GFLOP/s of both paths and the relative error per size; returns the failing records."""
+    points = stats.collapse(records)
+    failures = []
+    print(f"{'Size':>6s} {'Threads':>8s} {'Blocked GFLOP/s':>16s} {'np.dot GFLOP/s':>15s} "
+          f"{'vs np.dot':>9s} {'Max rel. error':>15s}")
+    for size in sorted({r.size for r in points}):
+        ours = next(r for r in points if r.size == size and r.variant == "blocked")
+        ref = next(r for r in points if r.size == size and r.variant == "numpy")
+        error = ours.metrics["max_error"]
+        if error > tolerance:
+            failures.append(ours)
+        print(f"{size:6d} {ours.threads:8d} {ours.metrics['gflops']:16.2f} "
+              f"{ref.metrics['gflops']:15.2f} {ref.time / ours.time:8.2f}x {error:15.2e}"
+              f"{'  FAIL' if error > tolerance else ''}")
+    return failures
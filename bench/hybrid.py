@@ -0,0 +1,81 @@
+"""Ranks x threads sweep of the LAB5 hybrid MPI+OpenMP kernels.
+
+For a fixed number of cores every factorisation cores = ranks x threads is
+run with ``mpirun -np ranks`` and ``OMP_NUM_THREADS=threads`` on the
+binary's ``--hybrid`` mode.  When the machine has the cores, each rank is
+given its own block of ``threads`` cores (Open MPI ``--map-by slot:PE=t
+--bind-to core``) and its threads are bound inside it with
+``OMP_PROC_BIND=close``; otherwise ranks are left unbound.  Records are
+relabelled ``"hybrid <ranks>x<threads>"`` so all decompositions sit in one
+stored batch, and the ranking shows which one gives the most bandwidth.
+"""
+
+import os
+
+from bench import runner, stats
+
+EXPERIMENTS = ("mpi_daxpy", "mpi_dot")
+
+
+def decompositions(cores):
+    """(ranks, threads) pairs with ranks * threads == cores, most ranks first."""
+    return [(cores // t, t) for t in range(1, cores + 1) if cores % t == 0]
+
+
+def binding(ranks, threads, cpus=None):
+    """(mpirun options, OpenMP environment) placing each rank on its own cores."""
+    cpus = cpus or os.cpu_count()
+    if ranks * threads > cpus:
+        return ("--bind-to", "none"), {}
+    return (("--map-by", f"slot:PE={threads}", "--bind-to", "core"),
+            {"OMP_PROC_BIND": "close", "OMP_PLACES": "cores"})
+
+
+def hybrid_sweep(name, cores, size=None, chunks=16, warmup=0, repeats=1):
+    size = size or runner.EXPERIMENTS[name].size
+    records = []
+    for total in cores:
+        for ranks, threads in decompositions(total):
+            launcher, env = binding(ranks, threads)
+            env = {**env, "OMP_NUM_THREADS": str(threads)}
+            for r in runner.run(name, args=(size, "--hybrid", "--chunks", chunks), env=env,
+                                warmup=warmup, repeats=repeats, ranks=ranks, launcher=launcher):
+                r.variant = f"{r.variant} {ranks}x{threads}"
+                records.append(r)
+    return records
+
+
+def best_decomposition(records):
+    """Median record per decomposition, by core count and then fastest first.
+
+    Every decomposition is its own variant, so ``stats.collapse`` finds a
+    1-thread baseline only for 1x1; ``speedup``/``efficiency`` are replaced
+    here by the speedup over the 1x1 run of the same size (left out when the
+    sweep has no 1-core point).
+    """
+    points = stats.group(records)
+    serial = {size: [r.time for r in rs] for (variant, threads, size), rs in points.items()
+              if threads == 1}
+    rows = [rs[0] for rs in runner.by_variant(stats.collapse(records)).values()]
+    for r in rows:
+        for key in ("speedup", "speedup_ci_low", "speedup_ci_high", "efficiency"):
+            r.metrics.pop(key, None)
+        if r.size in serial:
+            times = [x.time for x in points[r.variant, r.threads, r.size]]
+            s, low, high = stats.speedup(serial[r.size], times)
+            r.metrics.update(speedup=s, speedup_ci_low=low, speedup_ci_high=high,
+                             efficiency=s / r.threads * 100)
+    return sorted(rows, key=lambda r: (r.threads, r.time))
+
+
+def report(records):
+    """Print the decompositions per core count and return the best variant overall."""
+    rows = best_decomposition(records)
+    print(f"{'Decomposition':<16} {'Cores':<6} {'Time (s)':<12} {'Compute (s)':<12} "
+          f"{'Comm wait (s)':<14} {'BW (GB/s)':<10} {'Speedup'}")
+    for r in rows:
+        m = r.metrics
+        speedup = f"{m['speedup']:.2f}x" if "speedup" in m else "-"
+        print(f"{r.variant:<16} {r.threads:<6} {r.time:<12.6f} {m.get('compute', 0):<12.6f} "
+              f"{m.get('comm_wait', 0):<14.6f} {m.get('bandwidth', 0):<10.2f} {speedup}")
+    return max(rows, key=lambda r: r.metrics.get("bandwidth", 0)).variant
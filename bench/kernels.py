@@ -0,0 +1,167 @@
+"""In-process access to the LAB2 kernels (LAB2/lib/kernels.c) through ctypes.
+
+Arrays are passed as pointers to caller-owned, C-contiguous float64 NumPy
+buffers, so nothing is copied and one allocation can be reused across a whole
+sweep (and across experiments)::
+
+    bufs = kernels.Buffers(100_000_000)
+    for threads in range(1, 18):
+        t = kernels.triad(bufs.a, bufs.b, bufs.c, 3.3, threads)
+"""
+
+import ctypes
+import os
+
+import numpy as np
+
+from bench import runner
+from bench.runner import Record
+
+SOURCE = runner.LAB2 / "lib" / "kernels.c"
+
+SCHEDULES = {"static": 1, "dynamic": 2, "guided": 3, "auto": 4}
+
+_array = np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS")
+_int, _ll, _double = ctypes.c_int, ctypes.c_longlong, ctypes.c_double
+_lib = None
+
+
+def library():
+    """Build (if needed) and load the kernel library, declaring its signatures once."""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(str(runner.build_library(SOURCE)))
+        lib.fill.argtypes = [_array, _ll, _double, _int]
+        lib.fill.restype = None
+        lib.vector_add.argtypes = [_array, _array, _array, _ll, _int, _int, _int]
+        lib.vector_add.restype = _double
+        lib.triad.argtypes = [_array, _array, _array, _double, _ll, _int, _int, _int]
+        lib.triad.restype = _double
+        lib.triad_passes.argtypes = [_array, _array, _array, _double, _ll, _int, _int, _int, _int]
+        lib.triad_passes.restype = _double
+        lib.pi_integrate.argtypes = [_ll, _int, _int, _int, ctypes.POINTER(_double)]
+        lib.pi_integrate.restype = _double
+        lib.peak_flops.argtypes = [_int, _ll, ctypes.POINTER(_double)]
+        lib.peak_flops.restype = _double
+        for kernel in (lib.critical_sum, lib.reduce_sum):
+            kernel.argtypes = [_ll, _int, _int, _int, ctypes.POINTER(_double)]
+            kernel.restype = _double
+        _lib = lib
+    return _lib
+
+
+def _schedule(schedule):
+    kind, _, chunk = schedule.partition(",")
+    return SCHEDULES[kind], int(chunk or 0)
+
+
+def _check(*arrays):
+    n = len(arrays[0])
+    for a in arrays:
+        if a.dtype != np.float64 or not a.flags.c_contiguous or len(a) != n:
+            raise ValueError("kernel arrays must be C-contiguous float64 of equal length")
+    return n
+
+
+def fill(a, value, threads=1):
+    library().fill(a, len(a), value, threads)
+
+
+def vector_add(a, b, c, threads, schedule="static"):
+    """c = a + b; returns the kernel time in seconds."""
+    n = _check(a, b, c)
+    return library().vector_add(a, b, c, n, threads, *_schedule(schedule))
+
+
+def triad(a, b, c, scalar, threads, schedule="static"):
+    """a = b + scalar * c; returns the kernel time in seconds."""
+    n = _check(a, b, c)
+    return library().triad(a, b, c, scalar, n, threads, *_schedule(schedule))
+
+
+def triad_passes(a, b, c, scalar, threads, passes, schedule="static"):
+    """``passes`` triads in one parallel region; returns the total kernel time."""
+    n = _check(a, b, c)
+    return library().triad_passes(a, b, c, scalar, n, threads, *_schedule(schedule), passes)
+
+
+def pi(steps, threads, schedule="static"):
+    """Returns (time, pi estimate)."""
+    result = _double()
+    elapsed = library().pi_integrate(steps, threads, *_schedule(schedule), ctypes.byref(result))
+    return elapsed, result.value
+
+
+def critical_sum(n, threads, schedule="static"):
+    """EXP5: adds 1.0 n times inside a critical section; returns (time, sum)."""
+    result = _double()
+    elapsed = library().critical_sum(n, threads, *_schedule(schedule), ctypes.byref(result))
+    return elapsed, result.value
+
+
+def reduce_sum(n, threads, schedule="static"):
+    """EXP5: adds 1.0 n times with reduction(+); returns (time, sum)."""
+    result = _double()
+    elapsed = library().reduce_sum(n, threads, *_schedule(schedule), ctypes.byref(result))
+    return elapsed, result.value
+
+
+def peak_flops(threads, iterations=20_000_000):
+    """Returns (time, floating-point operations) of the compute-only microbenchmark."""
+    flops = _double()
+    elapsed = library().peak_flops(threads, iterations, ctypes.byref(flops))
+    return elapsed, flops.value
+
+
+class Buffers:
+    """Three reusable arrays of ``n`` doubles, first-touched in parallel.
+
+    ``threads`` (default: every CPU) should match the widest sweep the
+    buffers serve, so each thread's static partition is placed near it.
+    """
+
+    def __init__(self, n, threads=None):
+        threads = threads or os.cpu_count()
+        self.n = n
+        self.a = np.empty(n)
+        self.b = np.empty(n)
+        self.c = np.empty(n)
+        fill(self.a, 0.0, threads)
+        fill(self.b, 1.1, threads)
+        fill(self.c, 2.2, threads)
+
+
+# Experiment -> (kernel, variant) pairs that reproduce it, for storing and plotting
+EXPERIMENT_KERNELS = {"exp2": (("vector_add", "vector_add"),), "exp7": (("triad", "triad"),),
+                      "exp3": (("pi", "strong"),),
+                      "exp5": (("critical_sum", "critical"), ("reduce_sum", "reduction"))}
+
+
+def sweep(name, threads, size=None, warmup=1, repeats=5, schedule="static", buffers=None):
+    """In-process equivalent of ``runner.run`` for the experiments above.
+
+    Pass ``buffers`` to reuse an existing allocation across several sweeps.
+    """
+    size = size or runner.EXPERIMENTS[name].size
+    if name in ("exp2", "exp7") and buffers is None:
+        buffers = Buffers(size, max(threads))
+    records = []
+    for kernel, variant in EXPERIMENT_KERNELS[name]:
+        for p in threads:
+            for trial in range(warmup + repeats):
+                if kernel == "vector_add":
+                    elapsed = vector_add(buffers.b, buffers.c, buffers.a, p, schedule)
+                elif kernel == "triad":
+                    elapsed = triad(buffers.a, buffers.b, buffers.c, 3.3, p, schedule)
+                elif kernel == "critical_sum":
+                    elapsed, _ = critical_sum(size, p, schedule)
+                elif kernel == "reduce_sum":
+                    elapsed, _ = reduce_sum(size, p, schedule)
+                else:
+                    elapsed, _ = pi(size, p, schedule)
+                if trial >= warmup:
+                    metrics = {}
+                    if kernel == "triad":
+                        metrics["bandwidth"] = 3 * size * 8 / 1e9 / elapsed
+                    records.append(Record(name, variant, p, size, elapsed, metrics))
+    return records
@@ -0,0 +1,188 @@
+"""Roofline model over the stored sweeps.
+
+The memory ceiling comes from the measured triad bandwidth (EXP7, plus the
+cache regimes of the working-set sweep when one is stored), the compute
+ceiling from the ``peak_flops`` microbenchmark in LAB2/lib/kernels.c.  Each
+kernel is described by its FLOP count and *compulsory* memory traffic as
+functions of a stored record, so every measured run becomes one point:
+arithmetic intensity (FLOP/byte) against achieved GFLOP/s.
+
+A point far below the roof at its intensity is worth optimising; a point on
+the slanted part of the roof is already bandwidth bound.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from bench import kernels, stats, working_set
+from bench.store import ResultStore
+
+
+@dataclass
+class KernelModel:
+    experiment: str
+    label: str
+    flops: callable          # record -> floating-point operations
+    bytes: callable          # record -> bytes that must cross the memory interface
+    variants: tuple = None   # restrict to these variants (None = all)
+
+
+def _triangle(r):
+    return r.size * (r.size + 1) / 2
+
+
+KERNELS = [
+    KernelModel("exp2", "vector add (EXP2)", lambda r: r.size, lambda r: 24 * r.size),
+    KernelModel("exp7", "triad (EXP7)", lambda r: 2 * r.size, lambda r: 24 * r.size),
+    # x = (i + 0.5) * step; sum += 4 / (1 + x * x): 6 FLOP per step, no array traffic
+    KernelModel("exp3", "pi integration (EXP3)", lambda r: 6 * r.size, lambda r: 0),
+    # 2N^3 FLOP over A, B read and C written once
+    KernelModel("matmul_1d", "matmul 1D (LAB1)", lambda r: 2 * r.size ** 3,
+                lambda r: 24 * r.size ** 2),
+    KernelModel("matmul_2d", "matmul 2D (LAB1)", lambda r: 2 * r.size ** 3,
+                lambda r: 24 * r.size ** 2),
+    KernelModel("matmul_blocked", "matmul blocked (LAB1)", lambda r: 2 * r.size ** 3,
+                lambda r: 24 * r.size ** 2),
+    # lower-triangle dot products plus normalisation; float input and output
+    KernelModel("correlate", "correlate (LAB3)",
+                lambda r: 2 * r.metrics["nx"] * _triangle(r) + 5 * r.size * r.metrics["nx"],
+                lambda r: 4 * r.size * r.metrics["nx"] + 4 * _triangle(r)),
+]
+
+
+@dataclass
+class Point:
+    label: str
+    variant: str
+    threads: int
+    intensity: float   # FLOP/byte (inf for kernels without memory traffic)
+    gflops: float
+
+
+def memory_ceilings(store, host=None):
+    """{'DRAM': GB/s, 'L1': GB/s, ...} from the latest stored triad sweeps.
+
+    Like the kernel points, the ceilings come from the latest sweep (of
+    ``host``, if given), so runs from other machines or older builds do not
+    raise the roof.
+    """
+    ceilings = {}
+    triad = stats.collapse(store.query("exp7", host=host, latest=True).records())
+    if triad:
+        ceilings["DRAM"] = max(24 * r.size / r.time / 1e9 for r in triad)
+    sweep = stats.collapse(store.query(working_set.EXPERIMENT, host=host, latest=True).records())
+    if sweep:
+        caches = {k[len("cache_"):]: v for k, v in sweep[0].metrics.items() if k.startswith("cache_")}
+        edges = sorted(caches.items(), key=lambda item: item[1])
+        low = 0
+        for level, size in edges:
+            inside = [r.metrics["bandwidth"] for r in sweep
+                      if low < r.size * working_set.BYTES_PER_ELEMENT <= size]
+            if inside:
+                ceilings[level] = max(inside)
+            low = size
+        if "DRAM" not in ceilings:
+            ceilings["DRAM"] = max(r.metrics["bandwidth"] for r in sweep
+                                   if r.size * working_set.BYTES_PER_ELEMENT > low)
+    return ceilings
+
+
+def measure_bandwidth(threads, n=20_000_000, repeats=5):
+    """Fallback DRAM ceiling: best in-process triad over ``repeats`` runs."""
+    bufs = kernels.Buffers(n, threads)
+    best = min(kernels.triad(bufs.a, bufs.b, bufs.c, 3.3, threads) for _ in range(repeats))
+    return 24 * n / best / 1e9
+
+
+def compute_ceiling(threads, repeats=3):
+    """Peak GFLOP/s of the multiply-add microbenchmark at ``threads`` threads."""
+    best = 0.0
+    for _ in range(repeats):
+        elapsed, flops = kernels.peak_flops(threads)
+        best = max(best, flops / elapsed / 1e9)
+    return best
+
+
+def points(store, host=None, models=KERNELS):
+    """One point per (kernel, variant, thread count) from each kernel's latest stored sweep."""
+    result = []
+    for model in models:
+        records = store.query(model.experiment, host=host, latest=True).records()
+        for r in stats.collapse(records):
+            if model.variants and r.variant not in model.variants:
+                continue
+            flops, moved = model.flops(r), model.bytes(r)
+            intensity = flops / moved if moved else np.inf
+            result.append(Point(model.label, r.variant, r.threads, intensity, flops / r.time / 1e9))
+    return result
+
+
+def attainable(intensity, peak_gflops, bandwidth):
+    return min(peak_gflops, bandwidth * intensity)
+
+
+def report(pts, peak_gflops, bandwidth):
+    print(f"{'Kernel':<26} {'Variant':<20} {'Thr':>4} {'FLOP/B':>8} {'GFLOP/s':>9} "
+          f"{'Roof':>9} {'% roof':>7}  Bound")
+    for p in pts:
+        roof = attainable(p.intensity, peak_gflops, bandwidth)
+        bound = "memory" if bandwidth * p.intensity < peak_gflops else "compute"
+        print(f"{p.label:<26} {p.variant:<20} {p.threads:>4} {p.intensity:>8.3g} "
+              f"{p.gflops:>9.2f} {roof:>9.2f} {100 * p.gflops / roof:>6.1f}%  {bound}")
+
+
+def plot(pts, peak_gflops, ceilings, path):
+    import matplotlib.pyplot as plt
+
+    finite = [p.intensity for p in pts if np.isfinite(p.intensity)]
+    x_max = max([100.0, *finite]) * 10
+    x = np.geomspace(1e-2, x_max, 400)
+
+    plt.figure(figsize=(12, 7))
+    for i, (level, bandwidth) in enumerate(sorted(ceilings.items(), key=lambda item: item[1])):
+        style = '-' if level == "DRAM" else '--'
+        plt.loglog(x, np.minimum(peak_gflops, bandwidth * x), style, color='black' if level == "DRAM" else 'gray',
+                   linewidth=2 if level == "DRAM" else 1,
+                   label=f'{level} roof: {bandwidth:.1f} GB/s')
+    plt.axhline(y=peak_gflops, color='red', linestyle=':', linewidth=1,
+                label=f'Compute peak: {peak_gflops:.1f} GFLOP/s')
+
+    labels = list(dict.fromkeys(p.label for p in pts))
+    colors = plt.cm.tab10(np.linspace(0, 1, 10))
+    for label, color in zip(labels, colors):
+        mine = [p for p in pts if p.label == label]
+        xs = [p.intensity if np.isfinite(p.intensity) else x_max / 2 for p in mine]
+        markers = ['o' if np.isfinite(p.intensity) else '>' for p in mine]
+        for xi, p, marker in zip(xs, mine, markers):
+            plt.scatter(xi, p.gflops, color=color, marker=marker, s=20 + 6 * p.threads,
+                        edgecolor='black', linewidth=0.5, alpha=0.8)
+        plt.scatter([], [], color=color, label=label)
+
+    plt.xlabel('Arithmetic Intensity (FLOP/byte)', fontsize=12)
+    plt.ylabel('Performance (GFLOP/s)', fontsize=12)
+    plt.title('Roofline: Measured Kernels vs Hardware Limits', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3, which='both')
+    plt.legend(fontsize=9, loc='lower right')
+    plt.figtext(0.01, 0.01, "Marker size grows with thread count; '>' = no memory traffic "
+                "(drawn at the right edge)", fontsize=8)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300, bbox_inches='tight')
+    print(f"Roofline plot saved as '{path}'")
+
+
+def roofline(store_path, host=None, threads=None, out="roofline.png"):
+    threads = threads or os.cpu_count()
+    store = ResultStore(store_path)
+    ceilings = memory_ceilings(store, host)
+    if "DRAM" not in ceilings:
+        print("no stored triad sweep; measuring DRAM bandwidth in-process")
+        ceilings["DRAM"] = measure_bandwidth(threads)
+    peak = compute_ceiling(threads)
+    pts = points(store, host)
+    store.close()
+    print(f"Compute ceiling: {peak:.2f} GFLOP/s ({threads} threads), "
+          f"DRAM ceiling: {ceilings['DRAM']:.2f} GB/s\n")
+    report(pts, peak, ceilings["DRAM"])
+    plot(pts, peak, ceilings, out)
@@ -0,0 +1,467 @@
+"""Build and run the LAB2 experiment binaries and parse their output tables.
+
+Each experiment prints a small text table (threads / time / ...); the parsers
+below turn those tables into ``Record`` objects so the plot scripts can be fed
+fresh numbers instead of hand-copied lists.
+"""
+
+import os
+import platform
+import re
+import shlex
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LAB2 = ROOT / "LAB2"
+BUILD_DIR = ROOT / "build"
+
+CC = os.environ.get("CC", "gcc")
+CFLAGS = ["-O2", "-fopenmp"]
+CXX = os.environ.get("CXX", "g++")
+CXXFLAGS = ["-std=c++11", "-O3", "-fopenmp"]   # as in LAB3/Makefile
+MPICC = os.environ.get("MPICC", "mpicc")
+MPIRUN = os.environ.get("MPIRUN", "mpirun")
+# extra launcher options, e.g. "--allow-run-as-root --oversubscribe"
+MPIRUN_FLAGS = shlex.split(os.environ.get("MPIRUN_FLAGS", ""))
+
+
+@dataclass
+class Record:
+    """One timed measurement: a kernel variant at a thread count and size."""
+
+    experiment: str
+    variant: str
+    threads: int
+    size: int
+    time: float
+    metrics: dict = field(default_factory=dict)
+
+
+@dataclass
+class Experiment:
+    name: str
+    source: Path
+    plot: Path
+    size: int
+    parse: callable
+    thread_args: bool = False   # binary accepts thread counts as arguments
+    first_touch: bool = False   # binary accepts --first-touch
+    counters: bool = False      # binary accepts --counters (LAB2/lib/counters.h)
+    extra_sources: tuple = ()   # further translation units linked into the binary
+    headers: tuple = ()         # local headers: rebuild and new build id when they change
+    args: tuple = ()            # fixed command-line arguments passed before any others
+    mpi: bool = False           # built with mpicc and launched under mpirun
+
+    @property
+    def sources(self):
+        return (self.source, *self.extra_sources)
+
+    @property
+    def dependencies(self):
+        return (*self.sources, *self.headers)
+
+
+# ---------------------------------------------------------------------------
+# Output parsers, one per table layout
+# ---------------------------------------------------------------------------
+
+def _init_suffix(text):
+    """' first-touch' when q1.c/q7.c ran with --first-touch, else ''."""
+    return " first-touch" if "Initialisation: first-touch" in text else ""
+
+
+_COUNTERS = re.compile(r"^Counters (\S+) (\d+): (.*)$")
+
+
+def attach_counters(text, records):
+    """Add the 'Counters <label> <threads>: name=value ...' lines to matching records.
+
+    A line matches the records of that thread count whose variant starts with
+    ``label``.  Raw counts are stored under snake_case names (``cache_misses``,
+    ``llc_loads``, ...) along with derived ``ipc`` and ``*_per_iter`` rates.
+    """
+    for line in text.splitlines():
+        m = _COUNTERS.match(line)
+        if not m:
+            continue
+        counts = {key.lower().replace("-", "_"): float(value)
+                  for key, value in (item.split("=") for item in m.group(3).split())}
+        iterations = counts.pop("iterations", 0)
+        if counts.get("cycles"):
+            counts["ipc"] = counts.get("instructions", 0) / counts["cycles"]
+        for key in ("cache_misses", "llc_loads", "llc_stores", "cycles"):
+            if key in counts and iterations:
+                counts[f"{key}_per_iter"] = counts[key] / iterations
+        for r in records:
+            if r.threads == int(m.group(2)) and r.variant.split()[0] == m.group(1):
+                r.metrics.update(counts)
+    return records
+
+
+def parse_thread_times(text, name, size):
+    """q1.c / q2.c: 'Running with N threads' followed by 'Time = T seconds'."""
+    variant = "vector_add" + _init_suffix(text)
+    records = []
+    threads = None
+    for line in text.splitlines():
+        m = re.match(r"Running with (\d+) threads", line)
+        if m:
+            threads = int(m.group(1))
+            continue
+        m = re.match(r"Time = ([\d.]+) seconds", line)
+        if m and threads is not None:
+            records.append(Record(name, variant, threads, size, float(m.group(1))))
+            threads = None
+    return records
+
+
+def parse_scaling(text, name, size):
+    """q3.c: STRONG SCALING and WEAK SCALING tables."""
+    records = []
+    section = None
+    for line in text.splitlines():
+        if line.startswith("STRONG SCALING"):
+            section = "strong"
+            continue
+        if line.startswith("WEAK SCALING"):
+            section = "weak"
+            continue
+        fields = line.split()
+        if not fields or not fields[0].isdigit():
+            continue
+        threads = int(fields[0])
+        if section == "strong":
+            records.append(Record(name, "strong", threads, size, float(fields[1]),
+                                  {"speedup": float(fields[2].rstrip("x"))}))
+        elif section == "weak":
+            records.append(Record(name, "weak", threads, int(fields[1]), float(fields[2]),
+                                  {"efficiency": float(fields[3].rstrip("%"))}))
+    return records
+
+
+_SCHEDULE_ROW = re.compile(r"^(\S+)\s+([\d.]+)\s*s\s*([\d.]+)\s*s\s*([\d.]+)%(?:\s+([\d.]+)\s*s)?")
+
+
+def parse_schedules(text, name, size):
+    """q4.c: 'Running on N threads...' then schedule / T_max / T_avg / imbalance / wall rows.
+
+    The size is the iteration count from the 'Profile:' line when present.
+    """
+    records = []
+    threads = 0
+    for line in text.splitlines():
+        m = re.match(r"Profile: \S+, (\d+) iterations", line)
+        if m:
+            size = int(m.group(1))
+            continue
+        m = re.match(r"Running on (\d+) threads", line)
+        if m:
+            threads = int(m.group(1))
+            continue
+        m = _SCHEDULE_ROW.match(line)
+        if m:
+            t_max, t_avg, imbalance = float(m.group(2)), float(m.group(3)), float(m.group(4))
+            metrics = {"t_avg": t_avg, "imbalance": imbalance}
+            if m.group(5):
+                metrics["wall"] = float(m.group(5))
+            records.append(Record(name, m.group(1), threads, size, t_max, metrics))
+    return records
+
+
+def _parse_pair_table(text, name, size, variants):
+    records = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) < 3 or not fields[0].isdigit():
+            continue
+        threads = int(fields[0])
+        for variant, value in zip(variants, fields[1:3]):
+            records.append(Record(name, variant, threads, size, float(value)))
+    return records
+
+
+def parse_sync(text, name, size):
+    """q5.c: threads / critical / reduction / overhead factor."""
+    return _parse_pair_table(text, name, size, ("critical", "reduction"))
+
+
+def _line_size(text):
+    m = re.search(r"^Cache line: (\d+) bytes", text, re.M)
+    return {"line_size": int(m.group(1))} if m else {}
+
+
+def parse_sync_suite(text, name, size):
+    """q5.c --suite: an 'Update every K iterations' table per K, one column per primitive.
+
+    Variants are ``"<primitive> k=<K>"`` with ``every`` = K in the metrics.
+    """
+    records = []
+    every, methods = None, []
+    for line in text.splitlines():
+        fields = line.split()
+        m = re.match(r"Update every (\d+) iterations", line)
+        if m:
+            every = int(m.group(1))
+        elif fields[:1] == ["Threads"]:
+            methods = fields[1:]
+        elif every and methods and len(fields) == len(methods) + 1 and fields[0].isdigit():
+            for method, value in zip(methods, fields[1:]):
+                records.append(Record(name, f"{method} k={every}", int(fields[0]), size,
+                                      float(value), {"every": every}))
+    return records
+
+
+def parse_false_sharing(text, name, size):
+    """q6_1.c: threads / false sharing / padded / speedup."""
+    records = _parse_pair_table(text, name, size, ("unpadded", "padded"))
+    for r in records:
+        r.metrics.update(_line_size(text))
+    return records
+
+
+def parse_stride(text, name, size):
+    """q6_1.c --stride-sweep: threads, one time per stride column, contention-free stride.
+
+    Variants are ``stride-<bytes>``; every record carries ``stride``,
+    ``line_size`` and the row's ``contention_free`` stride.
+    """
+    records = []
+    strides = []
+    for line in text.splitlines():
+        fields = line.split()
+        if fields[:1] == ["Threads"]:
+            strides = [int(f) for f in fields[1:] if f.isdigit()]
+        elif strides and len(fields) == len(strides) + 2 and fields[0].isdigit():
+            threads, free_from = int(fields[0]), int(fields[-1])
+            for stride, value in zip(strides, fields[1:-1]):
+                records.append(Record(name, f"stride-{stride}", threads, size, float(value),
+                                      {"stride": stride, "contention_free": free_from,
+                                       **_line_size(text)}))
+    return records
+
+
+def parse_triad(text, name, size):
+    """q7.c: the '%-10s %-15s %-15s' Cores / Time / BW / Speedup rows."""
+    variant = "triad" + _init_suffix(text)
+    records = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) != 4 or not fields[0].isdigit():
+            continue
+        records.append(Record(name, variant, int(fields[0]), size, float(fields[1]),
+                              {"bandwidth": float(fields[2])}))
+    return records
+
+
+def parse_matmul(text, name, size):
+    """LAB1 q2_matrix_{1d,2d,blocked}.c: Threads / Time / Speedup / Efficiency / GFLOPS."""
+    variant = ("1d" if "1D Threading" in text else "blocked" if "Blocked GEMM" in text
+               else "2d")
+    m = re.search(r"Size: (\d+)x", text)
+    size = int(m.group(1)) if m else size
+    records = []
+    for line in text.splitlines():
+        fields = line.split()
+        # '%-15.2f%%' leaves the efficiency's '%' as a separate field
+        if len(fields) not in (5, 6) or not fields[0].isdigit():
+            continue
+        records.append(Record(name, variant, int(fields[0]), size, float(fields[1]),
+                              {"gflops": float(fields[-1])}))
+    return records
+
+
+def parse_correlate(text, name, size):
+    """LAB3 main.cpp: the PERFORMANCE SUMMARY table (Threads / Sequential / OpenMP / Fast / ...)."""
+    m = re.search(r"Matrix Size: (\d+) x (\d+)", text)
+    ny, nx = (int(m.group(1)), int(m.group(2))) if m else (size, size)
+    summary = text.split("PERFORMANCE SUMMARY", 1)[-1]
+    header = next((line.split() for line in summary.splitlines() if line.startswith("Threads")), [])
+    variants = [h.lower() for h in header[1:] if h not in ("Speedup", "Efficiency")]
+    names = {"sequential": "seq", "openmp": "omp"}
+    records = []
+    for line in summary.splitlines():
+        fields = line.split()
+        if not fields or not fields[0].isdigit():
+            continue
+        threads = int(fields[0])
+        for variant, value in zip(variants, fields[1:]):
+            variant = names.get(variant, variant)
+            if variant == "seq" and records:
+                continue   # the sequential baseline is repeated on every row
+            records.append(Record(name, variant, 1 if variant == "seq" else threads, ny,
+                                  float(value), {"nx": nx}))
+    return records
+
+
+def parse_mpi(text, name, size):
+    """LAB5 q1_daxpy_mpi.c / q3_dot_product.c: 'Processes:' ... time lines.
+
+    The variant is ``hybrid`` (``--hybrid``: OpenMP inside each rank) or
+    ``mpi``.  ``threads`` is the total core count, ranks x threads per rank;
+    the metrics hold ``ranks``, ``threads_per_rank`` and, in hybrid mode,
+    ``compute``, ``comm_wait``, ``chunks`` and ``bandwidth``.  The time is the
+    kernel time (compute + communication wait) when printed, else the
+    program's total.
+    """
+    def value(pattern, cast=float):
+        m = re.search(pattern, text, re.M)
+        return cast(m.group(1)) if m else None
+
+    ranks = value(r"^Processes: (\d+)", int) or 1
+    threads = value(r"^Threads per process: (\d+)", int) or 1
+    time = (value(r"^Kernel time: ([\d.]+)") or value(r"^Time taken: ([\d.]+)")
+            or value(r"Execution time = ([\d.]+)"))
+    if time is None:
+        return []
+    metrics = {"ranks": ranks, "threads_per_rank": threads}
+    for key, pattern in (("compute", r"^Compute time: ([\d.]+)"),
+                         ("comm_wait", r"^(?:Reduction|Gather) wait: ([\d.]+)"),
+                         ("chunks", r"^Mode: hybrid \((\d+) chunks"),
+                         ("bandwidth", r"^Bandwidth: ([\d.]+)")):
+        found = value(pattern)
+        if found is not None:
+            metrics[key] = found
+    variant = "hybrid" if "chunks" in metrics else "mpi"
+    size = value(r"^Elements: (\d+)", int) or size
+    return [Record(name, variant, ranks * threads, size, time, metrics)]
+
+
+EXPERIMENTS = {
+    "exp1": Experiment("exp1", LAB2 / "EXP1" / "q1.c", LAB2 / "EXP1" / "q1_map.py",
+                       100_000_000, parse_thread_times, thread_args=True,
+                       first_touch=True),
+    "exp2": Experiment("exp2", LAB2 / "EXP2" / "q2.c", LAB2 / "EXP2" / "plot_q2.py",
+                       100_000_000, parse_thread_times, thread_args=True),
+    "exp3": Experiment("exp3", LAB2 / "EXP3" / "q3.c", LAB2 / "EXP3" / "plot_q3.py",
+                       500_000_000, parse_scaling),
+    "exp4": Experiment("exp4", LAB2 / "EXP4" / "q4.c", LAB2 / "EXP4" / "q4_map.py",
+                       2000, parse_schedules),
+    "exp5": Experiment("exp5", LAB2 / "EXP5" / "q5.c", LAB2 / "EXP5" / "plot_q5.py",
+                       10_000_000, parse_sync, thread_args=True,
+                       headers=(LAB2 / "lib" / "cacheline.h",)),
+    "exp5-suite": Experiment("exp5-suite", LAB2 / "EXP5" / "q5.c", LAB2 / "EXP5" / "plot_q5.py",
+                             10_000_000, parse_sync_suite, thread_args=True,
+                             headers=(LAB2 / "lib" / "cacheline.h",), args=("--suite",)),
+    "exp6": Experiment("exp6", LAB2 / "EXP6" / "q6_1.c", LAB2 / "EXP6" / "plot_q6.py",
+                       100_000_000, parse_false_sharing, thread_args=True, counters=True,
+                       headers=(LAB2 / "lib" / "cacheline.h", LAB2 / "lib" / "counters.h")),
+    "exp6-stride": Experiment("exp6-stride", LAB2 / "EXP6" / "q6_1.c",
+                              LAB2 / "EXP6" / "plot_q6_stride.py", 100_000_000, parse_stride,
+                              thread_args=True, counters=True,
+                              headers=(LAB2 / "lib" / "cacheline.h", LAB2 / "lib" / "counters.h"),
+                              args=("--stride-sweep",)),
+    "exp7": Experiment("exp7", LAB2 / "EXP7" / "q7.c", LAB2 / "EXP7" / "plot_q7.py",
+                       100_000_000, parse_triad, thread_args=True,
+                       first_touch=True, counters=True, headers=(LAB2 / "lib" / "counters.h",)),
+    "matmul_1d": Experiment("matmul_1d", ROOT / "LAB1" / "q2_matrix_1d.c", None,
+                            1000, parse_matmul),
+    "matmul_2d": Experiment("matmul_2d", ROOT / "LAB1" / "q2_matrix_2d.c", None,
+                            1000, parse_matmul),
+    "matmul_blocked": Experiment("matmul_blocked", ROOT / "LAB1" / "q2_matrix_blocked.c", None,
+                                 1000, parse_matmul),
+    "correlate": Experiment("correlate", ROOT / "LAB3" / "main.cpp", None, 1000,
+                            parse_correlate, extra_sources=(ROOT / "LAB3" / "correlate.cpp",),
+                            args=("1000", "1000")),
+    "mpi_daxpy": Experiment("mpi_daxpy", ROOT / "LAB5" / "q1_daxpy_mpi.c", None, 65536,
+                            parse_mpi, mpi=True),
+    # the binary's own default is 5 * 10^8 elements (8 GB); 2 * 10^7 is 320 MB
+    "mpi_dot": Experiment("mpi_dot", ROOT / "LAB5" / "q3_dot_product.c", None, 20_000_000,
+                          parse_mpi, mpi=True, args=("20000000",)),
+}
+
+
+# ---------------------------------------------------------------------------
+# Build / run
+# ---------------------------------------------------------------------------
+
+def compiler(source, mpi=False):
+    """(compiler, flags) for a C or C++ source."""
+    if mpi:
+        return MPICC, CFLAGS
+    return (CXX, CXXFLAGS) if Path(source).suffix == ".cpp" else (CC, CFLAGS)
+
+
+def build(exp):
+    """Compile the experiment sources into build/, skipping up-to-date binaries."""
+    BUILD_DIR.mkdir(exist_ok=True)
+    binary = BUILD_DIR / exp.name
+    if binary.exists() and all(binary.stat().st_mtime >= src.stat().st_mtime
+                               for src in exp.dependencies):
+        return binary
+    cc, flags = compiler(exp.source, exp.mpi)
+    cmd = [cc, *flags, *map(str, exp.sources), "-o", str(binary), "-lm"]
+    subprocess.run(cmd, check=True)
+    return binary
+
+
+def build_library(source, cc=None, flags=None):
+    """Compile a C/C++ source into a shared library in build/ (if out of date)."""
+    source = Path(source)
+    default_cc, default_flags = compiler(source)
+    cc, flags = cc or default_cc, flags or default_flags
+    BUILD_DIR.mkdir(exist_ok=True)
+    library = BUILD_DIR / f"lib{source.stem}.so"
+    if library.exists() and library.stat().st_mtime >= source.stat().st_mtime:
+        return library
+    cmd = [cc, *flags, "-shared", "-fPIC", str(source), "-o", str(library), "-lm"]
+    subprocess.run(cmd, check=True)
+    return library
+
+
+def run(name, args=(), env=None, warmup=0, repeats=1, ranks=1, launcher=()):
+    """Build and run one experiment, returning its parsed records.
+
+    The binary is launched ``warmup`` times with its output discarded, then
+    ``repeats`` times; every repeat contributes one record per point, so the
+    result holds ``repeats`` samples of each (variant, threads, size).  MPI
+    experiments run under ``mpirun -np ranks`` with MPIRUN_FLAGS and the
+    ``launcher`` options (e.g. binding) added.
+    """
+    exp = EXPERIMENTS[name]
+    binary = build(exp)
+    env = {**os.environ, **(env or {})}
+    command = [str(binary), *exp.args, *map(str, args)]
+    if exp.mpi:
+        command = [MPIRUN, *MPIRUN_FLAGS, *launcher, "-np", str(ranks), *command]
+    records = []
+    for trial in range(warmup + repeats):
+        proc = subprocess.run(command, capture_output=True, text=True, check=True, env=env)
+        parsed = attach_counters(proc.stdout, exp.parse(proc.stdout, exp.name, exp.size))
+        if not parsed:
+            raise RuntimeError(f"{name}: no result rows found in output:\n{proc.stdout}")
+        if trial >= warmup:
+            records.extend(parsed)
+    return records
+
+
+def host():
+    return platform.node() or "unknown"
+
+
+def select(records, variant=None):
+    """Records of one variant, sorted by thread count."""
+    chosen = [r for r in records if variant is None or r.variant == variant]
+    return sorted(chosen, key=lambda r: r.threads)
+
+
+def by_variant(records):
+    """{variant: records sorted by thread count}, in first-seen order."""
+    return {v: select(records, v) for v in dict.fromkeys(r.variant for r in records)}
+
+
+def plot(name, *selector):
+    """Run the experiment's existing plot script non-interactively.
+
+    ``selector`` is passed through as the script's command line, e.g.
+    ``("--batch", "12")`` to plot one stored sweep.
+    """
+    plot_script(EXPERIMENTS[name].plot, *selector)
+
+
+def plot_script(script, *args):
+    env = {**os.environ, "MPLBACKEND": os.environ.get("MPLBACKEND", "Agg")}
+    subprocess.run([sys.executable, str(script), *map(str, args)],
+                   cwd=Path(script).parent, env=env, check=True)
@@ -0,0 +1,130 @@
+"""Scaling-model fits over a stored thread sweep.
+
+For each variant with a 1-thread point the sweep is reduced to a speedup
+curve S(p) = (W(p)/W(1)) * T(1)/T(p), where W is the record's problem size,
+so strong sweeps (fixed size) give the classic speedup and weak sweeps
+(size growing with p) give the scaled speedup.  Three models are then fitted:
+
+* Amdahl: S = 1 / (f + (1 - f)/p), least-squares serial fraction ``f``.
+* Gustafson: S = p - s(p - 1), least-squares serial fraction ``s``.
+* Karp-Flatt: e(p) = (1/S - 1/p) / (1 - 1/p) at every measured p > 1.
+
+A constant Karp-Flatt fraction means the limit is inherent serial work; one
+that grows with p means parallel overhead (synchronisation, bandwidth, load
+imbalance) that more threads make worse.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from bench import runner
+
+# e(p) must rise by at least this much (absolute) across the sweep to be flagged
+OVERHEAD_RISE = 0.01
+
+
+@dataclass
+class Fit:
+    variant: str
+    weak: bool
+    threads: list
+    speedup: list
+    amdahl: float              # serial fraction f
+    gustafson: float           # serial fraction s
+    karp_flatt: list = field(default_factory=list)   # e(p), nan at p = 1
+    overhead_slope: float = 0.0                      # d e(p) / d p
+    growing_overhead: bool = False
+    recommended: int = 1
+    predicted_optimum: float = np.inf                # Amdahl argmax of S * E
+
+
+def amdahl(p, f):
+    return 1 / (f + (1 - f) / np.asarray(p, dtype=float))
+
+
+def gustafson(p, s):
+    p = np.asarray(p, dtype=float)
+    return p - s * (p - 1)
+
+
+def fit_amdahl(threads, speedup, resolution=10_000):
+    """Serial fraction in [0, 1] minimising the squared speedup error (grid search)."""
+    p = np.asarray(threads, dtype=float)
+    f = np.linspace(0, 1, resolution + 1)[:, None]
+    error = ((amdahl(p, f) - np.asarray(speedup, dtype=float)) ** 2).sum(axis=1)
+    return float(f[np.argmin(error), 0])
+
+
+def fit_gustafson(threads, speedup):
+    p = np.asarray(threads, dtype=float)
+    x = p - 1
+    if not np.any(x):
+        return 0.0
+    return float(np.dot(x, p - np.asarray(speedup, dtype=float)) / np.dot(x, x))
+
+
+def karp_flatt(threads, speedup):
+    p = np.asarray(threads, dtype=float)
+    s = np.asarray(speedup, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(p > 1, (1 / s - 1 / p) / (1 - 1 / p), np.nan)
+
+
+def recommend(threads, speedup, min_efficiency=None):
+    """Measured thread count to run at.
+
+    Throughput per core (S/p) alone always favours one thread, so by default
+    the pick maximises S * E = S^2/p, trading speedup against wasted cores.
+    With ``min_efficiency`` (%) it is instead the largest p whose efficiency
+    stays at or above that floor.
+    """
+    p = np.asarray(threads, dtype=float)
+    s = np.asarray(speedup, dtype=float)
+    if min_efficiency is not None:
+        ok = p[s / p * 100 >= min_efficiency]
+        return int(ok.max()) if len(ok) else 1
+    return int(p[np.argmax(s * s / p)])
+
+
+def fit(records, min_efficiency=None):
+    """One ``Fit`` per variant that has a 1-thread point, from collapsed records."""
+    fits = []
+    for variant, rs in runner.by_variant(records).items():
+        rs = sorted(rs, key=lambda r: r.threads)
+        if rs[0].threads != 1:
+            continue
+        base = rs[0]
+        threads = [r.threads for r in rs]
+        speedup = [(r.size / base.size) * base.time / r.time for r in rs]
+        e = karp_flatt(threads, speedup)
+        f = fit_amdahl(threads, speedup)
+        result = Fit(variant, any(r.size != base.size for r in rs), threads, speedup,
+                     f, fit_gustafson(threads, speedup), list(e),
+                     recommended=recommend(threads, speedup, min_efficiency),
+                     predicted_optimum=(1 - f) / f if f > 0 else np.inf)
+        multi = [(p, v) for p, v in zip(threads, e) if p > 1 and np.isfinite(v)]
+        if len(multi) >= 3:
+            p, v = np.array(multi).T
+            result.overhead_slope = float(np.polyfit(p, v, 1)[0])
+            rise = result.overhead_slope * (p.max() - p.min())
+            result.growing_overhead = rise > max(OVERHEAD_RISE, 0.5 * abs(np.median(v)))
+        fits.append(result)
+    return fits
+
+
+def report(fits):
+    for f in fits:
+        kind = "weak (scaled speedup)" if f.weak else "strong"
+        print(f"== {f.variant}: {kind}, {len(f.threads)} thread counts")
+        print(f"{'Threads':>8} {'Speedup':>9} {'Eff %':>7} {'Amdahl':>8} {'Gustaf.':>8} {'Karp-Flatt':>11}")
+        for p, s, e in zip(f.threads, f.speedup, f.karp_flatt):
+            kf = f"{e:11.4f}" if np.isfinite(e) else f"{'-':>11}"
+            print(f"{p:8d} {s:9.2f} {s / p * 100:7.1f} {amdahl(p, f.amdahl):8.2f} "
+                  f"{gustafson(p, f.gustafson):8.2f} {kf}")
+        print(f"Amdahl serial fraction:    {f.amdahl:.4f} (max speedup {1 / f.amdahl if f.amdahl else np.inf:.1f}x)")
+        print(f"Gustafson serial fraction: {f.gustafson:.4f}")
+        trend = "GROWING parallel overhead" if f.growing_overhead else "no significant trend"
+        print(f"Karp-Flatt slope:          {f.overhead_slope:+.5f} per thread ({trend})")
+        print(f"Recommended threads:       {f.recommended} "
+              f"(model optimum {f.predicted_optimum:.1f})\n")
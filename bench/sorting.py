@@ -0,0 +1,128 @@
+"""CPU sorting benchmark for LAB7: the kernels in LAB7/sort.c next to ``np.sort``.
+
+Every algorithm sorts a fresh copy of the same uniformly random uint32 keys
+and is checked against NumPy's result::
+
+    records = sorting.benchmark([10**3, 10**6, 10**8], threads=8)
+    sorting.report(records)
+
+``merge`` and ``numpy`` are single-threaded and stored with threads = 1; the
+parallel kernels run with ``threads`` OpenMP threads.
+"""
+
+import ctypes
+import os
+import time
+
+import numpy as np
+
+from bench import runner, stats
+from bench.runner import Record
+
+SOURCE = runner.ROOT / "LAB7" / "sort.c"
+
+EXPERIMENT = "sort"
+ALGORITHMS = ("merge", "merge-tasks", "bitonic", "radix", "numpy")
+SIZES = tuple(10 ** e for e in range(3, 10))
+KEY_BYTES = 4
+SERIAL = ("merge", "numpy")
+
+_keys = np.ctypeslib.ndpointer(dtype=np.uint32, ndim=1, flags="C_CONTIGUOUS")
+_lib = None
+
+
+def library():
+    """Build (if needed) and load the sorting library, declaring its signatures once."""
+    global _lib
+    if _lib is None:
+        lib = ctypes.CDLL(str(runner.build_library(SOURCE)))
+        lib.sort_merge_serial.argtypes = [_keys, _keys, ctypes.c_longlong]
+        lib.sort_merge_tasks.argtypes = [_keys, _keys, ctypes.c_longlong, ctypes.c_longlong]
+        lib.sort_bitonic.argtypes = [_keys, ctypes.c_longlong]
+        lib.sort_radix.argtypes = [_keys, _keys, ctypes.c_longlong]
+        for kernel in (lib.sort_merge_serial, lib.sort_merge_tasks, lib.sort_bitonic,
+                       lib.sort_radix):
+            kernel.restype = None
+        _lib = lib
+    return _lib
+
+
+def sort(keys, algorithm, tmp=None):
+    """Sort a C-contiguous uint32 array in place with one of ``ALGORITHMS``."""
+    if keys.dtype != np.uint32 or not keys.flags.c_contiguous:
+        raise ValueError("sort expects a C-contiguous uint32 array")
+    n = len(keys)
+    if algorithm == "numpy":
+        keys.sort()
+        return keys
+    lib = library()
+    if algorithm == "bitonic":
+        lib.sort_bitonic(keys, n)
+        return keys
+    tmp = np.empty_like(keys) if tmp is None else tmp
+    if algorithm == "merge":
+        lib.sort_merge_serial(keys, tmp, n)
+    elif algorithm == "merge-tasks":
+        lib.sort_merge_tasks(keys, tmp, n, 0)
+    elif algorithm == "radix":
+        lib.sort_radix(keys, tmp, n)
+    else:
+        raise ValueError(f"unknown sort algorithm {algorithm!r}")
+    return keys
+
+
+def memory_needed(n):
+    """Peak bytes of a benchmark at n keys.
+
+    The input, NumPy's reference, the working copy and the tmp array are
+    alive throughout; bitonic adds its copy padded to a power of two.
+    """
+    return 4 * KEY_BYTES * n + KEY_BYTES * (1 << max(n - 1, 0).bit_length())
+
+
+def fits(n):
+    """Whether a benchmark at n keys fits in the currently available memory."""
+    try:
+        available = os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError):
+        return True
+    return memory_needed(n) <= available
+
+
+def benchmark(sizes, algorithms=ALGORITHMS, threads=None, seed=0, repeats=3):
+    """Records per algorithm and size: time, ``keys_per_s`` and ``sorted`` (1.0 if equal to np.sort)."""
+    threads = threads or os.cpu_count()
+    library().omp_set_num_threads(threads)
+    rng = np.random.default_rng(seed)
+    records = []
+    for n in sizes:
+        keys = rng.integers(0, 2 ** 32, n, dtype=np.uint32)
+        expected = np.sort(keys)
+        work = np.empty_like(keys)
+        tmp = np.empty_like(keys)
+        for algorithm in algorithms:
+            for _ in range(repeats):
+                np.copyto(work, keys)
+                start = time.perf_counter()
+                sort(work, algorithm, tmp)
+                elapsed = time.perf_counter() - start
+                correct = float(np.array_equal(work, expected))
+                records.append(Record(EXPERIMENT, algorithm, 1 if algorithm in SERIAL else threads,
+                                      n, elapsed, {"keys_per_s": n / elapsed, "sorted": correct}))
+        del keys, expected, work, tmp
+    return records
+
+
+def report(records):
+    """Print million keys/s per algorithm and size; returns the records that sorted wrongly."""
+    points = stats.collapse(records)
+    algorithms = list(dict.fromkeys(r.variant for r in points))
+    print(f"{'Keys':>12s} " + " ".join(f"{a:>12s}" for a in algorithms) + "   (Mkeys/s)")
+    failures = [r for r in records if r.metrics["sorted"] != 1.0]
+    for size in sorted({r.size for r in points}):
+        row = {r.variant: r for r in points if r.size == size}
+        cells = [f"{row[a].metrics['keys_per_s'] / 1e6:12.2f}" if a in row else f"{'-':>12s}"
+                 for a in algorithms]
+        wrong = sorted({r.variant for r in failures if r.size == size})
+        print(f"{size:12d} " + " ".join(cells) + (f"  FAIL: {', '.join(wrong)}" if wrong else ""))
+    return failures
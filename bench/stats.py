@@ -0,0 +1,170 @@
+"""Robust statistics over repeated trials of the same measurement point.
+
+A *point* is one (variant, threads, size) combination.  Repeated trials of a
+point are reduced to a median with a bootstrap confidence interval; samples
+whose modified z-score exceeds ``OUTLIER_Z`` are flagged and left out of the
+median and interval (but still count towards the minimum).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+
+from bench.runner import Record
+
+OUTLIER_Z = 3.5
+N_BOOT = 2000
+CONFIDENCE = 0.95
+
+
+@dataclass
+class Summary:
+    median: float
+    min: float
+    ci_low: float
+    ci_high: float
+    n: int
+    outliers: int
+
+
+def outlier_mask(samples, z=OUTLIER_Z):
+    """True for samples whose modified z-score (median/MAD based) exceeds ``z``."""
+    samples = np.asarray(samples, dtype=float)
+    median = np.median(samples)
+    mad = np.median(np.abs(samples - median))
+    if mad == 0:
+        return np.zeros(samples.shape, dtype=bool)
+    return np.abs(0.6745 * (samples - median) / mad) > z
+
+
+def bootstrap(samples, statistic=np.median, n_boot=N_BOOT, confidence=CONFIDENCE, seed=0):
+    """Percentile bootstrap interval of ``statistic`` over ``samples``."""
+    samples = np.asarray(samples, dtype=float)
+    if len(samples) < 2:
+        value = statistic(samples)
+        return value, value
+    rng = np.random.default_rng(seed)
+    resamples = rng.choice(samples, size=(n_boot, len(samples)), replace=True)
+    estimates = statistic(resamples, axis=1)
+    alpha = (1 - confidence) / 2
+    return tuple(np.quantile(estimates, [alpha, 1 - alpha]))
+
+
+def summarize(samples):
+    samples = np.asarray(samples, dtype=float)
+    mask = outlier_mask(samples)
+    kept = samples[~mask]
+    low, high = bootstrap(kept)
+    return Summary(float(np.median(kept)), float(samples.min()), float(low), float(high),
+                   len(samples), int(mask.sum()))
+
+
+def speedup(base_samples, samples, n_boot=N_BOOT, confidence=CONFIDENCE, seed=0):
+    """Median-ratio speedup T1/Tp with a bootstrap interval over both sample sets."""
+    base = np.asarray(base_samples, dtype=float)
+    base = base[~outlier_mask(base)]
+    samples = np.asarray(samples, dtype=float)
+    samples = samples[~outlier_mask(samples)]
+    value = float(np.median(base) / np.median(samples))
+    if len(base) < 2 and len(samples) < 2:
+        return value, value, value
+    rng = np.random.default_rng(seed)
+    b = np.median(rng.choice(base, size=(n_boot, len(base))), axis=1)
+    s = np.median(rng.choice(samples, size=(n_boot, len(samples))), axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(b / s, [alpha, 1 - alpha])
+    return value, float(low), float(high)
+
+
+def group(records):
+    """Time samples per (variant, threads, size) point, in first-seen order."""
+    points = defaultdict(list)
+    for r in records:
+        points[(r.variant, r.threads, r.size)].append(r)
+    return points
+
+
+def weak_variants(points):
+    """Variants whose size grows with the thread count (weak-scaling sweeps).
+
+    Every size of such a variant is measured at a single thread count, so no
+    point shares its work with a 1-thread point and T1/Tp is not a speedup.
+    """
+    threads = defaultdict(lambda: defaultdict(set))
+    for variant, t, size in points:
+        threads[variant][size].add(t)
+    return {variant for variant, sizes in threads.items()
+            if len(sizes) > 1 and all(len(ts) == 1 for ts in sizes.values())
+            and len(set().union(*sizes.values())) > 1}
+
+
+def collapse(records):
+    """One median record per point, with the spread stored in its metrics.
+
+    Added metrics: ``time_min``, ``time_ci_low``, ``time_ci_high``, ``trials``,
+    ``outliers`` and, relative to the 1-thread point of the same variant and
+    size when present, ``speedup``/``speedup_ci_low``/``speedup_ci_high`` and
+    ``efficiency`` (%).  Weak-scaling variants (see ``weak_variants``) get no
+    speedup; the metrics they were parsed with are kept.
+
+    Other metrics are the median over the trials, except discrete ones (every
+    value integral, e.g. a stride or an event count), which take the most
+    common value, ties going to the trial closest to the median time, so the
+    result is always a value that was actually measured.
+    """
+    points = group(records)
+    weak = weak_variants(points)
+    base = {(variant, size): [r.time for r in rs]
+            for (variant, threads, size), rs in points.items()
+            if threads == 1 and variant not in weak}
+    collapsed = []
+    for (variant, threads, size), rs in points.items():
+        times = [r.time for r in rs]
+        summary = summarize(times)
+        nearest = sorted(rs, key=lambda r: abs(r.time - summary.median))
+        metrics = {}
+        for key in {k for r in rs for k in r.metrics}:
+            values = [r.metrics[key] for r in nearest
+                      if isinstance(r.metrics.get(key), (int, float))]
+            if not values:
+                continue
+            if all(float(v).is_integer() for v in values):
+                metrics[key] = float(max(values, key=values.count))
+            else:
+                metrics[key] = float(np.median(values))
+        metrics.update(time_min=summary.min, time_ci_low=summary.ci_low,
+                       time_ci_high=summary.ci_high, trials=summary.n,
+                       outliers=summary.outliers)
+        if (variant, size) in base:
+            s, low, high = speedup(base[variant, size], times)
+            metrics.update(speedup=s, speedup_ci_low=low, speedup_ci_high=high,
+                           efficiency=s / threads * 100)
+        collapsed.append(Record(rs[0].experiment, variant, threads, size, summary.median, metrics))
+    return collapsed
+
+
+def error_bars(records, key="time"):
+    """Asymmetric ``yerr`` rows for matplotlib from collapsed records."""
+    values = [r.time if key == "time" else r.metrics[key] for r in records]
+    low = [v - r.metrics.get(f"{key}_ci_low", v) for v, r in zip(values, records)]
+    high = [r.metrics.get(f"{key}_ci_high", v) - v for v, r in zip(values, records)]
+    return [low, high]
+
+
+def regressions(baseline, current, metric="time", tolerance=0.1):
+    """Points of ``current`` whose ``metric`` rose more than ``tolerance`` over ``baseline``.
+
+    Both are collapsed record lists; points are matched on (variant, threads,
+    size).  Returns ``(record, baseline value, current value)`` tuples.
+    """
+    def value(r):
+        return r.time if metric == "time" else r.metrics.get(metric)
+
+    base = {(r.variant, r.threads, r.size): value(r) for r in baseline}
+    worse = []
+    for r in current:
+        old, new = base.get((r.variant, r.threads, r.size)), value(r)
+        if old is not None and new is not None and new > old * (1 + tolerance):
+            worse.append((r, old, new))
+    return worse
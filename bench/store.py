@@ -0,0 +1,169 @@
+"""Append-only results store backed by SQLite.
+
+Every call to ``append`` writes one *batch* (a single sweep on one host and
+build).  Rows are indexed by experiment, host and build, so loading one
+experiment's slice is an index lookup no matter how much history the file
+holds.  Queries are lazy: nothing is read until the columns or records of a
+``Query`` are used.
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+
+from bench import runner, stats
+
+DEFAULT_PATH = runner.ROOT / "results" / "results.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch      INTEGER PRIMARY KEY AUTOINCREMENT,
+    experiment TEXT NOT NULL,
+    host       TEXT NOT NULL,
+    build      TEXT NOT NULL,
+    created    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    batch      INTEGER NOT NULL REFERENCES batches(batch),
+    experiment TEXT NOT NULL,
+    variant    TEXT NOT NULL,
+    threads    INTEGER NOT NULL,
+    size       INTEGER NOT NULL,
+    host       TEXT NOT NULL,
+    build      TEXT NOT NULL,
+    time       REAL NOT NULL,
+    metrics    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (experiment, host, build, batch);
+"""
+
+COLUMNS = ("batch", "experiment", "variant", "threads", "size", "host", "build", "time", "metrics")
+
+
+def build_id(*sources):
+    """Identify a build by compiler, flags and a hash of its source files."""
+    cc, cflags = runner.compiler(sources[0])
+    digest = hashlib.sha1(b"".join(Path(s).read_bytes() for s in sources)).hexdigest()[:10]
+    return f"{cc} {' '.join(cflags)} {digest}"
+
+
+class Query:
+    """A lazily evaluated selection of stored runs."""
+
+    def __init__(self, store, experiment, variant=None, host=None, build=None, batch=None,
+                 latest=False):
+        self.store = store
+        self.filters = {"experiment": experiment, "variant": variant, "host": host,
+                        "build": build, "batch": batch}
+        self.latest = latest
+        self._rows = None
+
+    def _where(self, skip=()):
+        clauses, params = [], []
+        for key, value in self.filters.items():
+            if value is not None and key not in skip:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+        return " AND ".join(clauses), params
+
+    def _fetch(self):
+        if self._rows is None:
+            where, params = self._where()
+            if self.latest:
+                sub, sub_params = self._where(skip=("variant",))
+                where += f" AND batch = (SELECT MAX(batch) FROM runs WHERE {sub})"
+                params += sub_params
+            sql = (f"SELECT {', '.join(COLUMNS)} FROM runs WHERE {where} "
+                   "ORDER BY batch, variant, threads")
+            self._rows = self.store.connection.execute(sql, params).fetchall()
+        return self._rows
+
+    def __len__(self):
+        return len(self._fetch())
+
+    def column(self, name):
+        """One column as a NumPy array; metric names come from the metrics field."""
+        rows = self._fetch()
+        if name in COLUMNS:
+            return np.array([row[COLUMNS.index(name)] for row in rows])
+        index = COLUMNS.index("metrics")
+        return np.array([json.loads(row[index]).get(name, np.nan) for row in rows], dtype=float)
+
+    def records(self):
+        return [runner.Record(row[1], row[2], row[3], row[4], row[7], json.loads(row[8]))
+                for row in self._fetch()]
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def append(self, records, host=None, build=None):
+        """Store one sweep as a new batch and return its batch id."""
+        if not records:
+            raise ValueError("no records to append")
+        host = host or runner.host()
+        build = build or "unknown"
+        experiment = records[0].experiment
+        with self.connection:
+            cur = self.connection.execute(
+                "INSERT INTO batches (experiment, host, build, created) VALUES (?, ?, ?, ?)",
+                (experiment, host, build, time.time()))
+            batch = cur.lastrowid
+            self.connection.executemany(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(batch, r.experiment, r.variant, r.threads, r.size, host, build, r.time,
+                  json.dumps(r.metrics)) for r in records])
+        return batch
+
+    def query(self, experiment, **filters):
+        return Query(self, experiment, **filters)
+
+    def batches(self, experiment=None):
+        sql = "SELECT batch, experiment, host, build, created FROM batches"
+        params = []
+        if experiment is not None:
+            sql += " WHERE experiment = ?"
+            params.append(experiment)
+        return self.connection.execute(sql + " ORDER BY batch", params).fetchall()
+
+
+def from_argv(experiment, argv=None, raw=False):
+    """Records selected by a plot script's command line, or None to keep its recorded data.
+
+    ``--host``/``--build``/``--batch`` narrow the selection; without ``--batch``
+    the latest matching sweep is used.  ``experiment`` may be a tuple of
+    names for experiments stored under more than one name; the newest
+    matching batch across all of them wins.  Repeated trials are collapsed to
+    one median record per point (see ``stats.collapse``) unless ``raw`` is set.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", type=Path, default=DEFAULT_PATH)
+    parser.add_argument("--host")
+    parser.add_argument("--build")
+    parser.add_argument("--batch", type=int)
+    parser.add_argument("--latest", action="store_true", help="latest stored sweep")
+    args = parser.parse_args(argv)
+    if not (args.host or args.build or args.batch or args.latest):
+        return None
+    store = ResultStore(args.store)
+    experiments = (experiment,) if isinstance(experiment, str) else experiment
+    queries = [store.query(name, host=args.host, build=args.build, batch=args.batch,
+                           latest=args.batch is None) for name in experiments]
+    newest = max(queries, key=lambda q: q.column("batch").max(initial=0))
+    records = newest.records()
+    store.close()
+    if not records:
+        raise SystemExit(f"no stored results for {' / '.join(experiments)} matching the given filters")
+    return records if raw else stats.collapse(records)
@@ -0,0 +1,125 @@
+"""Time-budgeted adaptive thread sweep.
+
+Instead of measuring every thread count from 1 to ``max_threads``, the sweep
+starts from a few seed points and then spends its wall-clock budget where the
+curve is still uncertain:
+
+1. every measured point first gets ``min_repeats`` samples;
+2. the gap between neighbouring thread counts with the largest change in
+   speedup is bisected (this concentrates points around the knee of the
+   curve, e.g. near 4 threads for the memory-bound kernels);
+3. points whose relative confidence interval is still wider than
+   ``ci_target`` are repeated; tight points are left alone.
+
+The sweep stops when the next measurement would overrun the budget or when
+there is nothing left to refine.
+"""
+
+import time
+
+import numpy as np
+
+from bench import runner, stats
+
+
+class AdaptiveSweep:
+    def __init__(self, name, budget, max_threads=17, ci_target=0.05, min_repeats=3,
+                 max_repeats=15, min_gain=0.05, warmup=1, args=(), env=None):
+        exp = runner.EXPERIMENTS[name]
+        if not exp.thread_args:
+            raise ValueError(f"{name} does not take thread counts on the command line")
+        self.name = name
+        self.budget = budget
+        self.max_threads = max_threads
+        self.ci_target = ci_target
+        self.min_repeats = min_repeats
+        self.max_repeats = max_repeats
+        self.min_gain = min_gain
+        self.warmup = warmup
+        self.args = list(args)   # extra binary arguments, e.g. --first-touch
+        self.env = env
+        self.samples = {}   # threads -> list of records
+        self.cost = {}      # threads -> seconds per measurement
+        self.start = None
+
+    # -- measurement -------------------------------------------------------
+
+    def measure(self, threads):
+        warmup = self.warmup if threads not in self.samples else 0
+        t0 = time.perf_counter()
+        records = runner.run(self.name, args=[*self.args, threads], env=self.env,
+                             warmup=warmup)
+        self.cost[threads] = (time.perf_counter() - t0) / (warmup + 1)
+        self.samples.setdefault(threads, []).extend(records)
+
+    def estimate(self, threads):
+        """Expected cost of measuring ``threads``, from it or its nearest measured neighbour."""
+        if threads in self.cost:
+            return self.cost[threads] * (1 + (self.warmup if threads not in self.samples else 0))
+        if not self.cost:
+            return 0.0
+        nearest = min(self.cost, key=lambda p: abs(p - threads))
+        return self.cost[nearest] * (1 + self.warmup)
+
+    def remaining(self):
+        return self.budget - (time.perf_counter() - self.start)
+
+    # -- decisions ---------------------------------------------------------
+
+    def medians(self, threads):
+        """Median time per variant at one thread count."""
+        points = stats.group(self.samples[threads])
+        return {variant: float(np.median([r.time for r in rs]))
+                for (variant, _, _), rs in points.items()}
+
+    def spread(self, threads):
+        """Worst relative CI half-width over the variants at one thread count."""
+        widths = []
+        for rs in stats.group(self.samples[threads]).values():
+            s = stats.summarize([r.time for r in rs])
+            widths.append((s.ci_high - s.ci_low) / (2 * s.median))
+        return max(widths)
+
+    def trials(self, threads):
+        return min(len(rs) for rs in stats.group(self.samples[threads]).values())
+
+    def speedup_change(self, a, b):
+        base = self.medians(min(self.samples))
+        ma, mb = self.medians(a), self.medians(b)
+        return max(abs(base[v] / ma[v] - base[v] / mb[v]) for v in base if v in ma and v in mb)
+
+    def next_point(self):
+        measured = sorted(self.samples)
+        short = [p for p in measured if self.trials(p) < self.min_repeats]
+        if short:
+            return short[0]
+        gaps = [(self.speedup_change(a, b), a, b) for a, b in zip(measured, measured[1:])
+                if b - a > 1]
+        if gaps:
+            gain, a, b = max(gaps)
+            if gain >= self.min_gain:
+                return (a + b) // 2
+        loose = [(self.spread(p), p) for p in measured
+                 if self.trials(p) < self.max_repeats and self.spread(p) > self.ci_target]
+        if loose:
+            return max(loose)[1]
+        return None
+
+    def run(self):
+        """Run until the budget is spent or the curve is resolved; returns all samples."""
+        self.start = time.perf_counter()
+        seeds = sorted({1, (1 + self.max_threads) // 2, self.max_threads})
+        for threads in seeds:
+            if self.remaining() < self.estimate(threads):
+                break
+            self.measure(threads)
+        while True:
+            threads = self.next_point()
+            if threads is None or self.remaining() < self.estimate(threads):
+                break
+            self.measure(threads)
+        return [r for p in sorted(self.samples) for r in self.samples[p]]
+
+
+def adaptive_sweep(name, budget, **options):
+    return AdaptiveSweep(name, budget, **options).run()
@@ -0,0 +1,77 @@
+"""Reader for the per-chunk traces written by ``q4 --trace FILE``.
+
+The file is a sequence of loop runs, each a 48-byte header followed by its
+chunk events (see ``struct trace_run`` / ``struct chunk_event`` in
+LAB2/EXP4/q4.c).  ``read`` memory-maps the file and returns each run's events
+as a structured view into the map, so large traces are never copied.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+RUN = np.dtype([("schedule", "S16"), ("profile", "S16"), ("threads", "<u4"),
+                ("iterations", "<u4"), ("events", "<u4"), ("wall", "<f4")])
+EVENT = np.dtype([("thread", "<u4"), ("first", "<u4"), ("count", "<u4"),
+                  ("start", "<f4"), ("end", "<f4")])
+
+assert RUN.itemsize == 48 and EVENT.itemsize == 20
+
+
+@dataclass
+class TraceRun:
+    schedule: str
+    profile: str
+    threads: int
+    iterations: int
+    wall: float
+    events: np.ndarray   # EVENT records, grouped by thread
+
+    def busy(self):
+        """Seconds each thread spent inside its chunks."""
+        return np.bincount(self.events["thread"], weights=self.events["end"] - self.events["start"],
+                           minlength=self.threads)
+
+    def idle_tail(self):
+        """Seconds each thread waited between its last chunk and the end of the loop."""
+        last = np.zeros(self.threads)
+        np.maximum.at(last, self.events["thread"], self.events["end"])
+        return self.wall - last
+
+    def summary(self):
+        busy = self.busy()
+        sizes = self.events["count"]
+        return {"chunks": len(self.events), "mean_chunk": float(sizes.mean()) if len(sizes) else 0.0,
+                "busy_max": float(busy.max()), "busy_avg": float(busy.mean()),
+                "idle_tail": float(self.idle_tail().max()),
+                # wall time not spent in any chunk on the busiest thread
+                "overhead": float(self.wall - busy.max())}
+
+
+def read(path):
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    runs = []
+    offset = 0
+    while offset + RUN.itemsize <= len(data):
+        header = np.frombuffer(data, dtype=RUN, count=1, offset=offset)[0]
+        offset += RUN.itemsize
+        events = np.frombuffer(data, dtype=EVENT, count=int(header["events"]), offset=offset)
+        offset += events.nbytes
+        runs.append(TraceRun(header["schedule"].decode(), header["profile"].decode(),
+                             int(header["threads"]), int(header["iterations"]),
+                             float(header["wall"]), events))
+    return runs
+
+
+def gantt(ax, run, cmap="viridis"):
+    """One row per thread, one bar per chunk, coloured by its first iteration."""
+    import matplotlib.pyplot as plt
+
+    colors = plt.get_cmap(cmap)(run.events["first"] / max(run.iterations - 1, 1))
+    ax.barh(run.events["thread"], run.events["end"] - run.events["start"],
+            left=run.events["start"], height=0.8, color=colors, edgecolor='black', linewidth=0.2)
+    ax.axvline(run.wall, color='red', linestyle='--', linewidth=1)
+    ax.set_yticks(range(run.threads))
+    ax.set_ylim(-0.5, run.threads - 0.5)
+    ax.invert_yaxis()
+    ax.set_xlim(0, run.wall * 1.02)
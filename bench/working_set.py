@@ -0,0 +1,75 @@
+"""Triad bandwidth as a function of working-set size and thread count.
+
+EXP7 only measures N = 100M, i.e. DRAM bandwidth.  This sweep runs the same
+triad from L1-resident arrays up to several GB on one reused allocation (the
+kernel is handed the first N elements of each buffer, which is a zero-copy
+view), so the resulting bandwidth surface shows the L1/L2/L3/DRAM regimes.
+Before each (size, thread count) point the slices are refilled by the same
+threads with the same static partition, so every thread starts on the part
+it owns, in its own caches, rather than on data last written for another N.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from bench import kernels
+from bench.runner import Record
+
+EXPERIMENT = "exp7-ws"
+BYTES_PER_ELEMENT = 3 * 8   # read B, read C, write A
+CACHE_DIR = Path("/sys/devices/system/cpu/cpu0/cache")
+
+
+def sizes(min_bytes=8 * 1024, max_bytes=2.4e9, per_decade=4):
+    """Element counts whose triad working set spans ``min_bytes``..``max_bytes`` geometrically."""
+    count = int(np.ceil(np.log10(max_bytes / min_bytes) * per_decade)) + 1
+    working_sets = np.geomspace(min_bytes, max_bytes, count)
+    return sorted({int(ws // BYTES_PER_ELEMENT) for ws in working_sets})
+
+
+def cache_sizes():
+    """Data/unified cache capacity per level in bytes, read from sysfs ({} if unavailable)."""
+    caches = {}
+    for index in sorted(CACHE_DIR.glob("index*")):
+        try:
+            kind = (index / "type").read_text().strip()
+            level = int((index / "level").read_text())
+            size = (index / "size").read_text().strip()
+        except (OSError, ValueError):
+            continue
+        if kind == "Instruction":
+            continue
+        units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+        caches[f"L{level}"] = int(size.rstrip("KMG")) * units.get(size[-1], 1)
+    return caches
+
+
+def measure(buffers, n, threads, min_time=0.02, schedule="static"):
+    """Time of one triad over the first ``n`` elements, averaged over enough passes."""
+    a, b, c = buffers.a[:n], buffers.b[:n], buffers.c[:n]
+    passes = 1
+    while True:
+        elapsed = kernels.triad_passes(a, b, c, 3.3, threads, passes, schedule)
+        if elapsed >= min_time or passes >= 1 << 24:
+            return elapsed / passes, passes
+        passes *= max(2, min(16, int(min_time / max(elapsed, 1e-9))))
+
+
+def size_sweep(threads, element_counts, repeats=3, min_time=0.02, buffers=None):
+    """Bandwidth records for every (size, thread count) pair, ``repeats`` samples each."""
+    if buffers is None or buffers.n < max(element_counts):
+        buffers = kernels.Buffers(max(element_counts), max(threads))
+    caches = {f"cache_{level}": size for level, size in cache_sizes().items()}
+    records = []
+    for n in element_counts:
+        for p in threads:
+            kernels.fill(buffers.a[:n], 0.0, p)
+            kernels.fill(buffers.b[:n], 1.1, p)
+            kernels.fill(buffers.c[:n], 2.2, p)
+            for _ in range(repeats):
+                elapsed, passes = measure(buffers, n, p, min_time)
+                bandwidth = BYTES_PER_ELEMENT * n / elapsed / 1e9
+                records.append(Record(EXPERIMENT, "triad", p, n, elapsed,
+                                      {"bandwidth": bandwidth, "passes": passes, **caches}))
+    return records
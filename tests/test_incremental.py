@@ -0,0 +1,84 @@
+"""Incremental correlation (bench.correlation.Incremental) against correlate_seq.
+
+Run from the repository root: ``python -m pytest tests``.
+"""
+
+import numpy as np
+import pytest
+
+from bench import correlation
+
+# both sides are float32 results of float64 sums; subtracting evicted
+# samples may cost a few more ulps than the two-pass kernel
+TOLERANCE = 2e-5
+
+
+def seq_reference(data):
+    """correlate_seq's result as a full symmetric (ny, ny) matrix."""
+    upper = correlation.correlate(data, "seq")    # [j, i] = r(i, j) for j <= i
+    return np.triu(upper) + np.triu(upper, 1).T
+
+
+def signals(ny, nx, seed=0):
+    """Rows with different offsets and scales, some correlated, row 3 constant."""
+    rng = np.random.default_rng(seed)
+    data = rng.normal(size=(ny, nx))
+    data[1] = 0.8 * data[0] + 0.2 * data[1]
+    data *= rng.uniform(0.5, 50.0, size=(ny, 1))
+    data += rng.uniform(-100.0, 100.0, size=(ny, 1))
+    data[3] = 7.0
+    return data.astype(np.float32)
+
+
+def check(inc, data):
+    result = inc.correlation().to_dense()
+    expected = seq_reference(data)
+    np.testing.assert_allclose(result, expected, rtol=0, atol=TOLERANCE, equal_nan=True)
+
+
+@pytest.mark.parametrize("splits", [[200], [1, 199], [50, 50, 100], [7] * 28 + [4]])
+def test_growing_batches(splits):
+    data = signals(12, sum(splits))
+    inc = correlation.Incremental(len(data))
+    start = 0
+    for k in splits:
+        inc.update(data[:, start:start + k])
+        start += k
+        if start >= 2:
+            check(inc, data[:, :start])
+
+
+@pytest.mark.parametrize("window,splits", [(64, [64, 16, 16, 100]), (50, [10] * 20),
+                                           (30, [5, 45, 3, 60])])
+def test_sliding_window(window, splits):
+    data = signals(9, sum(splits), seed=1)
+    inc = correlation.Incremental(len(data), window=window)
+    start = 0
+    for k in splits:
+        inc.update(data[:, start:start + k])
+        start += k
+        if min(start, window) >= 2:
+            check(inc, data[:, max(0, start - window):start])
+    inc.rebuild()
+    check(inc, data[:, start - window:start])
+
+
+def test_zero_variance_row_matches_seq():
+    data = signals(6, 40)
+    inc = correlation.Incremental(len(data))
+    inc.update(data[:, :25])
+    inc.update(data[:, 25:])
+    result = inc.correlation().to_dense()
+    assert np.isnan(result[3]).all() and np.isnan(result[:, 3]).all()
+    assert np.isnan(seq_reference(data)[3]).all()
+    check(inc, data)
+
+
+def test_matches_numpy():
+    data = signals(10, 300, seed=2)
+    inc = correlation.Incremental(len(data))
+    for batch in np.array_split(data, 6, axis=1):
+        inc.update(batch)
+    keep = np.arange(len(data)) != 3
+    np.testing.assert_allclose(inc.correlation().to_dense()[np.ix_(keep, keep)],
+                               np.corrcoef(data[keep].astype(np.float64)), rtol=0, atol=TOLERANCE)